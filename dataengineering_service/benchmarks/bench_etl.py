@@ -0,0 +1,170 @@
+"""
+ETL 핫패스 벤치마크 (preprocess_line / parse_book_toc / create_and_embed_chunks / load_chunks_to_rag_db).
+
+synthetic_toc로 만든 합성 도서(규칙집의 모든 패턴 포함)를 대상으로 단계별 처리량과 tracemalloc 최대 메모리를 잽니다.
+기본 임베딩 모델은 stand_in_model.HashingEmbeddingModel이라 네트워크/torch 없이 실행되고,
+--model에 sentence-transformers 모델 이름을 주면 실제 모델로 측정합니다.
+load_chunks_to_rag_db 단계는 --rag-dsn을 줄 때만 별도 테이블(toc_chunks_bench)에 적재하여 측정합니다.
+
+규칙집을 고친 뒤 처리량이 떨어졌는지 보려면 결과를 JSON으로 저장해 두고 --baseline으로 비교합니다.
+
+사용법 (dataengineering_service 디렉토리에서):
+    python benchmarks/bench_etl.py --books 500 --json before.json
+    python benchmarks/bench_etl.py --books 500 --baseline before.json
+    python benchmarks/bench_etl.py --rag-dsn postgresql://user:pw@localhost:5433/rag_db
+"""
+import argparse
+import json
+import logging
+import resource
+import time
+import tracemalloc
+
+import pandas as pd
+
+from synthetic_toc import generate_books, rule_coverage  # sys.path에 서비스/저장소 루트를 추가합니다
+from stand_in_model import HashingEmbeddingModel
+from toc_parser import PATTERNS_RULEBOOK, RulebookProfile, parse_book_toc, preprocess_line
+
+import run_etl
+
+
+def measure(fn, *args):
+    """
+    fn(*args)의 (결과, 경과 시간(s), tracemalloc 최대 메모리(bytes)).
+    tracemalloc은 할당마다 비용이 붙어 처리량을 몇 배 낮추므로, 시간과 메모리는 따로 한 번씩 실행해서 잽니다.
+    """
+    start = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def bench_preprocess(lines):
+    return sum(1 for line in lines if preprocess_line(line) is not None)
+
+
+def bench_parse(books):
+    nodes, failures = [], []
+    for book in books:
+        book_nodes, book_failures = parse_book_toc(book["raw_toc"], book["isbn"])
+        nodes.extend(book_nodes)
+        failures.extend(book_failures)
+    return nodes, failures
+
+
+def bench_load(dsn, df_chunks):
+    from sqlalchemy import create_engine, text
+
+    engine = create_engine(dsn)
+    table = run_etl.create_rag_db_table(engine, table_name="toc_chunks_bench")
+    if table is None:
+        raise RuntimeError("Failed to create benchmark table in RAG DB")
+    try:
+        _, elapsed, peak = measure(run_etl.load_chunks_to_rag_db, engine, table, df_chunks)
+    finally:
+        with engine.connect() as connection:
+            connection.execute(text(f"DROP TABLE IF EXISTS {table.name}"))
+            connection.commit()
+    return elapsed, peak
+
+
+def run(args):
+    books = generate_books(args.books, args.lines_per_book, seed=args.seed)
+    lines = [line for book in books for line in book["raw_toc"].splitlines()]
+    df_raw_books = pd.DataFrame.from_records(books)
+    results = {}
+
+    num_kept, elapsed, peak = measure(bench_preprocess, lines)
+    results["preprocess_line"] = {"items": len(lines), "unit": "lines", "seconds": elapsed, "peak_bytes": peak,
+                                  "kept": num_kept}
+
+    (nodes, failures), elapsed, peak = measure(bench_parse, books)
+    results["parse_book_toc"] = {"items": len(lines), "unit": "lines", "seconds": elapsed, "peak_bytes": peak,
+                                 "nodes": len(nodes), "failures": len(failures)}
+
+    if args.model:
+        run_etl.EMBEDDING_MODEL_NAME = args.model
+        run_etl.EMBEDDING_MODEL = None
+        if run_etl.get_embedding_model() is None:  # 모델 로딩 시간은 측정에서 제외
+            raise RuntimeError(f"Failed to load embedding model '{args.model}'")
+    else:
+        run_etl.EMBEDDING_MODEL = HashingEmbeddingModel(args.dim)
+
+    df_chunks, elapsed, peak = measure(run_etl.build_composite_chunks, nodes, df_raw_books)
+    results["build_composite_chunks"] = {"items": len(df_chunks), "unit": "texts", "seconds": elapsed,
+                                         "peak_bytes": peak}
+
+    df_embedded, elapsed, peak = measure(run_etl.create_and_embed_chunks, nodes, df_raw_books)
+    results["create_and_embed_chunks"] = {"items": len(df_embedded), "unit": "texts", "seconds": elapsed,
+                                          "peak_bytes": peak}
+
+    if args.rag_dsn:
+        elapsed, peak = bench_load(args.rag_dsn, df_embedded)
+        results["load_chunks_to_rag_db"] = {"items": len(df_embedded), "unit": "rows", "seconds": elapsed,
+                                            "peak_bytes": peak}
+
+    return results, len(nodes)
+
+
+def report(results, num_nodes, baseline=None):
+    print(f"\n{'stage':<26} {'items':>9} {'seconds':>9} {'items/s':>11} {'nodes/s':>10} {'peak MiB':>9}"
+          + ("  vs baseline" if baseline else ""))
+    for stage, r in results.items():
+        rate = r["items"] / r["seconds"] if r["seconds"] else float("inf")
+        nodes_rate = f"{num_nodes / r['seconds']:>10.0f}" if stage == "parse_book_toc" else f"{'':>10}"
+        line = (f"{stage:<26} {r['items']:>9} {r['seconds']:>9.3f} {rate:>9.0f}/{r['unit'][0]} {nodes_rate} "
+                f"{r['peak_bytes'] / 2 ** 20:>9.1f}")
+        if baseline and stage in baseline:
+            before = baseline[stage]["items"] / baseline[stage]["seconds"]
+            line += f"  x{rate / before:.2f} throughput"
+        print(line)
+    print(f"\nmax RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--books", type=int, default=300)
+    parser.add_argument("--lines-per-book", type=int, default=120)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--model", default=None, help="sentence-transformers 모델 이름 (기본: 해싱 stand-in 모델)")
+    parser.add_argument("--dim", type=int, default=768, help="stand-in 모델 차원")
+    parser.add_argument("--rag-dsn", default=None, help="주면 toc_chunks_bench 테이블에 적재 단계도 측정")
+    parser.add_argument("--json", default=None, help="결과를 저장할 JSON 경로")
+    parser.add_argument("--baseline", default=None, help="비교할 이전 --json 결과")
+    parser.add_argument("--profile-rules", action="store_true", help="합성 코퍼스로 규칙집 패턴별 프로파일 보고서 출력")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)  # 파서의 Unmatched line 경고 출력 비용을 측정에서 제외
+
+    coverage = rule_coverage()
+    shadowed = [index for index, ratio in coverage.items() if ratio == 0.0]
+    print(f"Rulebook coverage: {len(coverage) - len(shadowed)}/{len(PATTERNS_RULEBOOK)} patterns reachable"
+          + (f" (shadowed by earlier rules: {shadowed})" if shadowed else ""))
+
+    if args.profile_rules:
+        profile = RulebookProfile()
+        for book in generate_books(args.books, args.lines_per_book, seed=args.seed):
+            parse_book_toc(book["raw_toc"], book["isbn"], profile)
+        print(profile.report(top=len(profile.patterns)), end="\n\n")
+
+    results, num_nodes = run(args)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+    report(results, num_nodes, baseline)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "results": results}, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+parse_book_toc 스케일링 벤치마크.
+
+합성 목차(synthetic_toc: 규칙집의 모든 패턴 + 부제 연속 라인 + 노이즈 + 페이지 번호)를 라인 수별로 만들어
+파싱 시간을 측정합니다. 라인당 시간이 라인 수와 무관하게 일정하면 선형입니다.
+
+사용법 (dataengineering_service 디렉토리에서):
+    python benchmarks/bench_parse_toc.py --lines 1000 5000 10000 20000
+"""
+import argparse
+import time
+
+from synthetic_toc import generate_synthetic_toc  # sys.path에 서비스/저장소 루트를 추가합니다
+from toc_parser import parse_book_toc
+
+
+def bench(num_lines, repeat):
+    raw_toc = generate_synthetic_toc(num_lines)
+    best = float("inf")
+    nodes = failures = ()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        nodes, failures = parse_book_toc(raw_toc, "9780000000000")
+        best = min(best, time.perf_counter() - start)
+    return best, len(nodes), len(failures)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, nargs="+", default=[1000, 2500, 5000, 10000, 20000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'lines':>8} {'nodes':>8} {'failed':>7} {'best(s)':>9} {'lines/s':>10} {'us/line':>8}")
+    baseline_us = None
+    for num_lines in args.lines:
+        elapsed, num_nodes, num_failed = bench(num_lines, args.repeat)
+        us_per_line = elapsed / num_lines * 1e6
+        baseline_us = baseline_us or us_per_line
+        print(f"{num_lines:>8} {num_nodes:>8} {num_failed:>7} {elapsed:>9.4f} {num_lines / elapsed:>10.0f} "
+              f"{us_per_line:>8.2f}  (x{us_per_line / baseline_us:.2f} vs smallest)")
+
+
+if __name__ == "__main__":
+    main()
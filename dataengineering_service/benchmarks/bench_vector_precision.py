@@ -0,0 +1,171 @@
+"""
+임베딩 저장 정밀도(vector / halfvec / binary) recall·지연시간 벤치마크.
+
+float32 코사인 top-k를 정답으로 두고 다음을 비교합니다.
+- halfvec: float16으로 저장한 벡터로 계산한 top-k
+- binary : 부호 비트(binary_quantize)의 해밍 거리로 k * rerank 후보를 뽑은 뒤 float32로 재정렬한 top-k
+
+parsing_results/toc_embeddings.npy가 있으면 실제 임베딩을, 없으면 군집이 있는 합성 벡터를 사용하므로
+DB나 임베딩 모델 없이 실행됩니다. --dsn을 주면 RAG DB의 toc_chunks에 대해 HNSW 조회 지연시간도 측정합니다.
+
+사용법 (dataengineering_service 디렉토리에서):
+    python benchmarks/bench_vector_precision.py --rows 50000 --queries 200 --k 10
+    python benchmarks/bench_vector_precision.py --dsn postgresql://user:pw@localhost:5433/rag_db --storage binary
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_EMBEDDINGS_PATH = os.path.join(SERVICE_DIR, "parsing_results", "toc_embeddings.npy")
+
+# popcount 조회표 (uint8 -> 켜진 비트 수)
+POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.uint16)
+
+
+def synthetic_embeddings(rows, dim, clusters=200, seed=42):
+    """문장 임베딩처럼 군집이 있는 정규화 벡터를 만듭니다. (순수 난수 벡터는 recall을 과대평가합니다.)"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    assignment = rng.integers(0, clusters, rows)
+    vectors = centers[assignment] + 0.6 * rng.standard_normal((rows, dim)).astype(np.float32)
+    return vectors
+
+
+def normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True).clip(min=1e-12)
+
+
+def load_corpus(path, rows, dim):
+    if path and os.path.exists(path):
+        embeddings = np.load(path, mmap_mode="r")
+        print(f"Using {path} ({len(embeddings)} rows)")
+        return normalize(embeddings[:rows])
+    print(f"Using synthetic clustered embeddings ({rows} x {dim})")
+    return normalize(synthetic_embeddings(rows, dim))
+
+
+def make_queries(corpus, num_queries, noise=0.5, seed=7):
+    """코퍼스 벡터에 노름 noise 정도의 잡음을 섞어 '비슷하지만 똑같지는 않은' 질의를 만듭니다."""
+    rng = np.random.default_rng(seed)
+    picks = corpus[rng.integers(0, len(corpus), num_queries)]
+    jitter = rng.standard_normal(picks.shape).astype(np.float32) / np.sqrt(corpus.shape[1])
+    return normalize(picks + noise * jitter)
+
+
+def top_k(scores, k):
+    idx = np.argpartition(-scores, k, axis=1)[:, :k]
+    order = np.take_along_axis(scores, idx, axis=1).argsort(axis=1)[:, ::-1]
+    return np.take_along_axis(idx, order, axis=1)
+
+
+def recall(found, truth):
+    k = truth.shape[1]
+    return float(np.mean([len(set(f) & set(t)) / k for f, t in zip(found, truth)]))
+
+
+def search_float(corpus, queries, k):
+    return top_k(queries @ corpus.T, k)
+
+
+def search_binary(corpus_f32, corpus_bits, queries, k, rerank):
+    query_bits = np.packbits(queries > 0, axis=1)
+    candidates = k * rerank
+    results = []
+    for q, q_bits in zip(queries, query_bits):
+        hamming = POPCOUNT[np.bitwise_xor(corpus_bits, q_bits)].sum(axis=1)
+        cand = np.argpartition(hamming, candidates)[:candidates]
+        scores = corpus_f32[cand] @ q
+        results.append(cand[np.argsort(-scores)[:k]])
+    return np.array(results)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def bench_offline(corpus, queries, k, rerank):
+    dim = corpus.shape[1]
+    truth, t_f32 = timed(search_float, corpus, queries, k)
+
+    corpus_f16 = corpus.astype(np.float16)
+    found_f16, t_f16 = timed(search_float, corpus_f16.astype(np.float32), queries.astype(np.float16).astype(np.float32), k)
+
+    corpus_bits = np.packbits(corpus > 0, axis=1)
+    found_bin, t_bin = timed(search_binary, corpus, corpus_bits, queries, k, rerank)
+
+    n = len(queries)
+    print(f"\n{'storage':<22} {'bytes/row':>10} {f'recall@{k}':>10} {'ms/query':>10}")
+    print(f"{'vector (float32)':<22} {dim * 4:>10} {1.0:>10.4f} {t_f32 / n * 1e3:>10.3f}")
+    print(f"{'halfvec (float16)':<22} {dim * 2:>10} {recall(found_f16, truth):>10.4f} {t_f16 / n * 1e3:>10.3f}")
+    print(f"{f'binary + rerank x{rerank}':<22} {dim // 8:>10} {recall(found_bin, truth):>10.4f} {t_bin / n * 1e3:>10.3f}"
+          f"  (index only; rerank reads float32 rows)")
+
+
+def bench_db(dsn, storage, queries, k, rerank, ef_search):
+    """toc_chunks에 대한 HNSW 조회 지연시간 (run_etl.TOC_CHUNKS_STORAGE로 적재된 테이블 기준)."""
+    import psycopg2
+
+    dim = queries.shape[1]
+    if storage == "halfvec":
+        sql = f"SELECT id FROM toc_chunks ORDER BY embedding <=> %s::halfvec({dim}) LIMIT %s"
+        params = lambda literal: (literal, k)  # noqa: E731
+    elif storage == "binary":
+        sql = (
+            f"SELECT id FROM ("
+            f"  SELECT id, embedding FROM toc_chunks"
+            f"  ORDER BY binary_quantize(embedding)::bit({dim}) <~> binary_quantize(%s::vector({dim})) LIMIT %s"
+            f") candidates ORDER BY embedding <=> %s::vector({dim}) LIMIT %s"
+        )
+        params = lambda literal: (literal, k * rerank, literal, k)  # noqa: E731
+    else:
+        sql = f"SELECT id FROM toc_chunks ORDER BY embedding <=> %s::vector({dim}) LIMIT %s"
+        params = lambda literal: (literal, k)  # noqa: E731
+
+    with psycopg2.connect(dsn) as conn, conn.cursor() as cur:
+        cur.execute("SET hnsw.ef_search = %s", (max(ef_search, k * rerank if storage == "binary" else k),))
+        latencies = []
+        for q in queries:
+            literal = "[" + ",".join(f"{x:.6f}" for x in q) + "]"
+            start = time.perf_counter()
+            cur.execute(sql, params(literal))
+            cur.fetchall()
+            latencies.append((time.perf_counter() - start) * 1e3)
+        cur.execute("SELECT pg_size_pretty(pg_relation_size(indexrelid)) FROM pg_index "
+                    "WHERE indrelid = 'toc_chunks'::regclass AND indexrelid::regclass::text LIKE 'toc_chunks_emb_%%'")
+        index_sizes = [row[0] for row in cur.fetchall()]
+
+    latencies = np.array(latencies)
+    print(f"\nDB ({storage}, ef_search={ef_search}): p50={np.percentile(latencies, 50):.2f}ms "
+          f"p95={np.percentile(latencies, 95):.2f}ms p99={np.percentile(latencies, 99):.2f}ms "
+          f"index size={', '.join(index_sizes) or 'n/a'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--embeddings", default=DEFAULT_EMBEDDINGS_PATH)
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--rerank", type=int, default=10, help="binary 모드에서 재정렬할 후보 배수 (k * rerank)")
+    parser.add_argument("--dsn", default=None, help="주면 RAG DB toc_chunks에 대해 HNSW 조회 지연시간도 측정")
+    parser.add_argument("--storage", choices=["vector", "halfvec", "binary"], default=os.getenv("TOC_CHUNKS_STORAGE", "vector"))
+    parser.add_argument("--ef-search", type=int, default=40)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.embeddings, args.rows, args.dim)
+    queries = make_queries(corpus, args.queries)
+    bench_offline(corpus, queries, args.k, args.rerank)
+
+    if args.dsn:
+        bench_db(args.dsn, args.storage, queries, args.k, args.rerank, args.ef_search)
+
+
+if __name__ == "__main__":
+    main()
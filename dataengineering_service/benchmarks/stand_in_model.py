@@ -0,0 +1,27 @@
+"""
+벤치마크용 초경량 임베딩 모델 (sentence-transformers 없이 오프라인 실행용).
+
+토큰을 crc32로 해싱해 dim 차원 버킷에 +1/-1을 더한 뒤 정규화하는 feature hashing 모델입니다.
+SentenceTransformer와 같은 encode()/get_sentence_embedding_dimension() 인터페이스를 제공하므로
+run_etl.EMBEDDING_MODEL에 그대로 넣을 수 있습니다. 의미 품질은 없고 처리량 측정용입니다.
+"""
+import zlib
+
+import numpy as np
+
+
+class HashingEmbeddingModel:
+    def __init__(self, dim=768):
+        self.dim = dim
+
+    def get_sentence_embedding_dimension(self):
+        return self.dim
+
+    def encode(self, sentences, batch_size=32, show_progress_bar=False, **kwargs):
+        embeddings = np.zeros((len(sentences), self.dim), dtype=np.float32)
+        for row, sentence in enumerate(sentences):
+            for token in sentence.split():
+                h = zlib.crc32(token.encode("utf-8"))
+                embeddings[row, h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return embeddings / np.maximum(norms, 1e-12)
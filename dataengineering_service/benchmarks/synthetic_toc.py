@@ -0,0 +1,157 @@
+"""
+벤치마크용 합성 목차(한국어/영어) 생성기.
+
+RULE_TEMPLATES는 toc_parser.PATTERNS_RULEBOOK과 같은 순서로, 각 규칙이 '처음으로' 매칭되는 예시 라인을 만듭니다.
+여기에 노이즈 라인, 규칙에 걸리지 않는 부제/연속 라인(fallback), HTML 태그, 페이지 번호를 섞습니다.
+규칙집이 바뀌어 템플릿이 다른 규칙에 먼저 걸리면 rule_coverage()에서 드러납니다.
+"""
+import os
+import random
+import sys
+from collections import Counter
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [SERVICE_DIR, os.path.dirname(SERVICE_DIR)]  # 컨테이너(/app/toc_parser)와 로컬 체크아웃 모두 지원
+
+from toc_parser import PATTERNS_RULEBOOK, preprocess_line  # noqa: E402
+
+KO_WORDS = ["데이터", "분석", "파이썬", "모델", "학습", "네트워크", "보안", "설계", "시스템", "구조", "알고리즘", "운영체제",
+            "경영", "전략", "통계", "기초", "실전", "활용"]
+EN_WORDS = ["Deep Learning", "Practical", "Advanced", "Kubernetes", "Spring", "React", "Cloud", "Design Patterns",
+            "Testing", "Performance"]
+ROMAN = "ⅠⅡⅢⅣⅤⅥⅦⅧⅨⅩ"
+CIRCLED = "①②③④⑤⑥⑦⑧⑨⑩"
+
+
+def _title(rng):
+    words = KO_WORDS if rng.random() < 0.7 else KO_WORDS + EN_WORDS
+    return " ".join(rng.choice(words) for _ in range(rng.randint(2, 5)))
+
+
+def _n(rng, hi=20):
+    return rng.randint(1, hi)
+
+
+# PATTERNS_RULEBOOK과 같은 순서. (예시 라인 템플릿, 기본 가중치)
+RULE_TEMPLATES = [
+    # Level 1
+    (lambda r: f"권{_n(r, 5)} {_title(r)}", 0.3),
+    (lambda r: f"제{_n(r, 5)}부 {_title(r)}", 1.0),
+    (lambda r: f"{_n(r, 5)}부. {_title(r)}", 0.5),
+    (lambda r: f"[PART {_n(r, 5)}] {_title(r)}", 0.5),
+    (lambda r: f"Part {_n(r, 5)} {_title(r)}", 1.0),
+    (lambda r: f"첫째마당 | {_title(r)}", 0.1),
+    (lambda r: f"{r.choice(ROMAN)}. {_title(r)}", 0.5),
+    (lambda r: f"{r.choice('ABCDEFG')} {_title(r)}", 0.3),
+    (lambda r: f"Lesson {_n(r):02d}: {_title(r)}", 0.3),
+    # Level 2
+    (lambda r: f"Chapter {_n(r)}. {_title(r)}", 3.0),
+    (lambda r: f"▣ {_n(r):02d}장: {_title(r)}", 0.3),
+    (lambda r: f"({_n(r)}장) {_title(r)}", 0.3),
+    (lambda r: f"{_n(r):02d}장. {_title(r)}", 3.0),
+    (lambda r: f"제{_n(r)}장 {_title(r)}", 2.0),
+    (lambda r: f"{_n(r)}. {_title(r)}", 3.0),
+    (lambda r: f"{r.choice(CIRCLED)} {_title(r)}", 0.3),
+    (lambda r: f"{_n(r)}장.", 0.2),  # 제목이 다음 줄에 오는 경우
+    # Level 3
+    (lambda r: f"{_n(r)}절 {_title(r)}", 1.0),
+    (lambda r: f"[{_n(r, 200):03d}] {_title(r)}", 0.5),
+    (lambda r: f"제{_n(r)}회 {_title(r)}", 0.2),
+    (lambda r: f"{_n(r)} {_title(r)}", 1.0),
+    # Level 4
+    (lambda r: f"{_n(r)}.{_n(r)}.{_n(r)}.{_n(r)} {_title(r)}", 0.5),
+    (lambda r: f"{_n(r)}.{_n(r)}.{_n(r)} {_title(r)}", 4.0),
+    (lambda r: f"{_n(r)}.{_n(r)} {_title(r)}", 8.0),
+    (lambda r: f"{_n(r):02d}-{_n(r)} {_title(r)}", 1.0),
+    # Level 5~7
+    (lambda r: f"{_n(r)}) {_title(r)}", 1.0),
+    (lambda r: f"({_n(r)}) {_title(r)}", 1.0),
+    (lambda r: f"({r.choice('abcdef')}) {_title(r)}", 0.5),
+]
+assert len(RULE_TEMPLATES) == len(PATTERNS_RULEBOOK), "RULE_TEMPLATES must follow PATTERNS_RULEBOOK"
+
+NOISE_TEMPLATES = [
+    lambda r: "연습문제",
+    lambda r: "찾아보기",
+    lambda r: "Contents",
+    lambda r: "머리말",
+    lambda r: f"<표{_n(r)}-{_n(r)}> {_title(r)}",
+    lambda r: f"DAY {_n(r):02d}",
+    lambda r: f"Step{_n(r)} {_title(r)}",
+    lambda r: f"[{_title(r)}]",
+    lambda r: "References",
+]
+
+
+def _decorate(rng, line):
+    """실제 알라딘 목차처럼 페이지 번호, 점선, HTML 태그, 선행 기호를 섞습니다."""
+    roll = rng.random()
+    if roll < 0.3:
+        line = f"{line} {rng.randint(1, 999)}"
+    elif roll < 0.4:
+        line = f"{line} ..... {rng.randint(1, 999)}"
+    elif roll < 0.5:
+        line = f"<b>{line}</b>"
+    elif roll < 0.55:
+        line = f"■ {line}"
+    return line
+
+
+def generate_synthetic_toc(num_lines, seed=42, noise_ratio=0.05, fallback_ratio=0.2):
+    """num_lines 줄의 raw_toc 문자열을 만듭니다. (모든 규칙 + 노이즈 + fallback + 페이지 번호만 있는 줄)"""
+    rng = random.Random(seed)
+    templates = [t for t, _ in RULE_TEMPLATES]
+    weights = [w for _, w in RULE_TEMPLATES]
+    lines = []
+    while len(lines) < num_lines:
+        roll = rng.random()
+        if roll < noise_ratio:
+            lines.append(rng.choice(NOISE_TEMPLATES)(rng))
+        elif roll < noise_ratio + fallback_ratio:
+            lines.append(_title(rng))  # 규칙에 걸리지 않는 부제/연속 라인
+        elif roll < noise_ratio + fallback_ratio + 0.01:
+            lines.append(str(rng.randint(1, 999)))  # 페이지 번호만 있는 줄
+        else:
+            lines.append(_decorate(rng, rng.choices(templates, weights)[0](rng)))
+    return "\n".join(lines)
+
+
+def generate_books(num_books, lines_per_book=120, seed=42):
+    """extract_raw_tocs()와 같은 컬럼(isbn, title, raw_toc, summary, ...)의 레코드 목록을 만듭니다."""
+    rng = random.Random(seed)
+    books = []
+    for i in range(num_books):
+        num_lines = max(1, int(rng.gauss(lines_per_book, lines_per_book / 3)))
+        books.append({
+            "isbn": f"979{i:010d}",
+            "title": _title(rng),
+            "raw_toc": generate_synthetic_toc(num_lines, seed=seed + i),
+            "summary": " ".join(_title(rng) for _ in range(rng.randint(5, 15))),
+            "full_description": None,
+            "publisher_description": None,
+        })
+    return books
+
+
+def first_matching_rule(line):
+    """전처리 후 line이 처음으로 매칭되는 규칙 인덱스. 노이즈면 'noise', 어떤 규칙에도 안 걸리면 'fallback'."""
+    cleaned = preprocess_line(line)
+    if cleaned is None:
+        return "noise"
+    for index, (_, pattern) in enumerate(PATTERNS_RULEBOOK):
+        if pattern.match(cleaned):
+            return index
+    return "fallback"
+
+
+def rule_coverage(num_samples=200, seed=42):
+    """
+    템플릿별로 샘플을 만들어 의도한 규칙에 처음 매칭되는 비율을 돌려줍니다.
+    다른 규칙에 가려져 한 번도 먼저 매칭되지 않는 규칙(shadowed)은 0.0이 됩니다.
+    """
+    rng = random.Random(seed)
+    coverage = {}
+    for index, (template, _) in enumerate(RULE_TEMPLATES):
+        hits = Counter(first_matching_rule(template(rng)) for _ in range(num_samples))
+        coverage[index] = hits[index] / num_samples
+    return coverage
@@ -0,0 +1,131 @@
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+MANIFEST_VERSION = 3  # 2: 노드 파일에 toc_cluster 컬럼 추가, 3: 합성 텍스트의 책소개 Fallback(full/publisher description) 적용
+
+
+def _atomic_write_bytes(path, payload):
+    """임시 파일에 쓴 뒤 os.replace로 교체하여 중간에 죽어도 반쯤 쓰인 파일이 남지 않게 합니다."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def compute_batch_key(df_batch, model_name, parser_version):
+    """
+    배치에 포함된 책들의 (ISBN, 목차, 책소개, 중복 클러스터)와 임베딩 모델 이름, 목차 파서 버전으로 배치 키를 만듭니다.
+    입력 내용이 하나라도 바뀌면 키가 달라지므로 해당 배치만 다시 처리됩니다.
+    """
+    h = hashlib.sha256(f"{model_name}\x1f{parser_version}".encode("utf-8"))
+    for row in df_batch.itertuples(index=False):
+        for col in ("isbn", "raw_toc", "title", "summary", "full_description", "publisher_description", "toc_cluster"):
+            value = getattr(row, col, None)
+            h.update(b"\x1f")
+            if isinstance(value, str):
+                h.update(value.encode("utf-8"))
+        h.update(b"\x1e")
+    return h.hexdigest()[:20]
+
+
+class CheckpointSpool:
+    """
+    배치 단위 ETL 진행 상황을 로컬 디스크에 저장하는 스풀입니다.
+
+    배치마다 파싱 노드(Parquet), 파싱 실패 라인(Parquet), 임베딩(npy)을 쓰고
+    manifest.json에 완료된 배치 키를 기록합니다. 재실행 시 manifest에 있는 배치는 건너뜁니다.
+    """
+
+    def __init__(self, spool_dir, model_name):
+        self.spool_dir = spool_dir
+        self.model_name = model_name
+        self.manifest_path = os.path.join(spool_dir, "manifest.json")
+        os.makedirs(spool_dir, exist_ok=True)
+        self.manifest = self._load_manifest()
+
+    def _load_manifest(self):
+        empty = {"version": MANIFEST_VERSION, "model": self.model_name, "batches": {}}
+        if not os.path.exists(self.manifest_path):
+            return empty
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Checkpoint manifest is unreadable, starting from scratch: {e}")
+            return empty
+
+        if manifest.get("version") != MANIFEST_VERSION or manifest.get("model") != self.model_name:
+            logging.info("Checkpoint manifest was written by another spool version or model. Ignoring it.")
+            return empty
+        return manifest
+
+    def _save_manifest(self):
+        payload = json.dumps(self.manifest, ensure_ascii=False, indent=2).encode("utf-8")
+        _atomic_write_bytes(self.manifest_path, payload)
+
+    def _paths(self, batch_key):
+        base = os.path.join(self.spool_dir, f"batch-{batch_key}")
+        return {
+            "nodes": f"{base}.nodes.parquet",
+            "failures": f"{base}.failures.parquet",
+            "embeddings": f"{base}.embeddings.npy",
+        }
+
+    def is_complete(self, batch_key):
+        """manifest에 기록되어 있고 스풀 파일이 모두 남아있는 배치만 완료로 봅니다."""
+        if batch_key not in self.manifest["batches"]:
+            return False
+        return all(os.path.exists(p) for p in self._paths(batch_key).values())
+
+    def write_batch(self, batch_key, df_nodes, df_failures, embeddings):
+        """
+        배치 결과를 스풀 파일로 기록한 뒤 manifest를 갱신합니다.
+        manifest는 파일이 모두 쓰인 다음에만 갱신되므로, 도중에 죽으면 해당 배치는 재실행 시 다시 처리됩니다.
+        """
+        paths = self._paths(batch_key)
+
+        df_nodes.to_parquet(f"{paths['nodes']}.tmp", index=False)
+        os.replace(f"{paths['nodes']}.tmp", paths["nodes"])
+
+        df_failures.to_parquet(f"{paths['failures']}.tmp", index=False)
+        os.replace(f"{paths['failures']}.tmp", paths["failures"])
+
+        with open(f"{paths['embeddings']}.tmp", "wb") as f:
+            np.save(f, np.ascontiguousarray(embeddings, dtype=np.float32))
+        os.replace(f"{paths['embeddings']}.tmp", paths["embeddings"])
+
+        self.manifest["batches"][batch_key] = {
+            "num_nodes": int(len(df_nodes)),
+            "num_failures": int(len(df_failures)),
+            "completed_at": datetime.now(timezone.utc).isoformat(),
+        }
+        self._save_manifest()
+
+    def read_batch(self, batch_key):
+        """스풀된 배치를 (노드 DataFrame, 실패 DataFrame, 임베딩 배열)로 읽어옵니다."""
+        paths = self._paths(batch_key)
+        df_nodes = pd.read_parquet(paths["nodes"])
+        df_failures = pd.read_parquet(paths["failures"])
+        embeddings = np.load(paths["embeddings"], mmap_mode="r")
+        return df_nodes, df_failures, embeddings
+
+    def prune(self, keep_keys):
+        """이번 실행에서 사용하지 않은(입력이 바뀐) 배치의 스풀 파일과 manifest 항목을 정리합니다."""
+        keep_keys = set(keep_keys)
+        stale_keys = [key for key in self.manifest["batches"] if key not in keep_keys]
+        for key in stale_keys:
+            for path in self._paths(key).values():
+                if os.path.exists(path):
+                    os.remove(path)
+            del self.manifest["batches"][key]
+        if stale_keys:
+            self._save_manifest()
+            logging.info(f"Pruned {len(stale_keys)} stale checkpoint batches.")
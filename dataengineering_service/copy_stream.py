@@ -0,0 +1,85 @@
+import struct
+
+import numpy as np
+
+# PostgreSQL 바이너리 COPY 포맷: 시그니처 + flags(int32) + 헤더 확장 길이(int32) ... 튜플들 ... 트레일러(int16 -1)
+COPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack("!ii", 0, 0)
+COPY_TRAILER = struct.pack("!h", -1)
+
+_NULL = struct.pack("!i", -1)
+_INT4 = struct.Struct("!ii")  # (길이 4, 값)
+
+
+def _text_field(value):
+    if value is None:
+        return _NULL
+    data = value.encode("utf-8")
+    return struct.pack("!i", len(data)) + data
+
+
+def _int4_field(value):
+    return _NULL if value is None else _INT4.pack(4, value)
+
+
+class ChunkCopyEncoder:
+    """
+    toc_chunks 행을 바이너리 COPY 튜플로 인코딩합니다.
+    (isbn, level, number, chapter_title, toc_cluster, composite_text, embedding) 순서이며,
+    embedding은 pgvector의 바이너리 입력 형식(int16 차원, int16 0, 빅엔디언 float32/float16 값)으로 씁니다.
+    벡터를 텍스트('[0.1,0.2,...]')로 포맷하지 않으므로 행마다 768개의 float -> 문자열 변환이 없습니다.
+    """
+
+    COLUMNS = ("isbn", "level", "number", "chapter_title", "toc_cluster", "composite_text", "embedding")
+
+    def __init__(self, dimensions, half=False):
+        self.dimensions = dimensions
+        self.dtype = np.dtype(">f2" if half else ">f4")
+        self._vector_header = struct.pack("!ihh", 4 + dimensions * self.dtype.itemsize, dimensions, 0)
+        self._field_count = struct.pack("!h", len(self.COLUMNS))
+
+    def encode_batch(self, rows, embeddings):
+        """rows: (isbn, level, number, chapter_title, toc_cluster, composite_text) 튜플 목록, embeddings: (len(rows), dim) 배열"""
+        vectors = np.ascontiguousarray(embeddings, dtype=self.dtype)
+        parts = []
+        for (isbn, level, number, chapter_title, toc_cluster, composite_text), vector in zip(rows, vectors):
+            parts.append(self._field_count)
+            parts.append(_text_field(isbn))
+            parts.append(_int4_field(level))
+            parts.append(_text_field(number))
+            parts.append(_text_field(chapter_title))
+            parts.append(_text_field(toc_cluster))
+            parts.append(_text_field(composite_text))
+            parts.append(self._vector_header)
+            parts.append(vector.tobytes())
+        return b"".join(parts)
+
+
+class IteratorFile:
+    """
+    bytes 조각을 내는 이터레이터를 copy_expert()가 읽을 수 있는 파일 객체로 감쌉니다.
+    COPY 입력 전체를 메모리에 만들지 않고, 드라이버가 read()할 때마다 다음 조각을 만들어 보냅니다.
+    bytes_read는 지금까지 보낸 바이트 수입니다.
+    """
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._buffer = memoryview(b"")
+        self._pos = 0
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        # 남은 조각을 잘라 붙일 때 memoryview를 사용하여 큰 조각을 read()마다 다시 복사하지 않습니다.
+        pieces, wanted = [], size
+        while size < 0 or wanted > 0:
+            if self._pos >= len(self._buffer):
+                chunk = next(self._chunks, None)
+                if chunk is None:
+                    break
+                self._buffer, self._pos = memoryview(chunk), 0
+            end = len(self._buffer) if size < 0 else min(len(self._buffer), self._pos + wanted)
+            pieces.append(self._buffer[self._pos:end])
+            wanted -= end - self._pos
+            self._pos = end
+        data = b"".join(pieces)
+        self.bytes_read += len(data)
+        return data
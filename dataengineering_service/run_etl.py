@@ -1,122 +1,129 @@
+import itertools
 import os
+import resource
+import time
 import pandas as pd
 from sqlalchemy import create_engine, text
-import re
 import logging
 
 # --- (★ 추가) 임베딩 및 RAG DB 적재를 위한 라이브러리 ---
-from sentence_transformers import SentenceTransformer
 from sqlalchemy import Column, Integer, String, MetaData, Table, Sequence
-from pgvector.sqlalchemy import Vector
+from pgvector.sqlalchemy import HALFVEC, Vector
 import numpy as np
 
-# --- 1. 보고서 섹션 1: 전처리 및 노이즈 필터링 ---
-NOISE_PATTERNS = [
-    # (★ 수정: 기존의 포괄적인 첫 번째 규칙을 더 세분화하고, 새로운 패턴을 대거 추가)
-    re.compile(
-        r'^\s*(옮긴이 머리말|베타리더|감수의 글|감사의 글|지은이의 말|옮긴이의 말|저자 소개|역자 서문|책머리에|이 책에 대하여|찾아보기|목차|Contents|서문|들어가며|추천사|머리말|서언|발간사|프롤로그|Prologue|맺는 말|에필로그|부록|감사의 말|참고 문헌|연보|해설|주석|편집자의 말|추천의 글|지은이의 글|저자 서문|역자의 말|작품 해설|작가 연보|지은이 소개|옮긴이 소개|지은이 머리말)',
-        re.IGNORECASE),
-    re.compile(r'^(Exercise|연습문제|이것만은 알고 갑시다)', re.IGNORECASE),
-    re.compile(r'^[\s·ㆍ]*(연습문제|요약|핵심정리|확인 문제)[\s·ㆍ]*$', re.IGNORECASE),  # ㆍ 연습문제
-    # --- (★ 추가된 노이즈 패턴 - 2025-10-22) ---
-    re.compile(r'^\s*([0-9]+판|한국어판|개정판)\s*(서문|머리말|을 내며)', re.IGNORECASE),  # 3판 서문, 한국어판 서문, 개정판을 내며
-    re.compile(
-        r'^\s*(To (Everyone|Educators|Students)|Acknowledgments|Final Words|References|Introduction|PREFACE|Summary|Index|Glossary)',
-        re.IGNORECASE),  # English noise
-    re.compile(
-        r'^\s*(이 책을 (보는|읽는) (방법|법)|이 책의 (사용|활용)법|이 책의 (사용|목적|구성|특징)|시작하기 전에|주의|저작권 안내|상세 변경 이력|학습 (방법|가이드|로드맵|지원 안내)|강의 (계획|보조 자료)|일러두기|등장인물|용어 (설명|해설|대역표)|(지은이|옮긴이|감수자|기술 감수자|저자|역자|작가|베타리더|리뷰어|편집자).*(소개|의 글|주|서문|후기|머리말|대담|인터뷰|추천사)|표지에 대하여|해제|발문|서론|서설|개요|도입|시작하며|들어가기 전에|글을 (열며|시작하며|내면서)|책을 (내면서|펴내며|시작하며|머리에)|여는 글|책 머리에|숲과 나무 이야기)',
-        re.IGNORECASE),  # 각종 한국어 머리말/꼬리말
-    re.compile(r'^\s*\[.*\]\s*$'),  # [7가지 키워드...], [시험지] 등 대괄호로만 묶인 라인
-    re.compile(r'^\s*\[(문제|칼럼|실습|Do it!|LAB|응용 예제|프로젝트)'),  # [문제]_01, [칼럼] ...
-    re.compile(r'^(OMR 답안지|// 나눗셈 연산자|논\.설\.해\.변\.책|서\.발)'),  # Added 서.발
-    re.compile(r'^={2,}.*={2,}$'),  # ==== 1권 ====
-    re.compile(r'^(부록)\s+[A-Z]\.?'),  # 부록 A.
-    re.compile(r'^\s*<표.*>.*$'),  # <표1-1>
-    re.compile(r'^\s*<그림.*>.*$'),  # <그림1-1>
-    re.compile(r'^#\s*예제\d+'),  # # 예제82
-    re.compile(r'^DAY\s*\d+'),  # DAY 01
-    re.compile(r'^\d+화\s+'),  # 1화
-    re.compile(r'^\s*\|.*\|\s*$'),  # | 참고문헌 |
-    re.compile(r'^\s*\[붙임 \d+\]'),  # [붙임 1]
-    re.compile(r'^\s*(￭|●|◎|::|\+\+|◇)\s*(연습|프로그래밍|퀴즈)'),  # ￭연습문제 등
-    re.compile(r'^\s*Step\d+'),  # Step1
-    re.compile(r'^\s*WEEK'),  # WEEK 00
-    re.compile(r'^\s*&lt;.*&gt;'),  # &lt;1부&gt;
-    re.compile(r'^\s*#\d+'),  # #11 JShell
-    # --- (★ 추가된 노이즈 패턴 - 2025-10-22) ---
-    re.compile(r'^\s*Value Chain.*BSC.*$', re.IGNORECASE),  # 요약 라인
-    re.compile(r'^\s*[A-Z][가-힣]+ / [A-Z][가-힣]+.*$', re.IGNORECASE),  # A개요 / B경영전략...
-    re.compile(r'^\s*\(전면개정판\)\s*핵심 정보통신기술 총서.*$', re.IGNORECASE),
-    re.compile(r'^\s*이 책에서 소개하는 차트.*$', re.IGNORECASE),
-    re.compile(r'^\s*이순신론 / 이민수'),  # 사용자 요청
-    re.compile(r'^\s*최신 AI 랭킹 사이트.*$', re.IGNORECASE),
-    re.compile(r'^\s*전문 용어 잠깐 알아보기', re.IGNORECASE),
-    re.compile(r'^\s*생성형 AI 도구 100선 요약표', re.IGNORECASE),
-    re.compile(r'^\s*리포트 : AI 도구 100선.*$', re.IGNORECASE),
-    re.compile(r'^\s*(이 책은 데이터베이스를 처음 공부하는|모바일 웹에 빠져 보세요|통계학에 임하는 여러분의 두뇌).*$'),  # 책 소개
-    re.compile(r'^\s*(Part|PART|LC|RC)\s*$', re.IGNORECASE),  # "Part"
-    re.compile(r'^\s*(LC|RC).*(Part|기초|학습)', re.IGNORECASE),  # "RC 기초학습Part"
-]
-
-# --- 2. 보고서 섹션 2.2: 계층적 패턴 규칙집 ---
-PATTERNS_RULEBOOK = [
-    # (Level, Regex) - (보고서 '표 1' 기반)
-    # (★ 수정: 2025-10-22 - 새로운 Level 1 패턴 추가 및 기존 패턴 수정)
-    # Level 1: Part / 부 / Ⅰ / 권 / 마당
-    (1, re.compile(r"^\s*권\s*(?P<number>\d+)\s*(?P<title>.*)")),  # 권1
-    (1, re.compile(r"^\s*제\s*(?P<number>\d+)\s*부:?\s*(?P<title>.*)")),  # 제1부
-    (1, re.compile(r"^\s*(?P<number>\d+)\s*부\.?\s*(?P<title>.*)")),  # 1부.
-    (1, re.compile(r"^\s*\[\s*(?:PART|Part)\s*(?P<number>\d+)\s*\]\s*(?P<title>.*)", re.IGNORECASE)),  # [PART 1]
-    (1, re.compile(r"^\s*(?:Part|PART|부)\s*(?P<number>[IVX\d]+)\.?\s+(?P<title>.*)", re.IGNORECASE)),
-    # Part 1, Part1, 부 I
-    (1, re.compile(r"^\s*첫째마당\s*\|?\s*(?P<title>.*)")),  # 첫째마당 | ...
-    (1, re.compile(r"^\s*(?P<number>[ⅠⅡⅢⅣⅤⅥⅦⅧⅨⅩⅪⅫIVX]+)\s*\.?\s+(?P<title>.*)")),  # Ⅰ. ... (★ IVX 추가)
-    (1, re.compile(r"^\s*[A-Z]\s+(?P<title>\S.*)")),  # A 기업정보시스템 (★ \S.*로 수정)
-    (1, re.compile(r"^\s*(?:Section|STAGE|Lesson|레슨)\s+(?P<number>\d+)\s*:?\s*(?P<title>.*)", re.IGNORECASE)),
-    # Section 1, Lesson 01, 레슨 1 (★ title 캡처 추가)
-
-    # Level 2: Chapter / 장 / 1.
-    # (★ 수정: 2025-10-22 - '장' 뒤 공백(\s*) 및 '.' 뒤 공백(\s*) 처리)
-    (2, re.compile(r"^\s*(?:Chapter|CHAPTER|Chpater)\s*(?P<number>\d+)\.?\s*(?P<title>.*)", re.IGNORECASE)),
-    # Chapter 1, Chpater 1
-    (2, re.compile(r"^\s*▣\s*(?P<number>\d+)\s*장:?\s*(?P<title>.*)")),  # ▣ 01장:
-    (2, re.compile(r"^\s*\(\s*(?P<number>\d+)\s*장\s*\):?\s*(?P<title>.*)")),  # (1장)
-    (2, re.compile(r"^\s*(?P<number>\d+)\s*장\.?:?\s*(?P<title>.*)")),  # 6장, 01장., 1장. (★ \s+ -> \s*)
-    (2, re.compile(r"^\s*제\s*(?P<number>\d+)\s*장\.?:?\s*(?P<title>.*)")),  # 제1장, 제1장. (★ \s+ -> \s*)
-    (2, re.compile(r"^\s*(?P<number>\d+)\.\s*(?P<title>[^.\d].*)")),  # 1. 운영체제의 개요 (★ \s+ -> \s*)
-    (2, re.compile(r"^\s*①|②|③|④|⑤|⑥|⑦|⑧|⑨|⑩|⑪|⑫\s+(?P<title>.*)")),  # ① 기초통계이론
-    (2, re.compile(r"^\s*(?P<number>\d+)\s*장\.?\s*(?P<title>)$")),  # "1장." (제목이 다음 줄에 오는 경우)
-
-    # Level 3: Section / 절 / [001]
-    (3, re.compile(r"^\s*(?P<number>\d+)\s*절\.?\s*(?P<title>.*)")),  # 1절 (★ \s+ -> \s*)
-    (3, re.compile(r"^\s*\[(?P<number>\d+)\]\s+(?P<title>.*)")),  # [001]
-    (3, re.compile(r"^\s*제\s*(?P<number>\d+)\s*회:?\s+(?P<title>.*)")),  # 제1회
-    (3, re.compile(r"^\s*(?P<number>\d+)\s+(?P<title>[a-zA-Z_가-힣].*)")),  # 3) ... (Level 4보다 낮은 우선순위)
-
-    # Level 4: 1.2.1 / 1.2 / 1-1 / 1.1.1.
-    (4, re.compile(r"^\s*(?P<number>\d+\.\d+\.\d+\.\d+)\.?\s+(?P<title>.*)")),  # 1.1.1.1
-    (4, re.compile(r"^\s*(?P<number>\d+\.\d+\.\d+)\.?\s+(?P<title>.*)")),  # 1.1.1
-    (4, re.compile(r"^\s*(?P<number>\d+\.\d+)\.?\s+(?P<title>.*)")),  # 1.1
-    (4, re.compile(r"^\s*(?P<number>[\d\w]+-[\d\w]+)\s*:?\s+(?P<title>.*)")),  # 04-4, 1-1, 1-연초재배
-
-    # Level 5: 1) / (1) / (a)
-    (5, re.compile(r"^\s*\d+\)\s+(?P<title>.*)")),  # 1)
-    (6, re.compile(r"^\s*\(\d+\)\s+(?P<title>.*)")),  # (1)
-    (7, re.compile(r"^\s*\([a-zA-Z]\)\s+(?P<title>.*)")),  # (a)
-]
-
-# --- 3. 보고서 섹션 2.3: Fallback 패턴 ---
-FALLBACK_PATTERN = re.compile(r"^\s*(?P<title>\S.*)")
-
-# --- (★ 신규) 모델 로딩 (스크립트 시작 시 한 번만 로드) ---
+from checkpoint import CheckpointSpool, compute_batch_key
+from copy_stream import COPY_HEADER, COPY_TRAILER, ChunkCopyEncoder, IteratorFile
+
+# 노이즈 필터 + 규칙집 + Fallback 파서는 ingestion_service와 공유하는 toc_parser 패키지에 있습니다.
+from toc_parser import (
+    PARSER_VERSION, DuplicateClusters, ParseCache, RulebookProfile, TocNode, parse_book_toc, preprocess_line,
+    toc_signature,
+)
+
+# --- 모델 로딩 (처음 사용할 때 한 번만 로드) ---
 # 보고서 5.1 [cite: 157]의 모델 사용
-logging.info("Loading sentence transformer model...")
-try:
-    EMBEDDING_MODEL = SentenceTransformer('jhgan/ko-sroberta-multitask')
-    logging.info("Embedding model loaded successfully.")
-except Exception as e:
-    logging.error(f"Failed to load embedding model: {e}")
-    EMBEDDING_MODEL = None
+EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL_NAME", "jhgan/ko-sroberta-multitask")
+EMBEDDING_MODEL = None
+
+# 체크포인트 단위(책 권수). 배치 하나가 끝날 때마다 스풀에 기록됩니다.
+ETL_BATCH_SIZE = int(os.getenv("ETL_BATCH_SIZE", "200"))
+
+# ETL 전송 방식
+# - checkpoint: pandas DataFrame + 배치 스풀(재시작 가능) + to_sql 적재 (기본)
+# - stream    : ingestion DB 서버 측 커서 -> 튜플 단위 파싱/임베딩 -> 바이너리 COPY로 RAG DB 적재 (DataFrame/스풀 없음)
+ETL_TRANSFER_MODE = os.getenv("ETL_TRANSFER_MODE", "checkpoint")
+ETL_STREAM_FETCH_SIZE = int(os.getenv("ETL_STREAM_FETCH_SIZE", "500"))  # 서버 측 커서에서 한 번에 받아올 책 수
+ETL_STREAM_EMBED_BATCH = int(os.getenv("ETL_STREAM_EMBED_BATCH", "1024"))  # 한 번에 임베딩하여 COPY로 보낼 청크 수
+ETL_COPY_READ_SIZE = 1 << 20  # copy_expert가 한 번에 읽어 보내는 바이트 수
+
+# 1이면 본 파이프라인 전에 전체 책에 대해 규칙집 프로파일링 파싱을 한 번 수행하고 패턴별 보고서를 남깁니다.
+TOC_PARSER_PROFILE = os.getenv("TOC_PARSER_PROFILE", "0") == "1"
+
+# 파싱 결과 파일 (Parquet 노드 + node_id로 정렬된 memmap 임베딩 배열)
+NODES_FILENAME = "structured_toc_nodes.parquet"
+EMBEDDINGS_FILENAME = "toc_embeddings.npy"
+ETL_EMBEDDING_DTYPE = os.getenv("ETL_EMBEDDING_DTYPE", "float32")  # float32 또는 float16
+ETL_LOAD_SLICE_SIZE = int(os.getenv("ETL_LOAD_SLICE_SIZE", "10000"))  # RAG DB 적재 시 한 번에 memmap에서 읽을 행 수
+
+# toc_chunks 임베딩 저장 방식
+# - vector : float32 컬럼 + HNSW(vector_cosine_ops)
+# - halfvec: float16 컬럼 + HNSW(halfvec_cosine_ops). 저장 공간/인덱스 메모리 약 1/2
+# - binary : float32 컬럼 + binary_quantize 표현식 HNSW(bit_hamming_ops). 인덱스는 약 1/32,
+#            조회 시 해밍 거리로 후보를 넉넉히 뽑은 뒤 float32 코사인 거리로 재정렬해야 합니다.
+TOC_CHUNKS_STORAGE = os.getenv("TOC_CHUNKS_STORAGE", "vector")
+EMBEDDING_DIMENSIONS = 768
+# HNSW 인덱스 이름은 '<테이블 이름>_<접미사>'입니다. (toc_chunks -> toc_chunks_emb_hnsw)
+TOC_CHUNKS_INDEXES = {
+    "vector": ("emb_hnsw", "embedding vector_cosine_ops"),
+    "halfvec": ("emb_half_hnsw", "embedding halfvec_cosine_ops"),
+    "binary": ("emb_bit_hnsw", f"(binary_quantize(embedding)::bit({EMBEDDING_DIMENSIONS})) bit_hamming_ops"),
+}
+# 스트리밍 전송은 '<테이블 이름>_new'에 적재하고 인덱스까지 만든 뒤 이름을 바꿔 교체합니다. (swap_toc_chunks_table)
+TOC_CHUNKS_STAGING_SUFFIX = "_new"
+ETL_SWAP_LOCK_TIMEOUT = os.getenv("ETL_SWAP_LOCK_TIMEOUT", "30s")  # 교체 트랜잭션이 조회 중인 테이블의 잠금을 기다릴 최대 시간
+
+# DB 연결: docker-compose.yml의 서비스 이름. 엔진은 DB마다 하나만 만들어 추출/적재 단계가 연결 풀을 공유합니다.
+DB_HOSTS = {
+    "ingestion": "postgres_ingestion_db",
+    "rag": "postgres_rag_db",
+}
+ETL_DB_POOL_SIZE = int(os.getenv("ETL_DB_POOL_SIZE", "2"))
+ETL_DB_POOL_RECYCLE = int(os.getenv("ETL_DB_POOL_RECYCLE", "1800"))  # 초. 서버/프록시의 idle timeout보다 짧게
+_DB_ENGINES = {}
+
+# ingestion_service/books/search_cache.py의 GENERATION_KEY와 같은 값이어야 합니다.
+SEARCH_CACHE_GENERATION_KEY = "bookroad:search:generation"
+
+
+def get_embedding_model():
+    """
+    임베딩 모델을 지연 로딩합니다.
+    (임포트 시점에 모델을 올리지 않으므로 파서만 사용하는 경우 torch 로딩 비용이 없습니다.)
+    """
+    global EMBEDDING_MODEL
+    if EMBEDDING_MODEL is None:
+        logging.info(f"Loading sentence transformer model '{EMBEDDING_MODEL_NAME}'...")
+        try:
+            from sentence_transformers import SentenceTransformer
+            EMBEDDING_MODEL = SentenceTransformer(EMBEDDING_MODEL_NAME)
+            logging.info("Embedding model loaded successfully.")
+        except Exception as e:
+            logging.error(f"Failed to load embedding model: {e}")
+            EMBEDDING_MODEL = None
+    return EMBEDDING_MODEL
+
+
+def get_db_engine(name):
+    """
+    DB_HOSTS의 이름('ingestion' 또는 'rag')에 해당하는 공유 SQLAlchemy 엔진을 반환합니다. (프로세스당 한 번 생성)
+    - pool_pre_ping: 풀에서 꺼낼 때 끊어진 연결을 걸러냅니다. (긴 임베딩 단계 동안 DB가 재시작된 경우 등)
+    - pool_recycle: 오래된 연결을 주기적으로 교체합니다.
+    - executemany_mode='values_plus_batch': INSERT뿐 아니라 UPDATE/DELETE executemany도 배치로 보냅니다.
+    """
+    engine = _DB_ENGINES.get(name)
+    if engine is None:
+        db_user = os.getenv("POSTGRES_USER")
+        db_password = os.getenv("POSTGRES_PASSWORD")
+        db_name = os.getenv("POSTGRES_DB")
+        db_port = "5432"  # 컨테이너 내부 포트
+        engine = create_engine(
+            f"postgresql+psycopg2://{db_user}:{db_password}@{DB_HOSTS[name]}:{db_port}/{db_name}",
+            pool_size=ETL_DB_POOL_SIZE,
+            max_overflow=0,
+            pool_pre_ping=True,
+            pool_recycle=ETL_DB_POOL_RECYCLE,
+            executemany_mode="values_plus_batch",
+            connect_args={"application_name": f"bookroad-etl-{name}"},
+        )
+        _DB_ENGINES[name] = engine
+    return engine
+
+
+def dispose_db_engines():
+    """ETL이 끝날 때 공유 엔진의 연결 풀을 닫습니다."""
+    for engine in _DB_ENGINES.values():
+        engine.dispose()
+    _DB_ENGINES.clear()
 
 
 def extract_raw_tocs():
@@ -124,22 +131,19 @@ def extract_raw_tocs():
     ingestion DB에서 원본 목차 및 요약 데이터를 추출하여 Pandas DataFrame으로 반환합니다.
     (★ full_description, publisher_description 컬럼 추가)
     """
-    db_user = os.getenv("POSTGRES_USER")
-    db_password = os.getenv("POSTGRES_PASSWORD")
-    db_name = os.getenv("POSTGRES_DB")
-    db_host = "postgres_ingestion_db"  # docker-compose.yml의 서비스 이름
-    db_port = "5432"
-
     logging.info("Connecting to ingestion database...")
     try:
-        engine = create_engine(
-            f"postgresql+psycopg2://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
-        )
+        engine = get_db_engine("ingestion")
 
         # (★ 수정) summary, full_description, publisher_description을 모두 조회
+        # 원본 목차/상세 소개는 1:1 테이블 books_bookcontent에 있습니다.
         query = text(
-            "SELECT isbn, title, raw_toc, summary, full_description, publisher_description "
-            "FROM books_book WHERE raw_toc IS NOT NULL AND raw_toc != ''"
+            # toc_cluster: 목차가 거의 같은 개정판/세트 도서 묶음의 대표 ISBN (수집 시점에 정해지지 않았으면 NULL,
+            # assign_toc_clusters()가 채웁니다)
+            "SELECT b.isbn, b.title, c.raw_toc, b.summary, c.full_description, c.publisher_description, "
+            "NULLIF(b.toc_cluster, '') AS toc_cluster "
+            "FROM books_book b JOIN books_bookcontent c ON c.book_id = b.id "
+            "WHERE c.raw_toc IS NOT NULL AND c.raw_toc != ''"
         )
 
         with engine.connect() as connection:
@@ -151,197 +155,210 @@ def extract_raw_tocs():
         return pd.DataFrame()
 
 
-def preprocess_line(line):
+def cluster_unclustered_tocs(books):
     """
-    보고서 섹션 1에 따라 단일 라인을 전처리합니다.
+    (isbn, raw_toc)을 ISBN 순으로 받아 목차 MinHash(DuplicateClusters)로 묶은 {isbn: 클러스터 ID}를 반환합니다.
+    ISBN 순으로 추가하므로 클러스터 ID는 클러스터에서 ISBN이 가장 작은 책이며, 실행마다 같습니다.
+    checkpoint(assign_toc_clusters)와 stream(run_streaming_transfer) 두 전송 방식이 함께 사용합니다.
     """
-    # 1. HTML 태그 제거
-    line = re.sub(r'<[^>]+>', '', line)
+    clusters = DuplicateClusters()
+    for isbn, raw_toc in books:
+        # parse_book_toc(lines_out=...)와 같은 전처리 라인. 계층 파싱은 하지 않습니다.
+        lines = [line for line in map(preprocess_line, raw_toc.splitlines()) if line] if isinstance(raw_toc, str) else []
+        signature, bands = toc_signature(lines)
+        clusters.add(isbn, signature, bands)
+    return clusters.clusters()
 
-    # 1.5. (★ 추가) 선행 특수 문자( _, ■, •, ㆍ 등) 제거 (로그에서 발견된 문제)
-    line = re.sub(r'^[\s_\-■•ㆍ]+', '', line).strip()
 
-    # 2. 페이지 번호 제거 (예: ... 123 또는 27)
-    # (★ 수정: ... 점이 없거나 공백이 하나만 있는 경우도 제거)
-    line = re.sub(r'([\s.]{2,}|[ \t]+)(([0-9xvi]+)|(\d{1,3}(?:,\d{3})*))(\s*</?b>)?$', '', line,
-                  flags=re.IGNORECASE).strip()
-
-    # 3. 라인 자체가 페이지 번호인 경우 (가끔 발생)
-    if re.fullmatch(r'([0-9xvi]+)', line, flags=re.IGNORECASE):
-        return None
-
-    # 4. 공백 정규화
-    line = ' '.join(line.split())
-
-    # 5. 빈 라인 제거
-    if not line:
-        return None
+def assign_toc_clusters(df_raw_books):
+    """
+    수집 시점에 중복 클러스터가 정해지지 않은 책(toc_cluster가 NULL: 마이그레이션 0015 이전에 파싱된 책 등)을
+    목차 MinHash(DuplicateClusters)로 메모리 안에서 묶어 toc_cluster를 채운 DataFrame을 반환합니다.
+    클러스터 ID는 실행마다 같으므로 체크포인트 배치 키도 유지됩니다. (cluster_unclustered_tocs)
+    이미 클러스터가 있는 책은 그대로 둡니다.
+    """
+    missing = df_raw_books['toc_cluster'].isna()
+    if not missing.any():
+        return df_raw_books
 
-    # 6. 노이즈 필터링 (★ 업데이트된 패턴 리스트 사용)
-    for pattern in NOISE_PATTERNS:
-        if pattern.search(line):
-            logging.debug(f"Filtered noise line: {line}")
-            return None
+    assigned = cluster_unclustered_tocs(
+        sorted(zip(df_raw_books.loc[missing, 'isbn'], df_raw_books.loc[missing, 'raw_toc']))
+    )
 
-    return line
+    df = df_raw_books.copy()
+    df.loc[missing, 'toc_cluster'] = df.loc[missing, 'isbn'].map(assigned)
+    duplicates = int((df.loc[missing, 'toc_cluster'] != df.loc[missing, 'isbn']).sum())
+    logging.info(f"Assigned duplicate clusters to {int(missing.sum())} unclustered books "
+                 f"({duplicates} joined another book's cluster).")
+    return df
 
 
-def parse_book_toc(raw_toc, isbn):
+def extract_stored_chapters():
     """
-    보고서 섹션 2.3의 '상태 기반 파서' 구현.
-    책 한 권의 전체 raw_toc를 받아 계층 구조를 파싱합니다.
-    (★ AttributeError: 'NoneType' 수정 포함)
+    수집 시점(Celery 태스크)에 현재 PARSER_VERSION으로 파싱되어 저장된 Chapter 행을 읽어
+    {isbn: [TocNode, ...]} 형태로 반환합니다. 여기에 있는 책은 ETL에서 raw_toc를 다시 파싱하지 않습니다.
     """
-    lines = raw_toc.splitlines()
+    try:
+        engine = get_db_engine("ingestion")
+        query = text(
+            'SELECT b.isbn, c.level, c.number, c.title, c.source_line '
+            'FROM books_chapter c JOIN books_book b ON b.id = c.book_id '
+            'WHERE b.toc_parser_version = :parser_version '
+            'ORDER BY b.isbn, c."order"'
+        )
 
-    root_node = {"isbn": isbn, "number": "0", "title": "BOOK_ROOT", "level": 0, "children": [], "source_line": 0}
-    stack = [root_node]
+        stored_nodes = {}
+        with engine.connect() as connection:
+            for isbn, level, number, title, source_line in connection.execute(query, {"parser_version": PARSER_VERSION}):
+                stored_nodes.setdefault(isbn, []).append(TocNode(isbn, level, number, title, source_line))
+        logging.info(f"Loaded stored chapters for {len(stored_nodes)} books (parser version {PARSER_VERSION}).")
+        return stored_nodes
+    except Exception as e:
+        logging.error(f"Error extracting stored chapters from ingestion DB: {e}")
+        return {}
 
-    parsed_nodes = []
-    failed_lines = []
 
-    for i, raw_line in enumerate(lines):
-        line_num = i + 1
-        line = preprocess_line(raw_line)
+def nodes_to_frame(nodes):
+    """TocNode 리스트를 (isbn, level, number, title, source_line) 컬럼의 DataFrame으로 변환합니다."""
+    return pd.DataFrame.from_records([node.as_tuple() for node in nodes], columns=TocNode.__slots__)
 
-        if not line:  # 전처리 결과 빈 라인이거나 노이즈
-            continue
 
-        matched = False
-        # 1. (보고서 섹션 2.2) 규칙집 순회 (★ 업데이트된 규칙집 사용)
-        for (level, pattern) in PATTERNS_RULEBOOK:
-            match = pattern.match(line)
-            if match:
-                data = match.groupdict()
-
-                # --- (★ 수정된 부분: NoneType 오류 방지) ---
-                new_node = {
-                    "isbn": isbn,
-                    "number": (data.get("number") or "").strip(),
-                    "title": (data.get("title") or "").strip(),
-                    "level": level,
-                    "children": [],  # 하위 노드를 가질 수 있음
-                    "source_line": line_num
-                }
-                # --- (수정 끝) ---
-
-                while stack[-1]["level"] >= level:
-                    stack.pop()
-
-                parent = stack[-1]
-                parent["children"].append(new_node)
-                stack.append(new_node)
-                parsed_nodes.append(new_node)
-                matched = True
-                break
-
-        if not matched:
-            # 3. (보고서 ) Fallback: 부제/연속 라인 처리
-            match = FALLBACK_PATTERN.match(line)
-            if match:
-                current_node = stack[-1]
-                if current_node["level"] > 0:
-                    subtitle = match.group('title').strip()
-                    if not current_node["title"]:
-                        current_node["title"] = subtitle
-                    else:
-                        current_node["title"] += f" : {subtitle}"
-                    for node in reversed(parsed_nodes):
-                        if node["source_line"] == current_node["source_line"]:
-                            node["title"] = current_node["title"]
-                            break
-                    matched = True
-
-        if not matched:
-            logging.warning(f"Unmatched line for ISBN {isbn} (Line {line_num}): {line}")
-            failed_lines.append({
-                "isbn": isbn,
-                "line_num": line_num,
-                "line_content": line
-            })
-
-    return parsed_nodes, failed_lines
-
-
-def run_parsing_pipeline(df):
+def run_parsing_pipeline(df, stored_nodes=None, parse_cache=None, profile=None):
     """
     모든 책 DataFrame을 순회하며 '상태 기반 파서'를 실행합니다.
     (기존 parse_all_tocs 대체)
+    stored_nodes에 있는 책(수집 시점에 같은 파서 버전으로 파싱된 책)은 저장된 Chapter를 그대로 사용하고,
+    parse_cache가 주어지면 목차 텍스트와 규칙집이 그대로인 책은 캐시된 파싱 결과를 사용합니다.
+    profile(RulebookProfile)이 주어지면 모든 책을 실제로 파싱하여(저장된 Chapter/캐시 미사용)
+    패턴별 통계를 모으고, 끝에 보고서를 로그로 남깁니다.
     """
     logging.info("Starting new hierarchical parsing pipeline...")
 
+    if profile is not None:
+        stored_nodes, parse_cache = None, None
+    stored_nodes = stored_nodes or {}
     all_successful_nodes = []
     all_failed_lines = []
+    reused_books = 0
 
-    for index, row in df.iterrows():
-        raw_toc = row['raw_toc']
-        book_isbn = row['isbn']
+    for row in df.itertuples(index=False):
+        raw_toc = row.raw_toc
+        book_isbn = row.isbn
+
+        if book_isbn in stored_nodes:
+            all_successful_nodes.extend(stored_nodes[book_isbn])
+            reused_books += 1
+            continue
 
         if not isinstance(raw_toc, str):
             continue
 
-        nodes, failures = parse_book_toc(raw_toc, book_isbn)
+        if parse_cache is not None:
+            nodes, failures = parse_cache.parse(raw_toc, book_isbn)
+        else:
+            nodes, failures = parse_book_toc(raw_toc, book_isbn, profile)
 
         all_successful_nodes.extend(nodes)
         all_failed_lines.extend(failures)
 
     logging.info(
-        f"Hierarchical parsing complete. Success: {len(all_successful_nodes)} nodes, Failure: {len(all_failed_lines)} lines.")
+        f"Hierarchical parsing complete. Success: {len(all_successful_nodes)} nodes, Failure: {len(all_failed_lines)} lines. "
+        f"(Reused stored chapters for {reused_books} books, parsed {len(df) - reused_books})")
+    if parse_cache is not None:
+        parse_cache.commit()
+        logging.info(f"Parse cache: {parse_cache.hits} hits, {parse_cache.misses} misses (version {PARSER_VERSION}).")
+    if profile is not None:
+        logging.info(profile.report())
     return all_successful_nodes, all_failed_lines
 
 
-def save_results(successful_nodes, failed_lines, output_dir="parsing_results"):
+def save_results(df_nodes, df_failures, embedding_batches, output_dir="parsing_results"):
     """
-    파싱 성공 노드(CSV) 및 실패 라인(CSV, log)을 파일로 저장합니다.
-    (★ DataFrame 생성 방식 개선)
+    파싱 결과를 컬럼 포맷으로 저장합니다.
+    - structured_toc_nodes.parquet : 파싱 노드 (node_id = 임베딩 배열의 행 번호)
+    - toc_embeddings.npy           : node_id 순서로 정렬된 연속 임베딩 배열 (np.load(..., mmap_mode='r')로 zero-copy 로딩)
+    - parsing_failures.parquet/log : 파싱 실패 라인
+
+    embedding_batches는 df_nodes 순서대로 이어붙일 2차원 배열들의 목록이며,
+    전체를 메모리에 합치지 않고 memmap 파일에 배치 단위로 복사합니다.
+    비어 있으면 임베딩 파일을 쓰지 않고, 이전 실행의 임베딩 파일은 새 node_id와 맞지 않으므로 지웁니다.
     """
     os.makedirs(output_dir, exist_ok=True)
 
-    if successful_nodes:
-        logging.info(f"Saving {len(successful_nodes)} successful nodes to {output_dir}/structured_toc_nodes.csv...")
+    if not df_nodes.empty:
+        logging.info(f"Saving {len(df_nodes)} successful nodes to {output_dir}/{NODES_FILENAME}...")
         try:
-            cols = ["isbn", "level", "number", "title", "source_line"]
-            df_success = pd.DataFrame(successful_nodes, columns=cols)
-
-            output_path = os.path.join(output_dir, "structured_toc_nodes.csv")
-            df_success.to_csv(output_path, index=False, encoding='utf-8-sig')
-            logging.info(f"Successfully saved to {output_path}")
+            df_nodes = df_nodes.reset_index(drop=True)
+            df_nodes.insert(0, "node_id", np.arange(len(df_nodes), dtype=np.int64))
+            output_path = os.path.join(output_dir, NODES_FILENAME)
+            df_nodes.to_parquet(output_path, index=False)
+
+            if embedding_batches:
+                embeddings_path = os.path.join(output_dir, EMBEDDINGS_FILENAME)
+                embedding_dim = embedding_batches[0].shape[1]
+                store = np.lib.format.open_memmap(
+                    f"{embeddings_path}.tmp", mode="w+", dtype=ETL_EMBEDDING_DTYPE, shape=(len(df_nodes), embedding_dim)
+                )
+                offset = 0
+                for batch in embedding_batches:
+                    store[offset:offset + len(batch)] = batch
+                    offset += len(batch)
+                store.flush()
+                del store
+                os.replace(f"{embeddings_path}.tmp", embeddings_path)
+                logging.info(f"Successfully saved to {output_path} and {embeddings_path} ({ETL_EMBEDDING_DTYPE})")
+            else:
+                # 임베딩 모델을 불러오지 못한 실행: 파싱 노드만 저장합니다.
+                embeddings_path = os.path.join(output_dir, EMBEDDINGS_FILENAME)
+                if os.path.exists(embeddings_path):
+                    os.remove(embeddings_path)
+                    logging.warning(f"Removed stale {embeddings_path} (it does not match the new nodes).")
+                logging.warning(f"No embeddings to save. Saved nodes only to {output_path}.")
         except Exception as e:
             logging.error(f"Failed to save successful nodes: {e}")
 
-    if failed_lines:
-        logging.info(f"Saving {len(failed_lines)} failed lines to {output_dir}/parsing_failures.csv/log...")
+    if not df_failures.empty:
+        logging.info(f"Saving {len(df_failures)} failed lines to {output_dir}/parsing_failures.parquet/log...")
         try:
-            df_failures = pd.DataFrame(failed_lines)
-            output_path_csv = os.path.join(output_dir, "parsing_failures.csv")
-            df_failures.to_csv(output_path_csv, index=False, encoding='utf-8-sig')
+            output_path_parquet = os.path.join(output_dir, "parsing_failures.parquet")
+            df_failures.to_parquet(output_path_parquet, index=False)
 
             output_path_log = os.path.join(output_dir, "parsing_failures.log")
             with open(output_path_log, "w", encoding="utf-8") as f:
-                for item in failed_lines:
-                    f.write(f"ISBN: {item['isbn']}, Line: {item['line_num']}, Content: {item['line_content']}\n")
-            logging.info(f"Successfully saved failure logs to {output_path_csv} and {output_path_log}")
+                for item in df_failures.itertuples(index=False):
+                    f.write(f"ISBN: {item.isbn}, Line: {item.line_num}, Content: {item.line_content}\n")
+            logging.info(f"Successfully saved failure logs to {output_path_parquet} and {output_path_log}")
         except Exception as e:
             logging.error(f"Failed to save failed lines: {e}")
 
 
+def load_results(output_dir="parsing_results", mmap_mode="r"):
+    """
+    save_results가 저장한 (노드 DataFrame, 임베딩 배열)을 읽어옵니다.
+    임베딩은 memmap으로 열리므로 필요한 행만 디스크에서 읽힙니다. embeddings[node_id]가 해당 노드의 벡터입니다.
+    두 파일의 행 수가 다르면(다른 실행에서 저장된 파일) ValueError를 냅니다.
+    """
+    nodes_path = os.path.join(output_dir, NODES_FILENAME)
+    embeddings_path = os.path.join(output_dir, EMBEDDINGS_FILENAME)
+    df_nodes = pd.read_parquet(nodes_path)
+    embeddings = np.load(embeddings_path, mmap_mode=mmap_mode)
+    if len(embeddings) != len(df_nodes):
+        raise ValueError(
+            f"{embeddings_path} has {len(embeddings)} rows but {nodes_path} has {len(df_nodes)} nodes "
+            f"(files are from different runs)."
+        )
+    return df_nodes, embeddings
+
+
 # --- (★ 신규) RAG DB 연결 엔진 생성 ---
 def get_rag_db_engine():
     """
     docker-compose.yml에 정의된 'postgres_rag_db' 서비스에 연결하는
-    새로운 SQLAlchemy 엔진을 반환합니다.
+    공유 SQLAlchemy 엔진을 반환합니다. (get_db_engine 참고)
     """
-    db_user = os.getenv("POSTGRES_USER")
-    db_password = os.getenv("POSTGRES_PASSWORD")
-    db_name = os.getenv("POSTGRES_DB")
-    db_host = "postgres_rag_db"  # docker-compose.yml의 RAG DB 서비스 이름
-    db_port = "5432"  # 컨테이너 내부 포트
-
-    logging.info(f"Connecting to RAG database ({db_host})...")
+    logging.info(f"Connecting to RAG database ({DB_HOSTS['rag']})...")
     try:
-        engine = create_engine(
-            f"postgresql+psycopg2://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
-        )
+        engine = get_db_engine("rag")
         # # pgvector 익스텐션 활성화
         # with engine.connect() as connection:
         #     connection.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
@@ -353,24 +370,31 @@ def get_rag_db_engine():
 
 
 # --- (★ 신규) RAG DB 테이블 스키마 정의 및 생성 ---
-def create_rag_db_table(engine):
+def create_rag_db_table(engine, table_name="toc_chunks"):
     """
     최종 임베딩된 목차 청크를 저장할 테이블을 RAG DB에 생성합니다.
     보고서의 VectorField(dimensions=768) [cite: 19]를 참조합니다.
+    (table_name은 벤치마크처럼 별도 테이블에 적재하거나 스트리밍 전송의 staging 테이블을 만들 때만 바꿉니다.)
     """
     metadata = MetaData()
+    id_seq = Sequence(f'{table_name}_id_seq')
 
     # 'toc_chunks' 테이블 정의
     toc_chunks = Table(
-        'toc_chunks',
+        table_name,
         metadata,
-        Column('id', Integer, Sequence('toc_chunks_id_seq'), primary_key=True),
+        # to_sql/COPY는 id를 보내지 않으므로 DB 기본값(nextval)으로 채웁니다.
+        Column('id', Integer, id_seq, server_default=id_seq.next_value(), primary_key=True),
         Column('isbn', String(13), index=True),
         Column('level', Integer),
         Column('number', String(50)),
         Column('chapter_title', String(1024)),
         Column('composite_text', String),  # 임베딩에 사용된 원본 텍스트
-        Column('embedding', Vector(768))  # ko-sroberta-multitask 모델 차원 [cite: 20]
+        # 중복 클러스터 대표 ISBN. 조회 시 같은 클러스터의 결과를 하나로 접는 데 사용합니다.
+        Column('toc_cluster', String(13), index=True),
+        # ko-sroberta-multitask 모델 차원 [cite: 20]. halfvec 모드에서만 float16 컬럼을 사용합니다.
+        Column('embedding', HALFVEC(EMBEDDING_DIMENSIONS) if TOC_CHUNKS_STORAGE == "halfvec"
+               else Vector(EMBEDDING_DIMENSIONS))
     )
 
     try:
@@ -387,6 +411,15 @@ def create_rag_db_table(engine):
             # (참고: psycopg2.errors.DuplicateTable 예외를 피하기 위해
             # metadata.create_all은 이미 테이블이 있으면 생성하지 않습니다.)
 
+            # 3. 기존 테이블의 임베딩 컬럼 타입이 TOC_CHUNKS_STORAGE와 다르면 변환하고, 나중에 추가된 컬럼을 채웁니다.
+            migrate_toc_chunks_storage(connection, toc_chunks.name)
+            connection.execute(text(
+                f"ALTER TABLE {toc_chunks.name} ALTER COLUMN id SET DEFAULT nextval('{id_seq.name}')"))
+            connection.execute(text(f"ALTER TABLE {toc_chunks.name} ADD COLUMN IF NOT EXISTS toc_cluster VARCHAR(13)"))
+            connection.execute(text(
+                f"CREATE INDEX IF NOT EXISTS ix_{toc_chunks.name}_toc_cluster ON {toc_chunks.name} (toc_cluster)"))
+            connection.commit()
+
         # --- (수정 끝) ---
         logging.info(f"Table '{toc_chunks.name}' ensured in RAG DB.")
         return toc_chunks
@@ -396,28 +429,100 @@ def create_rag_db_table(engine):
         return None
 
 
-# --- (★ 신규) 합성 임베딩 생성 함수 ---
-def create_and_embed_chunks(successful_nodes, df_raw_books):
+def migrate_toc_chunks_storage(connection, table_name):
     """
-    파싱된 노드(목차)와 원본 책 정보(제목, 요약)를 결합하여
-    보고서 5.2 [cite: 165]의 '합성 임베딩'을 생성합니다.
+    toc_chunks.embedding 컬럼을 TOC_CHUNKS_STORAGE에 맞는 타입(vector/halfvec)으로 변환합니다.
+    halfvec -> vector로 되돌릴 때는 이미 잘린 정밀도가 복원되지 않으므로, 다음 적재에서 다시 채워집니다.
     """
-    if EMBEDDING_MODEL is None:
-        logging.error("Embedding model is not loaded. Skipping embedding step.")
-        return pd.DataFrame()
+    target_type = f"halfvec({EMBEDDING_DIMENSIONS})" if TOC_CHUNKS_STORAGE == "halfvec" else f"vector({EMBEDDING_DIMENSIONS})"
+    current_type = connection.execute(text(
+        "SELECT format_type(atttypid, atttypmod) FROM pg_attribute "
+        "WHERE attrelid = CAST(:table_name AS regclass) AND attname = 'embedding'"
+    ), {"table_name": table_name}).scalar()
+
+    if current_type and current_type != target_type:
+        logging.info(f"Migrating '{table_name}.embedding' from {current_type} to {target_type}...")
+        # 타입이 바뀌면 기존 HNSW 인덱스의 연산자 클래스와 맞지 않으므로 먼저 제거합니다.
+        for suffix, _ in TOC_CHUNKS_INDEXES.values():
+            connection.execute(text(f"DROP INDEX IF EXISTS {table_name}_{suffix}"))
+        connection.execute(text(
+            f"ALTER TABLE {table_name} ALTER COLUMN embedding TYPE {target_type} USING embedding::{target_type}"
+        ))
+
+
+def ensure_toc_chunks_index(engine, table_name="toc_chunks"):
+    """
+    TOC_CHUNKS_STORAGE에 맞는 HNSW 인덱스를 만들고 다른 저장 방식의 인덱스는 제거합니다.
+    행마다 인덱스를 갱신하지 않도록 적재가 끝난 뒤에 호출합니다. 성공하면 True.
+    """
+    suffix, index_expr = TOC_CHUNKS_INDEXES[TOC_CHUNKS_STORAGE]
+    index_name = f"{table_name}_{suffix}"
+    try:
+        with engine.connect() as connection:
+            for other_suffix, _ in TOC_CHUNKS_INDEXES.values():
+                if other_suffix != suffix:
+                    connection.execute(text(f"DROP INDEX IF EXISTS {table_name}_{other_suffix}"))
+            connection.execute(text(
+                f"CREATE INDEX IF NOT EXISTS {index_name} ON {table_name} "
+                f"USING hnsw ({index_expr}) WITH (m = 16, ef_construction = 64)"
+            ))
+            connection.commit()
+        logging.info(f"Ensured HNSW index '{index_name}' ({TOC_CHUNKS_STORAGE}) on '{table_name}'.")
+        return True
+    except Exception as e:
+        logging.error(f"Failed to create HNSW index '{index_name}': {e}")
+        return False
 
-    logging.info(f"Starting composite embedding for {len(successful_nodes)} nodes...")
 
+def swap_toc_chunks_table(engine, staging_name, table_name="toc_chunks"):
+    """
+    적재와 인덱스 생성이 끝난 staging 테이블로 table_name을 교체합니다.
+    기존 테이블 삭제와 이름 변경만 하는 짧은 트랜잭션이므로, 조회가 막히는 시간은 잠금을 잡고 있는 동안뿐입니다.
+    staging 이름이 들어간 인덱스(기본 키, HNSW 포함)와 id 시퀀스의 이름도 함께 바꿉니다.
+    조회 중인 트랜잭션 때문에 ETL_SWAP_LOCK_TIMEOUT 안에 잠금을 얻지 못하면 예외가 나고 기존 테이블이 그대로 남습니다.
+    """
+    with engine.connect() as connection:
+        connection.execute(text(f"SET LOCAL lock_timeout = '{ETL_SWAP_LOCK_TIMEOUT}'"))
+        index_names = connection.execute(text(
+            "SELECT indexname FROM pg_indexes WHERE schemaname = current_schema() AND tablename = :table_name"
+        ), {"table_name": staging_name}).scalars().all()
+        connection.execute(text(f"DROP TABLE IF EXISTS {table_name}"))
+        connection.execute(text(f"DROP SEQUENCE IF EXISTS {table_name}_id_seq"))
+        connection.execute(text(f"ALTER TABLE {staging_name} RENAME TO {table_name}"))
+        connection.execute(text(f"ALTER SEQUENCE {staging_name}_id_seq RENAME TO {table_name}_id_seq"))
+        for index_name in index_names:
+            if staging_name in index_name:
+                connection.execute(text(
+                    f"ALTER INDEX {index_name} RENAME TO {index_name.replace(staging_name, table_name, 1)}"))
+        connection.commit()
+    logging.info(f"Swapped '{staging_name}' in as '{table_name}'.")
+
+
+# --- (★ 신규) 합성 임베딩 생성 함수 ---
+def composite_text(book_title, chapter_title, summary_text):
+    """보고서 5.2의 합성 텍스트. (checkpoint/stream 두 전송 방식이 같은 텍스트를 임베딩하도록 한 곳에서 만듭니다)"""
+    return f"도서명: {book_title or ''}. 챕터: {chapter_title or ''}. 책소개: {summary_text}"
+
+
+def build_composite_chunks(successful_nodes, df_raw_books):
+    """
+    파싱된 노드(목차)와 원본 책 정보(제목, 요약)를 결합하여
+    보고서 5.2 [cite: 165]의 '합성 텍스트'를 만든 DataFrame을 반환합니다. (임베딩 전 단계)
+    """
     # 1. 파싱된 노드 리스트를 DataFrame으로 변환
-    df_nodes = pd.DataFrame(successful_nodes)
+    df_nodes = nodes_to_frame(successful_nodes)
     if df_nodes.empty:
-        logging.warning("No successful nodes to embed.")
         return pd.DataFrame()
 
-    # 2. 책 정보(제목, 요약)와 목차 노드(챕터 제목)를 병합
+    # 2. 책 정보(제목, 요약, 중복 클러스터)와 목차 노드(챕터 제목)를 병합
+    # 책소개 Fallback에 쓰는 full_description/publisher_description도 함께 병합합니다. (stream 모드와 같은 합성 텍스트)
+    book_columns = [
+        col for col in ('isbn', 'title', 'summary', 'full_description', 'publisher_description', 'toc_cluster')
+        if col in df_raw_books.columns
+    ]
     df_merged = pd.merge(
         df_nodes,
-        df_raw_books[['isbn', 'title', 'summary']],
+        df_raw_books[book_columns],
         on='isbn',
         how='left',
         suffixes=('_chapter', '_book')  # 'title_chapter', 'title_book'
@@ -442,23 +547,125 @@ def create_and_embed_chunks(successful_nodes, df_raw_books):
             # 모두 없으면 빈 문자열
             summary_text = ""
         # -----------------------
-        return f"도서명: {book_title}. 챕터: {chapter_title}. 책소개: {summary_text}"
+        return composite_text(book_title, chapter_title, summary_text)
 
     df_merged['composite_text'] = df_merged.apply(create_composite_text, axis=1)
 
-    # 4. 텍스트 목록을 임베딩
-    texts_to_embed = df_merged['composite_text'].tolist()
-    embeddings = EMBEDDING_MODEL.encode(texts_to_embed, show_progress_bar=True)
+    # 4. RAG DB에 저장할 컬럼 선택 및 이름 변경 (source_line은 파싱 결과 저장용)
+    df_chunks = df_merged.rename(columns={'title_chapter': 'chapter_title'})
+    if 'toc_cluster' not in df_chunks.columns:
+        df_chunks['toc_cluster'] = df_chunks['isbn']
+    chunk_columns = ['isbn', 'level', 'number', 'chapter_title', 'source_line', 'toc_cluster', 'composite_text']
+    return df_chunks[[col for col in chunk_columns if col in df_chunks.columns]]
+
+
+def encode_unique(model, texts, show_progress_bar=True):
+    """
+    서로 다른 텍스트만 임베딩한 뒤 입력 순서대로 펼친 (len(texts), dim) 배열을 반환합니다.
+    같은 중복 클러스터의 개정판/세트 도서는 제목과 책소개가 같아 합성 텍스트가 그대로 겹치는 경우가 많습니다.
+    """
+    unique_index = {}
+    positions = np.fromiter((unique_index.setdefault(t, len(unique_index)) for t in texts), dtype=np.int64, count=len(texts))
+    unique_embeddings = np.asarray(model.encode(list(unique_index), show_progress_bar=show_progress_bar))
+    if len(unique_index) < len(texts):
+        logging.info(f"Reused embeddings for {len(texts) - len(unique_index)} of {len(texts)} duplicate composite texts.")
+    return unique_embeddings[positions]
+
+
+def create_and_embed_chunks(successful_nodes, df_raw_books):
+    """
+    파싱된 노드(목차)와 원본 책 정보(제목, 요약)를 결합하여
+    보고서 5.2 [cite: 165]의 '합성 임베딩'을 생성합니다.
+    """
+    model = get_embedding_model()
+    if model is None:
+        logging.error("Embedding model is not loaded. Skipping embedding step.")
+        return pd.DataFrame()
+
+    logging.info(f"Starting composite embedding for {len(successful_nodes)} nodes...")
+
+    df_chunks = build_composite_chunks(successful_nodes, df_raw_books)
+    if df_chunks.empty:
+        logging.warning("No successful nodes to embed.")
+        return pd.DataFrame()
+
+    # 텍스트 목록을 임베딩하여 DataFrame에 추가
+    embeddings = encode_unique(model, df_chunks['composite_text'].tolist())
+    df_chunks['embedding'] = list(embeddings)
+
+    final_columns = ['isbn', 'level', 'number', 'chapter_title', 'toc_cluster', 'composite_text', 'embedding']
+    logging.info(f"Embedding generation complete for {len(df_chunks)} chunks.")
+    return df_chunks[final_columns]
+
+
+# --- 체크포인트 기반 파싱 + 임베딩 파이프라인 ---
+def run_checkpointed_pipeline(df_raw_books, spool_dir, batch_size=ETL_BATCH_SIZE, stored_nodes=None, parse_cache=None):
+    """
+    책을 (중복 클러스터, ISBN) 순으로 batch_size권씩 나누어 [파싱 -> 합성 텍스트 -> 임베딩]을 수행하고,
+    배치가 끝날 때마다 결과를 스풀(spool_dir)에 기록합니다.
+    재실행 시 입력이 바뀌지 않은 배치는 스풀에서 그대로 읽어오므로 마지막 완료 배치부터 이어서 진행됩니다.
+    stored_nodes는 extract_stored_chapters()의 결과이며, 해당 책은 재파싱하지 않습니다.
+    parse_cache(ParseCache)가 주어지면 배치가 다시 처리되더라도 목차가 바뀌지 않은 책은 재파싱하지 않습니다.
+    같은 클러스터의 책이 같은 배치에 모이므로 배치 안에서 겹치는 합성 텍스트는 한 번만 임베딩됩니다. (encode_unique)
 
-    # 5. DataFrame에 임베딩 벡터 추가
-    df_merged['embedding'] = list(embeddings)
+    임베딩 모델을 불러오지 못하면 파싱과 합성 텍스트까지만 수행하고 임베딩 배열 목록은 비워서 반환합니다.
+    (임베딩이 없는 배치는 완료로 기록하지 않도록 이때는 스풀을 사용하지 않습니다)
 
-    # 6. RAG DB에 저장할 최종 컬럼 선택 및 이름 변경
-    df_final_chunks = df_merged.rename(columns={'title_chapter': 'chapter_title'})
-    final_columns = ['isbn', 'level', 'number', 'chapter_title', 'composite_text', 'embedding']
+    반환값: (파싱 노드 DataFrame, 실패 라인 DataFrame, 노드 순서대로 정렬된 배치별 임베딩 배열 목록)
+    """
+    model = get_embedding_model()
+    if model is None:
+        logging.error("Embedding model is not loaded. Parsing without embeddings (checkpoint spool not used).")
+        nodes, failures = run_parsing_pipeline(df_raw_books, stored_nodes, parse_cache)
+        df_nodes = build_composite_chunks(nodes, df_raw_books).rename(columns={'chapter_title': 'title'})
+        return df_nodes, pd.DataFrame(failures, columns=["isbn", "line_num", "line_content"]), []
+
+    spool = CheckpointSpool(spool_dir, EMBEDDING_MODEL_NAME)
+    embedding_dim = model.get_sentence_embedding_dimension()
+
+    sort_columns = ['toc_cluster', 'isbn'] if 'toc_cluster' in df_raw_books.columns else ['isbn']
+    df_sorted = df_raw_books.sort_values(sort_columns).reset_index(drop=True)
+    num_batches = (len(df_sorted) + batch_size - 1) // batch_size
+    batch_keys = []
+
+    for batch_index, start in enumerate(range(0, len(df_sorted), batch_size)):
+        df_batch = df_sorted.iloc[start:start + batch_size]
+        batch_key = compute_batch_key(df_batch, EMBEDDING_MODEL_NAME, PARSER_VERSION)
+        batch_keys.append(batch_key)
+
+        if spool.is_complete(batch_key):
+            logging.info(f"Batch {batch_index + 1}/{num_batches} ({batch_key}) already checkpointed. Skipping.")
+            continue
 
-    logging.info(f"Embedding generation complete for {len(df_final_chunks)} chunks.")
-    return df_final_chunks[[col for col in final_columns if col in df_final_chunks.columns]]
+        logging.info(f"Processing batch {batch_index + 1}/{num_batches} ({batch_key}, {len(df_batch)} books)...")
+        nodes, failures = run_parsing_pipeline(df_batch, stored_nodes, parse_cache)
+
+        df_nodes = build_composite_chunks(nodes, df_batch)
+        if df_nodes.empty:
+            embeddings = np.empty((0, embedding_dim), dtype=np.float32)
+        else:
+            embeddings = encode_unique(model, df_nodes['composite_text'].tolist())
+        df_failures = pd.DataFrame(failures, columns=["isbn", "line_num", "line_content"])
+
+        spool.write_batch(batch_key, df_nodes, df_failures, embeddings)
+        logging.info(f"Checkpointed batch {batch_index + 1}/{num_batches}: {len(df_nodes)} nodes.")
+
+    spool.prune(batch_keys)
+
+    # 스풀에 저장된 배치를 순서대로 읽습니다. (임베딩은 memmap 상태로 유지)
+    node_frames, failure_frames, embedding_batches = [], [], []
+    for batch_key in batch_keys:
+        df_nodes, df_failures, embeddings = spool.read_batch(batch_key)
+        node_frames.append(df_nodes)
+        failure_frames.append(df_failures)
+        embedding_batches.append(embeddings.reshape(len(df_nodes), embedding_dim))
+
+    if not node_frames:
+        return pd.DataFrame(), pd.DataFrame(), []
+
+    df_all_nodes = pd.concat(node_frames, ignore_index=True).rename(columns={'chapter_title': 'title'})
+    df_all_failures = pd.concat(failure_frames, ignore_index=True)
+    return df_all_nodes, df_all_failures, embedding_batches
 
 
 # --- (★ 신규) RAG DB에 데이터 적재 함수 ---
@@ -470,9 +677,33 @@ def load_chunks_to_rag_db(engine, table, df_chunks):
     if df_chunks.empty:
         logging.warning("No chunks to load into RAG DB.")
         return
+    _load_frames_to_rag_db(engine, table.name, [df_chunks], len(df_chunks))
 
-    table_name = table.name
-    logging.info(f"Loading {len(df_chunks)} chunks into RAG DB table '{table_name}'...")
+
+def load_saved_chunks_to_rag_db(engine, table, df_nodes, embeddings, slice_size=ETL_LOAD_SLICE_SIZE):
+    """
+    save_results가 저장한 노드(node_id 순)와 memmap 임베딩을 slice_size행씩 잘라 적재합니다.
+    한 번에 slice_size행의 벡터만 메모리로 읽으므로 전체 임베딩 배열을 올리지 않습니다.
+    """
+    if df_nodes.empty:
+        logging.warning("No chunks to load into RAG DB.")
+        return
+    df_chunks = df_nodes.rename(columns={'title': 'chapter_title'})[
+        ['isbn', 'level', 'number', 'chapter_title', 'toc_cluster', 'composite_text']
+    ]
+
+    def slices():
+        for start in range(0, len(df_chunks), slice_size):
+            df_slice = df_chunks.iloc[start:start + slice_size].copy()
+            df_slice['embedding'] = list(np.asarray(embeddings[start:start + slice_size], dtype=np.float32))
+            yield df_slice
+
+    _load_frames_to_rag_db(engine, table.name, slices(), len(df_chunks))
+
+
+def _load_frames_to_rag_db(engine, table_name, frames, total):
+    """TRUNCATE 후 frames를 차례로 to_sql로 삽입하고, 모두 성공하면 한 번에 커밋합니다."""
+    logging.info(f"Loading {total} chunks into RAG DB table '{table_name}'...")
 
     try:
         with engine.connect() as connection:
@@ -480,20 +711,226 @@ def load_chunks_to_rag_db(engine, table, df_chunks):
             connection.execute(text(f"TRUNCATE TABLE {table_name} RESTART IDENTITY"))
             logging.info(f"Truncated table '{table_name}'.")
 
-            # DataFrame을 DB에 삽입 (pgvector가 numpy 배열을 자동 변환)
-            df_chunks.to_sql(
-                table_name,
-                connection,
-                if_exists='append',
-                index=False,
-                chunksize=1000  # 대용량 데이터를 위해 청크 단위로 삽입
-            )
-            logging.info(f"Successfully loaded {len(df_chunks)} chunks into '{table_name}'.")
+            loaded = 0
+            for df_frame in frames:
+                # DataFrame을 DB에 삽입 (pgvector가 numpy 배열을 자동 변환)
+                df_frame.to_sql(
+                    table_name,
+                    connection,
+                    if_exists='append',
+                    index=False,
+                    chunksize=1000  # 대용량 데이터를 위해 청크 단위로 삽입
+                )
+                loaded += len(df_frame)
+            connection.commit()
+            logging.info(f"Successfully loaded {loaded} chunks into '{table_name}'.")
 
     except Exception as e:
         logging.error(f"Failed to load data into RAG DB: {e}")
 
 
+# --- 스트리밍 전송 (ETL_TRANSFER_MODE=stream) ---
+# ingestion DB의 서버 측 커서에서 받은 튜플을 그대로 파싱하고, 청크를 ETL_STREAM_EMBED_BATCH개씩 임베딩하여
+# 바이너리 COPY로 RAG DB에 보냅니다. 책/청크 단위로 흘려보내므로 메모리 사용량은 전체 책 수와 무관합니다.
+STREAM_EXTRACT_SQL = (
+    "SELECT b.isbn, b.title, c.raw_toc, b.summary, c.full_description, c.publisher_description, "
+    "COALESCE(NULLIF(b.toc_cluster, ''), b.isbn) AS toc_cluster, "
+    # MB/s 계산용 원본 바이트 수 (클라이언트에서 문자열을 다시 인코딩하지 않도록 서버에서 계산)
+    "octet_length(b.title) + octet_length(c.raw_toc) + COALESCE(octet_length(b.summary), 0) "
+    "+ COALESCE(octet_length(c.full_description), 0) + COALESCE(octet_length(c.publisher_description), 0) "
+    "FROM books_book b JOIN books_bookcontent c ON c.book_id = b.id "
+    "WHERE c.raw_toc IS NOT NULL AND c.raw_toc != '' "
+    # 같은 중복 클러스터의 책이 같은 임베딩 배치에 모이도록 정렬합니다. (encode_unique)
+    "ORDER BY 7, b.isbn"
+)
+# 수집 시점에 중복 클러스터가 정해지지 않은 책만 ISBN 순으로 먼저 읽어 cluster_unclustered_tocs로 묶습니다.
+# (checkpoint 모드의 assign_toc_clusters와 같은 결과. 이 책들의 목차만 메모리에 올라갑니다)
+STREAM_UNCLUSTERED_SQL = (
+    "SELECT b.isbn, c.raw_toc "
+    "FROM books_book b JOIN books_bookcontent c ON c.book_id = b.id "
+    "WHERE c.raw_toc IS NOT NULL AND c.raw_toc != '' AND (b.toc_cluster IS NULL OR b.toc_cluster = '') "
+    "ORDER BY b.isbn"
+)
+
+
+def _stream_chunk_batches(cursor, model, encoder, parse_cache, failure_log, stats, stored_nodes=None, clusters=None):
+    """
+    커서의 책 튜플 -> 청크 튜플 -> 임베딩 -> 바이너리 COPY 조각(bytes)을 차례로 냅니다.
+    checkpoint 모드(run_parsing_pipeline + build_composite_chunks)와 같은 청크를 만들도록,
+    stored_nodes(extract_stored_chapters)에 있는 책은 저장된 Chapter를 그대로 쓰고,
+    clusters({isbn: 클러스터 ID}, cluster_unclustered_tocs)에 있는 책은 그 클러스터를 씁니다.
+    """
+    stored_nodes = stored_nodes or {}
+    clusters = clusters or {}
+    pending = []
+
+    def flush():
+        embeddings = encode_unique(model, [row[5] for row in pending], show_progress_bar=False)
+        stats["chunks"] += len(pending)
+        return encoder.encode_batch(pending, embeddings)
+
+    for isbn, title, raw_toc, summary, full_description, publisher_description, toc_cluster, source_bytes in cursor:
+        stats["books"] += 1
+        stats["source_bytes"] += source_bytes or 0
+        toc_cluster = clusters.get(isbn, toc_cluster)
+        if isbn in stored_nodes:
+            nodes, failures = stored_nodes[isbn], []
+            stats["reused_books"] += 1
+        elif parse_cache is not None:
+            nodes, failures = parse_cache.parse(raw_toc, isbn)
+        else:
+            nodes, failures = parse_book_toc(raw_toc, isbn)
+        stats["failed_lines"] += len(failures)
+        for item in failures:
+            failure_log.write(f"ISBN: {item['isbn']}, Line: {item['line_num']}, Content: {item['line_content']}\n")
+
+        # 책소개 Fallback: summary -> full_description -> publisher_description (build_composite_chunks와 동일)
+        summary_text = summary or full_description or publisher_description or ""
+        for node in nodes:
+            pending.append((isbn, node.level, node.number, node.title, toc_cluster,
+                            composite_text(title, node.title, summary_text)))
+        if len(pending) >= ETL_STREAM_EMBED_BATCH:
+            yield flush()
+            pending = []
+            logging.info(f"Streamed {stats['books']} books / {stats['chunks']} chunks...")
+    if pending:
+        yield flush()
+
+
+def _peak_rss_mb():
+    # Linux의 ru_maxrss 단위는 KB입니다.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_streaming_transfer(output_dir, parse_cache=None, stored_nodes=None):
+    """
+    ingestion DB -> 파서 -> 임베딩 -> RAG DB를 DataFrame 없이 스트리밍으로 전송합니다.
+    - 추출: 이름 있는(서버 측) 커서로 ETL_STREAM_FETCH_SIZE권씩 받아옵니다. (전체 결과를 클라이언트에 올리지 않음)
+    - 변환: 책마다 parse_book_toc(또는 parse_cache)를 실행하고 청크를 평범한 튜플로 만듭니다.
+      checkpoint 모드와 같은 청크가 적재되도록 stored_nodes(extract_stored_chapters)에 있는 책은 재파싱하지 않고,
+      수집 시점에 클러스터가 없던 책은 먼저 STREAM_UNCLUSTERED_SQL로 읽어 메모리 안에서 묶습니다.
+    - 적재: 바이너리 COPY로 staging 테이블(toc_chunks_new)에 쓰고 HNSW 인덱스까지 만든 뒤 toc_chunks와 교체합니다.
+      적재/인덱스 생성 동안 기존 toc_chunks는 잠기지 않고 그대로 조회되며, 실패하면 기존 테이블이 그대로 남습니다.
+    체크포인트 스풀을 쓰지 않으므로 중간에 실패하면 처음부터 다시 실행합니다.
+    파싱 실패 라인은 output_dir/parsing_failures.log에 씁니다.
+
+    반환값: 통계 dict (books, reused_books, chunks, failed_lines, source_mb, copy_mb, seconds, peak_rss_mb) 또는 실패 시 None
+    """
+    model = get_embedding_model()
+    if model is None:
+        logging.error("Embedding model is not loaded. Skipping streaming transfer.")
+        return None
+    rag_engine = get_rag_db_engine()
+    if rag_engine is None:
+        return None
+    table_name = "toc_chunks"
+    staging_name = f"{table_name}{TOC_CHUNKS_STAGING_SUFFIX}"
+    try:
+        # 이전 실행이 교체 전에 실패하여 남긴 staging 테이블을 지우고 새로 만듭니다.
+        with rag_engine.connect() as connection:
+            connection.execute(text(f"DROP TABLE IF EXISTS {staging_name}"))
+            connection.execute(text(f"DROP SEQUENCE IF EXISTS {staging_name}_id_seq"))
+            connection.commit()
+    except Exception as e:
+        logging.error(f"Failed to drop staging table '{staging_name}': {e}")
+        return None
+    rag_table = create_rag_db_table(rag_engine, staging_name)
+    if rag_table is None:
+        return None
+
+    encoder = ChunkCopyEncoder(model.get_sentence_embedding_dimension(), half=TOC_CHUNKS_STORAGE == "halfvec")
+    copy_sql = (f"COPY {rag_table.name} ({', '.join(ChunkCopyEncoder.COLUMNS)}) "
+                f"FROM STDIN WITH (FORMAT binary)")
+    stats = {"books": 0, "chunks": 0, "failed_lines": 0, "source_bytes": 0, "reused_books": 0}
+    rss_before = _peak_rss_mb()
+
+    logging.info(f"Starting streaming transfer into '{rag_table.name}' "
+                 f"(fetch {ETL_STREAM_FETCH_SIZE} books, embed {ETL_STREAM_EMBED_BATCH} chunks per batch)...")
+    started = time.perf_counter()
+    source = get_db_engine("ingestion").raw_connection()
+    target = rag_engine.raw_connection()
+    try:
+        with open(os.path.join(output_dir, "parsing_failures.log"), "w", encoding="utf-8") as failure_log:
+            unclustered = source.cursor(name="bookroad_etl_unclustered")
+            unclustered.itersize = ETL_STREAM_FETCH_SIZE
+            unclustered.execute(STREAM_UNCLUSTERED_SQL)
+            clusters = cluster_unclustered_tocs(unclustered)
+            unclustered.close()
+            if clusters:
+                logging.info(f"Assigned duplicate clusters to {len(clusters)} unclustered books.")
+
+            cursor = source.cursor(name="bookroad_etl_stream")
+            cursor.itersize = ETL_STREAM_FETCH_SIZE
+            cursor.execute(STREAM_EXTRACT_SQL)
+
+            stream = IteratorFile(itertools.chain(
+                [COPY_HEADER],
+                _stream_chunk_batches(cursor, model, encoder, parse_cache, failure_log, stats, stored_nodes, clusters),
+                [COPY_TRAILER],
+            ))
+            copy_cursor = target.cursor()
+            copy_cursor.copy_expert(copy_sql, stream, size=ETL_COPY_READ_SIZE)
+            copy_cursor.close()
+            target.commit()
+            cursor.close()
+    except Exception as e:
+        logging.error(f"Streaming transfer failed after {stats['books']} books: {e}")
+        return None
+    finally:
+        # 풀에 반납될 때 커밋되지 않은 트랜잭션(읽기 트랜잭션, 실패한 COPY)은 롤백됩니다.
+        source.close()
+        target.close()
+    if parse_cache is not None:
+        parse_cache.commit()
+    elapsed = time.perf_counter() - started  # 전송 처리량(MB/s)에는 인덱스 생성/교체 시간을 넣지 않습니다.
+
+    # 인덱스를 staging 테이블에 만든 뒤 교체하므로, 교체 직후부터 toc_chunks 조회가 인덱스를 사용합니다.
+    if not ensure_toc_chunks_index(rag_engine, staging_name):
+        return None
+    try:
+        swap_toc_chunks_table(rag_engine, staging_name, table_name)
+    except Exception as e:
+        logging.error(f"Failed to swap '{staging_name}' into '{table_name}' (existing table kept): {e}")
+        return None
+
+    result = {
+        "books": stats["books"],
+        "reused_books": stats["reused_books"],
+        "chunks": stats["chunks"],
+        "failed_lines": stats["failed_lines"],
+        "source_mb": stats["source_bytes"] / 1e6,
+        "copy_mb": stream.bytes_read / 1e6,
+        "seconds": elapsed,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+    logging.info(
+        f"Streaming transfer complete: {result['books']} books -> {result['chunks']} chunks "
+        f"({result['failed_lines']} unmatched lines, reused stored chapters for {result['reused_books']} books) "
+        f"in {elapsed:.1f}s. "
+        f"Source {result['source_mb']:.1f}MB ({result['source_mb'] / max(elapsed, 1e-9):.2f} MB/s), "
+        f"COPY {result['copy_mb']:.1f}MB ({result['copy_mb'] / max(elapsed, 1e-9):.2f} MB/s), "
+        f"peak RSS {result['peak_rss_mb']:.0f}MB (before transfer {rss_before:.0f}MB)."
+    )
+    return result
+
+
+# --- 검색 결과 캐시 무효화 ---
+def bump_search_cache_generation():
+    """
+    ingestion_service 검색 API의 결과 캐시 세대(bookroad:search:generation)를 올립니다.
+    SEARCH_CACHE_URL이 설정되지 않았으면 아무것도 하지 않습니다.
+    """
+    cache_url = os.getenv("SEARCH_CACHE_URL")
+    if not cache_url:
+        return
+    try:
+        import redis
+        generation = redis.Redis.from_url(cache_url).incr(SEARCH_CACHE_GENERATION_KEY)
+        logging.info(f"Bumped search cache generation to {generation}.")
+    except Exception as e:
+        logging.warning(f"Failed to bump search cache generation: {e}")
+
+
 # --- (★ 수정) 메인 실행 로직 ---
 if __name__ == "__main__":
     OUTPUT_DIR = "parsing_results"
@@ -511,34 +948,59 @@ if __name__ == "__main__":
 
     logging.info("ETL process started with NEW hierarchical parser.")
 
-    # 1. (수정) 데이터 추출 (summary 포함)
-    df_raw_books = extract_raw_tocs()
-
-    if not df_raw_books.empty:
-        # 2. 데이터 파싱 (기존과 동일)
-        successful_nodes, failed_lines = run_parsing_pipeline(df_raw_books)
-
-        # 3. 파싱 결과 파일로 저장 (기존과 동일 - 디버깅/로그용)
-        save_results(successful_nodes, failed_lines, output_dir=OUTPUT_DIR)
-
-        # --- (★ 신규) 임베딩 및 RAG DB 적재 파이프라인 ---
-        if not successful_nodes:
-            logging.warning("No successful nodes found from parsing. Stopping ETL.")
-        else:
-            # 4. RAG DB 연결
-            rag_engine = get_rag_db_engine()
-
-            if rag_engine:
-                # 5. RAG DB 테이블 생성
-                rag_table = create_rag_db_table(rag_engine)
-
-                if rag_table is not None:
-                    # 6. 합성 임베딩 생성
-                    df_final_chunks = create_and_embed_chunks(successful_nodes, df_raw_books)
-
-                    # 7. RAG DB에 최종 데이터 적재
-                    load_chunks_to_rag_db(rag_engine, rag_table, df_final_chunks)
-
-        logging.info(f"ETL process finished. Results are in '{OUTPUT_DIR}' and 'postgres_rag_db'.")
+    if ETL_TRANSFER_MODE == "stream":
+        # DataFrame/스풀 없이 ingestion DB -> RAG DB로 바로 전송합니다. (run_streaming_transfer 참고)
+        parse_cache = ParseCache(os.path.join(OUTPUT_DIR, "parse_cache.sqlite3"), PARSER_VERSION)
+        parse_cache.prune()
+        # HNSW 인덱스는 run_streaming_transfer가 staging 테이블에 만든 뒤 교체합니다.
+        if run_streaming_transfer(OUTPUT_DIR, parse_cache=parse_cache, stored_nodes=extract_stored_chapters()) is not None:
+            bump_search_cache_generation()
+        parse_cache.close()
+        logging.info(f"ETL process finished (stream). Failures are in '{OUTPUT_DIR}', chunks in 'postgres_rag_db'.")
     else:
-        logging.warning("No raw books found. ETL process stopping.")
\ No newline at end of file
+        # 1. (수정) 데이터 추출 (summary 포함)
+        df_raw_books = extract_raw_tocs()
+
+        if not df_raw_books.empty:
+            # 수집 시점에 중복 클러스터가 정해지지 않은 책을 메모리 안에서 묶습니다. (같은 배치에 모여 임베딩 재사용)
+            df_raw_books = assign_toc_clusters(df_raw_books)
+            if TOC_PARSER_PROFILE:
+                # (선택) 규칙집 프로파일링: 결과는 버리고 패턴별 매칭 수/비용 보고서만 남깁니다.
+                run_parsing_pipeline(df_raw_books, profile=RulebookProfile())
+
+            # 2. 배치 단위 파싱 + 합성 임베딩 (배치마다 스풀에 체크포인트)
+            # (raw_toc 해시, 규칙집 버전) 키의 파싱 캐시. 규칙이 바뀌면 이전 버전 항목은 정리됩니다.
+            parse_cache = ParseCache(os.path.join(OUTPUT_DIR, "parse_cache.sqlite3"), PARSER_VERSION)
+            parse_cache.prune()
+            df_nodes, df_failures, embedding_batches = run_checkpointed_pipeline(
+                df_raw_books, spool_dir=os.path.join(OUTPUT_DIR, "spool"),
+                stored_nodes=extract_stored_chapters(), parse_cache=parse_cache
+            )
+            parse_cache.close()
+
+            # 3. 파싱 결과 파일로 저장 (Parquet 노드 + memmap 임베딩)
+            save_results(df_nodes, df_failures, embedding_batches, output_dir=OUTPUT_DIR)
+
+            # --- (★ 신규) RAG DB 적재 파이프라인 ---
+            if df_nodes.empty or not embedding_batches:
+                logging.warning("No embedded chunks produced. Stopping ETL.")
+            else:
+                # 4. RAG DB 연결
+                rag_engine = get_rag_db_engine()
+
+                if rag_engine:
+                    # 5. RAG DB 테이블 생성
+                    rag_table = create_rag_db_table(rag_engine)
+
+                    if rag_table is not None:
+                        # 6. 저장된 파싱 결과를 읽어 RAG DB에 최종 데이터 적재
+                        # (임베딩은 memmap 상태로 두고 ETL_LOAD_SLICE_SIZE행씩 읽어 적재)
+                        df_saved_nodes, embeddings = load_results(OUTPUT_DIR)
+                        load_saved_chunks_to_rag_db(rag_engine, rag_table, df_saved_nodes, embeddings)
+                        ensure_toc_chunks_index(rag_engine, rag_table.name)
+                        bump_search_cache_generation()
+
+            logging.info(f"ETL process finished. Results are in '{OUTPUT_DIR}' and 'postgres_rag_db'.")
+        else:
+            logging.warning("No raw books found. ETL process stopping.")
+    dispose_db_engines()
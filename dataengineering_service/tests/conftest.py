@@ -0,0 +1,6 @@
+# dataengineering_service/tests/conftest.py
+import os
+import sys
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [SERVICE_DIR, os.path.dirname(SERVICE_DIR)]  # 컨테이너(/app/toc_parser)와 로컬 체크아웃 모두 지원
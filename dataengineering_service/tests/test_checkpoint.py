@@ -0,0 +1,162 @@
+# dataengineering_service/tests/test_checkpoint.py
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import checkpoint
+import run_etl
+from checkpoint import CheckpointSpool, compute_batch_key
+
+MODEL = "test-model"
+COLUMNS = ["isbn", "title", "raw_toc", "summary", "full_description", "publisher_description", "toc_cluster"]
+
+
+def _books(count, toc_suffix=""):
+    return pd.DataFrame(
+        [(f"97800000000{i:02d}", f"책 {i}", f"1장 시작{toc_suffix}\n2장 끝 {i}", "요약", None, None, f"97800000000{i:02d}")
+         for i in range(count)],
+        columns=COLUMNS,
+    )
+
+
+def _batch(num_nodes=2, dim=3):
+    df_nodes = pd.DataFrame({"isbn": ["9780000000000"] * num_nodes, "composite_text": ["t"] * num_nodes})
+    df_failures = pd.DataFrame({"isbn": [], "line_num": [], "line_content": []})
+    return df_nodes, df_failures, np.arange(num_nodes * dim, dtype=np.float32).reshape(num_nodes, dim)
+
+
+class _FakeModel:
+    """encode 호출을 기록하고, fail_on번째 호출에서 실행이 중단된 것처럼 예외를 냅니다."""
+
+    def __init__(self, fail_on=None):
+        self.calls = []
+        self.fail_on = fail_on
+
+    def get_sentence_embedding_dimension(self):
+        return 2
+
+    def encode(self, texts, show_progress_bar=True):
+        self.calls.append(list(texts))
+        if self.fail_on is not None and len(self.calls) == self.fail_on:
+            raise KeyboardInterrupt("interrupted")
+        return np.ones((len(texts), 2), dtype=np.float32)
+
+
+def test_batch_key_depends_on_inputs_model_and_parser_version():
+    books = _books(3)
+    key = compute_batch_key(books, MODEL, "1")
+
+    assert compute_batch_key(books.copy(), MODEL, "1") == key
+    assert compute_batch_key(_books(3, toc_suffix="!"), MODEL, "1") != key
+    assert compute_batch_key(books, "other-model", "1") != key
+    assert compute_batch_key(books, MODEL, "2") != key
+    changed_cluster = books.copy()
+    changed_cluster.loc[0, "toc_cluster"] = "9780000000099"
+    assert compute_batch_key(changed_cluster, MODEL, "1") != key
+
+
+def test_write_and_read_batch(tmp_path):
+    spool = CheckpointSpool(str(tmp_path), MODEL)
+    df_nodes, df_failures, embeddings = _batch()
+
+    spool.write_batch("k1", df_nodes, df_failures, embeddings)
+
+    assert spool.is_complete("k1")
+    assert not list(tmp_path.glob("*.tmp"))
+    nodes, failures, loaded = CheckpointSpool(str(tmp_path), MODEL).read_batch("k1")
+    pd.testing.assert_frame_equal(nodes, df_nodes)
+    np.testing.assert_array_equal(loaded, embeddings)
+
+
+def test_batch_with_missing_file_or_half_written_files_is_not_complete(tmp_path):
+    spool = CheckpointSpool(str(tmp_path), MODEL)
+    spool.write_batch("k1", *_batch())
+    os.remove(spool._paths("k1")["embeddings"])
+    assert not CheckpointSpool(str(tmp_path), MODEL).is_complete("k1")
+
+    # 파일은 썼지만 manifest를 갱신하기 전에 죽은 배치
+    for path in spool._paths("k2").values():
+        with open(path, "wb") as f:
+            f.write(b"partial")
+    assert not CheckpointSpool(str(tmp_path), MODEL).is_complete("k2")
+
+
+def test_manifest_from_another_model_or_version_is_ignored(tmp_path, monkeypatch):
+    CheckpointSpool(str(tmp_path), MODEL).write_batch("k1", *_batch())
+
+    assert not CheckpointSpool(str(tmp_path), "other-model").is_complete("k1")
+    monkeypatch.setattr(checkpoint, "MANIFEST_VERSION", checkpoint.MANIFEST_VERSION + 1)
+    assert not CheckpointSpool(str(tmp_path), MODEL).is_complete("k1")
+
+
+def test_unreadable_manifest_starts_from_scratch(tmp_path):
+    (tmp_path / "manifest.json").write_text("{not json", encoding="utf-8")
+
+    spool = CheckpointSpool(str(tmp_path), MODEL)
+
+    assert spool.manifest["batches"] == {}
+
+
+def test_prune_removes_stale_batches(tmp_path):
+    spool = CheckpointSpool(str(tmp_path), MODEL)
+    spool.write_batch("keep", *_batch())
+    spool.write_batch("stale", *_batch())
+
+    spool.prune(["keep"])
+
+    assert spool.is_complete("keep")
+    assert not any(os.path.exists(path) for path in spool._paths("stale").values())
+    with open(tmp_path / "manifest.json", encoding="utf-8") as f:
+        assert list(json.load(f)["batches"]) == ["keep"]
+
+
+@pytest.fixture
+def pipeline(monkeypatch, tmp_path):
+    """run_checkpointed_pipeline을 가짜 모델로 실행하는 함수. (배치 2권)"""
+    def run(model, books):
+        monkeypatch.setattr(run_etl, "get_embedding_model", lambda: model)
+        return run_etl.run_checkpointed_pipeline(books, spool_dir=str(tmp_path), batch_size=2)
+    return run
+
+
+def test_interrupted_run_resumes_from_last_completed_batch(pipeline, tmp_path):
+    books = _books(5)  # 배치 3개 (2, 2, 1권)
+
+    with pytest.raises(KeyboardInterrupt):
+        pipeline(_FakeModel(fail_on=2), books)
+    with open(tmp_path / "manifest.json", encoding="utf-8") as f:
+        assert len(json.load(f)["batches"]) == 1
+
+    resumed = _FakeModel()
+    df_nodes, _, embedding_batches = pipeline(resumed, books)
+
+    # 완료된 첫 배치는 스풀에서 읽고, 나머지 두 배치만 다시 임베딩합니다.
+    assert len(resumed.calls) == 2
+    assert sorted(df_nodes["isbn"].unique()) == sorted(books["isbn"])
+    assert sum(len(batch) for batch in embedding_batches) == len(df_nodes)
+
+    # 입력이 그대로면 전부 스풀에서 읽습니다.
+    again = _FakeModel()
+    pipeline(again, books)
+    assert again.calls == []
+
+
+def test_changed_batch_is_recomputed_and_old_one_pruned(pipeline, tmp_path):
+    books = _books(4)
+    pipeline(_FakeModel(), books)
+    old_files = set(os.listdir(tmp_path))
+
+    changed = books.copy()
+    changed.loc[3, "raw_toc"] = "1장 바뀐 목차"
+    model = _FakeModel()
+    pipeline(model, changed)
+
+    # 두 번째 배치만 다시 임베딩하고, 이전 키의 스풀 파일은 정리됩니다.
+    assert len(model.calls) == 1
+    with open(tmp_path / "manifest.json", encoding="utf-8") as f:
+        assert len(json.load(f)["batches"]) == 2
+    assert len(set(os.listdir(tmp_path)) - old_files) == 3
+    assert len(old_files - set(os.listdir(tmp_path))) == 3
@@ -0,0 +1,132 @@
+# dataengineering_service/tests/test_copy_stream.py
+import struct
+
+import numpy as np
+import pytest
+
+from copy_stream import COPY_HEADER, COPY_TRAILER, ChunkCopyEncoder, IteratorFile
+
+
+def _decode_tuples(data, dtype):
+    """encode_batch 출력을 PostgreSQL 바이너리 COPY 규칙대로 다시 읽어 (필드 목록, 벡터) 목록으로 돌려줍니다."""
+    rows, pos = [], 0
+    while pos < len(data):
+        (field_count,), pos = struct.unpack_from("!h", data, pos), pos + 2
+        fields = []
+        for _ in range(field_count):
+            (length,), pos = struct.unpack_from("!i", data, pos), pos + 4
+            if length == -1:
+                fields.append(None)
+                continue
+            fields.append(data[pos:pos + length])
+            pos += length
+        *columns, vector = fields
+        dim, unused = struct.unpack_from("!hh", vector, 0)
+        assert unused == 0
+        rows.append((columns, np.frombuffer(vector[4:], dtype=dtype, count=dim)))
+    return rows
+
+
+def test_copy_header_and_trailer():
+    assert COPY_HEADER == b"PGCOPY\n\xff\r\n\x00" + b"\x00" * 8
+    assert COPY_TRAILER == b"\xff\xff"
+
+
+def test_encode_batch_writes_fields_and_float32_vectors():
+    encoder = ChunkCopyEncoder(3)
+    rows = [
+        ("9780000000001", 1, "1", "데이터 모델링", "9780000000001", "책 제목 데이터 모델링 소개"),
+        ("9780000000002", 2, "1.1", "인덱스", "9780000000001", "composite"),
+    ]
+    embeddings = np.array([[0.5, -1.0, 2.25], [0.0, 1.5, -0.125]], dtype=np.float32)
+
+    decoded = _decode_tuples(encoder.encode_batch(rows, embeddings), ">f4")
+
+    assert len(decoded) == 2
+    columns, vector = decoded[0]
+    assert len(columns) + 1 == len(ChunkCopyEncoder.COLUMNS)
+    assert columns[0] == b"9780000000001"
+    assert struct.unpack("!i", columns[1]) == (1,)
+    assert columns[3].decode("utf-8") == "데이터 모델링"
+    np.testing.assert_array_equal(vector, embeddings[0])
+    assert struct.unpack("!i", decoded[1][0][1]) == (2,)
+    np.testing.assert_array_equal(decoded[1][1], embeddings[1])
+
+
+def test_encode_batch_writes_null_fields():
+    encoder = ChunkCopyEncoder(2)
+    rows = [("9780000000001", None, None, "제목", None, "composite")]
+
+    (columns, _), = _decode_tuples(encoder.encode_batch(rows, np.zeros((1, 2))), ">f4")
+
+    assert columns == [b"9780000000001", None, None, "제목".encode("utf-8"), None, b"composite"]
+
+
+def test_encode_batch_half_precision():
+    encoder = ChunkCopyEncoder(4, half=True)
+    embeddings = np.array([[0.1, -0.2, 0.3, 65504.0]], dtype=np.float32)
+
+    data = encoder.encode_batch([("9780000000001", 1, "1", "t", "9780000000001", "c")], embeddings)
+    (_, vector), = _decode_tuples(data, ">f2")
+
+    # 벡터 필드 길이 = 헤더 4바이트 + 차원 x 2바이트
+    assert data.endswith(struct.pack("!ihh", 4 + 4 * 2, 4, 0) + embeddings.astype(">f2").tobytes())
+    np.testing.assert_array_equal(vector, embeddings[0].astype(np.float16))
+
+
+def test_encode_batch_empty():
+    assert ChunkCopyEncoder(3).encode_batch([], np.empty((0, 3))) == b""
+
+
+@pytest.mark.parametrize("size", [1, 3, 4, 7, 100])
+def test_iterator_file_reads_across_chunk_boundaries(size):
+    chunks = [b"abcd", b"", b"ef", b"", b"", b"ghijklm"]
+    stream = IteratorFile(chunks)
+
+    pieces = []
+    while True:
+        data = stream.read(size)
+        if not data:
+            break
+        assert len(data) <= size
+        pieces.append(data)
+
+    assert b"".join(pieces) == b"abcdefghijklm"
+    # 마지막 read 전까지는 요청한 크기를 꽉 채워 돌려줍니다.
+    assert all(len(piece) == size for piece in pieces[:-1])
+    assert stream.bytes_read == 13
+    assert stream.read(size) == b""
+
+
+def test_iterator_file_read_all():
+    stream = IteratorFile(iter([b"ab", b"", b"cde"]))
+
+    assert stream.read(2) == b"ab"
+    assert stream.read() == b"cde"
+    assert stream.read(-1) == b""
+    assert stream.bytes_read == 5
+
+
+def test_iterator_file_only_empty_chunks():
+    stream = IteratorFile([b"", b""])
+
+    assert stream.read(10) == b""
+    assert stream.read() == b""
+    assert stream.bytes_read == 0
+
+
+def test_iterator_file_pulls_chunks_lazily():
+    pulled = []
+
+    def chunks():
+        for chunk in (b"first", b"second"):
+            pulled.append(chunk)
+            yield chunk
+
+    stream = IteratorFile(chunks())
+    assert stream.read(3) == b"fir"
+    assert pulled == [b"first"]
+    assert stream.read(2) == b"st"
+    assert pulled == [b"first"]
+    assert stream.read(4) == b"seco"
+    assert pulled == [b"first", b"second"]
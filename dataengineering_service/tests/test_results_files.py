@@ -0,0 +1,39 @@
+# dataengineering_service/tests/test_results_files.py
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import run_etl
+
+
+def _nodes(count):
+    return pd.DataFrame({"isbn": [f"97800000000{i:02d}" for i in range(count)], "title": ["t"] * count})
+
+
+def test_save_and_load_round_trip(tmp_path):
+    embeddings = np.arange(6, dtype=np.float32).reshape(3, 2)
+
+    run_etl.save_results(_nodes(3), pd.DataFrame(), [embeddings[:2], embeddings[2:]], str(tmp_path))
+    df_nodes, loaded = run_etl.load_results(str(tmp_path))
+
+    assert df_nodes["node_id"].tolist() == [0, 1, 2]
+    np.testing.assert_array_equal(loaded[df_nodes["node_id"]], embeddings)
+
+
+def test_save_without_embeddings_removes_stale_embeddings_file(tmp_path):
+    run_etl.save_results(_nodes(2), pd.DataFrame(), [np.ones((2, 2), dtype=np.float32)], str(tmp_path))
+
+    run_etl.save_results(_nodes(3), pd.DataFrame(), [], str(tmp_path))
+
+    assert not os.path.exists(tmp_path / run_etl.EMBEDDINGS_FILENAME)
+    assert len(pd.read_parquet(tmp_path / run_etl.NODES_FILENAME)) == 3
+
+
+def test_load_rejects_mismatched_files(tmp_path):
+    run_etl.save_results(_nodes(3), pd.DataFrame(), [np.ones((3, 2), dtype=np.float32)], str(tmp_path))
+    np.save(tmp_path / run_etl.EMBEDDINGS_FILENAME, np.ones((2, 2), dtype=np.float32))
+
+    with pytest.raises(ValueError, match="different runs"):
+        run_etl.load_results(str(tmp_path))
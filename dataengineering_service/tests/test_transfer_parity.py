@@ -0,0 +1,86 @@
+# dataengineering_service/tests/test_transfer_parity.py
+"""ETL_TRANSFER_MODE=checkpoint와 stream이 같은 청크(목차 노드, toc_cluster, 합성 텍스트)를 적재하는지 확인합니다."""
+import io
+
+import numpy as np
+import pandas as pd
+
+import run_etl
+from toc_parser import TocNode
+
+CHAPTERS = ["데이터 모델링", "정규화와 반정규화", "인덱스 설계", "트랜잭션과 격리 수준", "쿼리 최적화", "파티셔닝"]
+
+
+def _toc(chapters, first=1):
+    return "\n".join(f"{i}장 {title} ... {i * 10}" for i, title in enumerate(chapters, first))
+
+
+BOOKS = [
+    # isbn, title, raw_toc, summary, full_description, publisher_description, toc_cluster(수집 시점)
+    ("9780000000005", "DB 설계 개정판", _toc(CHAPTERS, first=2), None, "상세 소개", None, None),
+    ("9780000000001", "DB 설계", _toc(CHAPTERS), "요약", None, None, None),
+    ("9780000000003", "고양이", _toc(["고양이 돌보기", "사료 고르기", "놀이와 훈련"]), "", None, "출판사 소개", None),
+    ("9780000000004", "저장된 책", "1장 다시 파싱하면 안 되는 목차", "요약", None, None, "9780000000004"),
+    ("9780000000002", "클러스터 있는 책", _toc(CHAPTERS[:3]), "요약", None, None, "9780000000009"),
+]
+STORED_NODES = {"9780000000004": [TocNode("9780000000004", 1, "1", "저장된 Chapter", 1)]}
+
+
+class _FakeModel:
+    def encode(self, texts, show_progress_bar=False):
+        return np.zeros((len(texts), 2), dtype=np.float32)
+
+
+class _RecordingEncoder:
+    def __init__(self):
+        self.rows = []
+
+    def encode_batch(self, rows, embeddings):
+        assert len(rows) == len(embeddings)
+        self.rows.extend(rows)
+        return b""
+
+
+def _checkpoint_chunks():
+    columns = ["isbn", "title", "raw_toc", "summary", "full_description", "publisher_description", "toc_cluster"]
+    df = run_etl.assign_toc_clusters(pd.DataFrame(BOOKS, columns=columns))
+    nodes, _ = run_etl.run_parsing_pipeline(df, stored_nodes=STORED_NODES)
+    df_chunks = run_etl.build_composite_chunks(nodes, df)
+    return sorted(df_chunks[["isbn", "level", "number", "chapter_title", "toc_cluster", "composite_text"]]
+                  .itertuples(index=False, name=None))
+
+
+def _stream_chunks():
+    # STREAM_UNCLUSTERED_SQL / STREAM_EXTRACT_SQL이 돌려주는 행과 같은 모양
+    unclustered = sorted((isbn, raw_toc) for isbn, _, raw_toc, *_rest, cluster in BOOKS if not cluster)
+    rows = sorted(
+        (isbn, title, raw_toc, summary, full, publisher, cluster or isbn, len(raw_toc))
+        for isbn, title, raw_toc, summary, full, publisher, cluster in BOOKS
+    )
+    encoder = _RecordingEncoder()
+    stats = {"books": 0, "chunks": 0, "failed_lines": 0, "source_bytes": 0, "reused_books": 0}
+    list(run_etl._stream_chunk_batches(
+        rows, _FakeModel(), encoder, None, io.StringIO(), stats,
+        stored_nodes=STORED_NODES, clusters=run_etl.cluster_unclustered_tocs(unclustered),
+    ))
+    assert stats["reused_books"] == 1
+    assert stats["chunks"] == len(encoder.rows)
+    return sorted(encoder.rows)
+
+
+def test_checkpoint_and_stream_load_the_same_chunks():
+    checkpoint, stream = _checkpoint_chunks(), _stream_chunks()
+
+    assert checkpoint == stream
+    by_isbn = {}
+    for isbn, _, _, chapter_title, toc_cluster, composite in stream:
+        by_isbn.setdefault(isbn, []).append((chapter_title, toc_cluster, composite))
+    # 저장된 Chapter를 그대로 사용 (raw_toc를 다시 파싱하지 않음)
+    assert [title for title, _, _ in by_isbn["9780000000004"]] == ["저장된 Chapter"]
+    # 수집 시점에 클러스터가 없던 개정판은 원본의 클러스터로 묶이고, 이미 있던 클러스터는 유지
+    assert {cluster for _, cluster, _ in by_isbn["9780000000005"]} == {"9780000000001"}
+    assert {cluster for _, cluster, _ in by_isbn["9780000000003"]} == {"9780000000003"}
+    assert {cluster for _, cluster, _ in by_isbn["9780000000002"]} == {"9780000000009"}
+    # 책소개 Fallback: summary -> full_description -> publisher_description
+    assert by_isbn["9780000000005"][0][2].endswith("책소개: 상세 소개")
+    assert by_isbn["9780000000003"][0][2].endswith("책소개: 출판사 소개")
@@ -1,14 +1,42 @@
 # bookroad/celery_config.py
+import logging
 import os
 from celery import Celery
+from celery.signals import worker_init, worker_process_init
 
 # Django의 settings.py 파일을 Celery 설정 소스로 사용하도록 지정
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'bookroad.settings')
 
 app = Celery('bookroad')
 
-# 'bookroad'라는 네임스페이스를 가진 모든 Django 설정을 로드
-app.config_from_object('django.conf:settings', namespace='bookroad')
+# 'CELERY_' 접두사를 가진 모든 Django 설정을 로드 (예: CELERY_TASK_ROUTES -> task_routes)
+# (이전의 namespace='bookroad'는 어떤 설정과도 맞지 않아 큐/직렬화 설정이 적용되지 않았습니다.)
+# 단계별 큐(io/cpu)는 task_routes에 따라 자동 생성되며, 워커는 -Q로 담당 큐를 고릅니다. (README의 워커 프로필 참고)
+app.config_from_object('django.conf:settings', namespace='CELERY')
 
 # 등록된 Django 앱 설정에서 tasks.py 파일을 자동으로 찾음
-app.autodiscover_tasks()
\ No newline at end of file
+app.autodiscover_tasks()
+
+
+@worker_init.connect
+def preload_embedding_model(**kwargs):
+    """
+    워커 부모 프로세스가 풀을 fork하기 전에 임베딩 모델을 로드합니다. (EMBEDDING_PRELOAD_IN_WORKER=True일 때)
+    임베딩 서버(EMBEDDING_SERVICE_URL)를 쓰면 워커에 모델이 필요 없으므로 건너뜁니다.
+    """
+    from django.conf import settings
+
+    if not settings.EMBEDDING_PRELOAD_IN_WORKER or settings.EMBEDDING_SERVICE_URL:
+        return
+    from books.embeddings import preload_embedding_model as preload
+
+    elapsed = preload()
+    logging.getLogger(__name__).info("Preloaded embedding model '%s' in %.1fs before fork.",
+                                     settings.EMBEDDING_MODEL_NAME, elapsed)
+
+
+@worker_process_init.connect
+def configure_embedding_threads(**kwargs):
+    from books.embeddings import configure_worker_process
+
+    configure_worker_process()
@@ -7,6 +7,10 @@ class AladinAPI:
 
     def __init__(self):
         self.ttb_key = settings.ALADIN_TTB_KEY
+        # 부하 테스트 시 ALADIN_API_BASE_URL로 로컬 대역 서버(bookroad.services.fake_aladin)를 가리킬 수 있습니다.
+        self.base_url = settings.ALADIN_API_BASE_URL or self.BASE_URL
+        # 같은 인스턴스로 여러 번 호출할 때(배치 상세 조회 등) TCP/TLS 연결을 재사용합니다.
+        self.session = requests.Session()
 
     def _make_request(self, endpoint, params):
         default_params = {
@@ -17,7 +21,7 @@ class AladinAPI:
         all_params = {**default_params, **params}
 
         try:
-            response = requests.get(f"{self.BASE_URL}/{endpoint}", params=all_params, timeout=10)
+            response = self.session.get(f"{self.base_url}/{endpoint}", params=all_params, timeout=10)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
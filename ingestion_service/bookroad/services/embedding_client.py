@@ -0,0 +1,25 @@
+# bookroad/services/embedding_client.py
+import requests
+from django.conf import settings
+
+
+class EmbeddingServiceError(Exception):
+    pass
+
+
+class EmbeddingClient:
+    """embedding_server(POST /encode)를 호출하는 얇은 클라이언트. 연결은 Session으로 재사용합니다."""
+
+    def __init__(self, base_url=None, timeout=None):
+        self.base_url = (base_url or settings.EMBEDDING_SERVICE_URL).rstrip('/')
+        self.timeout = timeout or settings.EMBEDDING_SERVICE_TIMEOUT
+        self.session = requests.Session()
+
+    def encode(self, texts):
+        """텍스트 목록을 임베딩하여 float 리스트의 리스트로 반환합니다."""
+        try:
+            response = self.session.post(f"{self.base_url}/encode", json={'texts': list(texts)}, timeout=self.timeout)
+            response.raise_for_status()
+            return response.json()['embeddings']
+        except (requests.exceptions.RequestException, ValueError, KeyError) as e:
+            raise EmbeddingServiceError(f"Embedding service request failed: {e}") from e
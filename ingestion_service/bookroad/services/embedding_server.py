@@ -0,0 +1,200 @@
+# bookroad/services/embedding_server.py
+"""
+임베딩 추론 서버 (asyncio HTTP).
+
+모델을 프로세스 하나에만 올려두고, 짧은 시간 창(--max-wait-ms) 안에 들어온 여러 요청의 텍스트를
+한 번의 model.encode 배치로 묶어 처리합니다. 검색 API(gunicorn 워커)와 Celery 임베딩 태스크는
+bookroad.services.embedding_client.EmbeddingClient로 이 서버를 호출합니다.
+
+    python -m bookroad.services.embedding_server --host 0.0.0.0 --port 8001
+
+API:
+    POST /encode  {"texts": ["...", ...]}  ->  {"embeddings": [[...], ...], "dim": 768}
+    GET  /health                          ->  {"status": "ok", "model": "...", "batches": N, "texts": M}
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger('embedding_server')
+
+DEFAULT_MODEL_NAME = 'jhgan/ko-sroberta-multitask'
+MAX_BODY_BYTES = 8 * 1024 * 1024
+
+
+class BatchingEncoder:
+    """
+    동시에 들어온 encode 요청을 max_wait_ms 동안(또는 max_batch_size개가 찰 때까지) 모아
+    한 번에 모델에 넘기는 동적 배처입니다. 모델 호출은 전용 스레드 하나에서 순차 실행됩니다.
+    """
+
+    def __init__(self, model, max_batch_size=64, max_wait_ms=5):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.queue = asyncio.Queue()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='encode')
+        self.batches = 0
+        self.texts = 0
+
+    async def encode(self, texts):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((texts, future))
+        return await future
+
+    def _encode_sync(self, texts):
+        # 요청 하나가 아주 커도(예: 챕터 수천 개인 책) forward pass 하나의 크기는 max_batch_size로 제한됩니다.
+        return self.model.encode(texts, batch_size=min(len(texts), self.max_batch_size), show_progress_bar=False).tolist()
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = [await self.queue.get()]
+            size = len(pending[0][0])
+            deadline = loop.time() + self.max_wait
+
+            while size < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                pending.append(item)
+                size += len(item[0])
+
+            all_texts = [text for texts, _ in pending for text in texts]
+            try:
+                vectors = await loop.run_in_executor(self.executor, self._encode_sync, all_texts)
+            except Exception as e:
+                logger.exception("Batch encode failed")
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.texts += len(all_texts)
+            offset = 0
+            for texts, future in pending:
+                if not future.done():
+                    future.set_result(vectors[offset:offset + len(texts)])
+                offset += len(texts)
+
+
+class EmbeddingHTTPServer:
+    """keep-alive를 지원하는 최소한의 HTTP/1.1 서버 (JSON 요청/응답만 처리)."""
+
+    def __init__(self, encoder, model_name):
+        self.encoder = encoder
+        self.model_name = model_name
+
+    async def _write_json(self, writer, status, payload, keep_alive):
+        body = json.dumps(payload).encode('utf-8')
+        reason = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 413: 'Payload Too Large',
+                  500: 'Internal Server Error'}[status]
+        headers = (
+            f"HTTP/1.1 {status} {reason}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(headers.encode('latin-1') + body)
+        await writer.drain()
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode('latin-1').split(' ', 2)
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                keep_alive = headers.get('connection', '').lower() != 'close'
+
+                length = int(headers.get('content-length') or 0)
+                if length > MAX_BODY_BYTES:
+                    await self._write_json(writer, 413, {'error': 'body too large'}, False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                if method == 'GET' and path == '/health':
+                    await self._write_json(writer, 200, {
+                        'status': 'ok',
+                        'model': self.model_name,
+                        'batches': self.encoder.batches,
+                        'texts': self.encoder.texts,
+                    }, keep_alive)
+                elif method == 'POST' and path == '/encode':
+                    try:
+                        texts = json.loads(body)['texts']
+                        if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+                            raise ValueError("'texts' must be a list of strings")
+                    except (ValueError, KeyError, TypeError) as e:
+                        await self._write_json(writer, 400, {'error': str(e)}, keep_alive)
+                        continue
+                    try:
+                        vectors = await self.encoder.encode(texts) if texts else []
+                    except Exception as e:
+                        await self._write_json(writer, 500, {'error': str(e)}, keep_alive)
+                        continue
+                    await self._write_json(writer, 200, {
+                        'embeddings': vectors,
+                        'dim': len(vectors[0]) if vectors else 0,
+                    }, keep_alive)
+                else:
+                    await self._write_json(writer, 404, {'error': 'not found'}, keep_alive)
+
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(host, port, model_name, max_batch_size, max_wait_ms):
+    from sentence_transformers import SentenceTransformer
+
+    logger.info("Loading embedding model '%s'...", model_name)
+    model = SentenceTransformer(model_name)
+    encoder = BatchingEncoder(model, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+    http = EmbeddingHTTPServer(encoder, model_name)
+
+    batcher = asyncio.create_task(encoder.run())
+    server = await asyncio.start_server(http.handle, host, port)
+    logger.info("Embedding server listening on %s:%s (max_batch=%s, max_wait=%sms)",
+                host, port, max_batch_size, max_wait_ms)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        batcher.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='BookRoad embedding inference server')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--model', default=os.environ.get('EMBEDDING_MODEL_NAME', DEFAULT_MODEL_NAME))
+    parser.add_argument('--max-batch-size', type=int, default=64)
+    parser.add_argument('--max-wait-ms', type=float, default=5.0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    asyncio.run(serve(args.host, args.port, args.model, args.max_batch_size, args.max_wait_ms))
+
+
+if __name__ == '__main__':
+    main()
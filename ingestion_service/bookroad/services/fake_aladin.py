@@ -0,0 +1,265 @@
+# bookroad/services/fake_aladin.py
+"""
+부하 테스트용 로컬 알라딘 API 대역 서버.
+
+ItemSearch.aspx / ItemList.aspx / ItemLookUp.aspx를 알라딘 Open API(Output=JS, Version=20131101)와 같은 모양의
+JSON으로 응답합니다. 카테고리마다 --books-per-category권의 합성 도서가 시드 기반으로 결정적으로 생성되므로
+같은 설정이면 항상 같은 코퍼스가 나옵니다. 응답 지연과 오류율을 조절할 수 있습니다.
+
+    python -m bookroad.services.fake_aladin --port 8002 --books-per-category 500 --latency-ms 80 --error-rate 0.02
+
+워커가 이 서버를 사용하게 하려면 ALADIN_API_BASE_URL=http://<host>:8002/ttb/api 로 설정합니다.
+
+관리용 API:
+    GET  /_stats  ->  엔드포인트별 호출 수, 주입한 오류 수, 목록/검색으로 노출된 ISBN 수, 상세 조회된 ISBN 수
+    POST /_reset  ->  통계 초기화
+"""
+import argparse
+import functools
+import hashlib
+import json
+import logging
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+logger = logging.getLogger('fake_aladin')
+
+API_PREFIX = '/ttb/api/'
+FAKE_ISBN_PREFIX = '97999'  # 실제 ISBN과 겹치지 않는 대역 (하네스의 --purge가 이 접두사로 정리합니다)
+MAX_RESULTS_LIMIT = 50
+MAX_TOTAL_RESULTS = 1000  # 알라딘은 목록/검색 결과를 1,000건까지만 페이지로 제공합니다
+
+WORDS = ['데이터', '분석', '파이썬', '머신러닝', '딥러닝', '네트워크', '보안', '클라우드', '알고리즘', '자료구조',
+         '운영체제', '데이터베이스', '웹 개발', '백엔드', '설계', '실전', '입문', 'AWS', 'Java', 'SQL']
+PUBLISHERS = ['한빛미디어', '길벗', '위키북스', '인사이트', '에이콘출판', '제이펍', '이지스퍼블리싱']
+
+
+def _rng(*parts):
+    seed = hashlib.sha256('\x1f'.join(map(str, parts)).encode('utf-8')).digest()
+    return random.Random(int.from_bytes(seed[:8], 'big'))
+
+
+def _words(rng, lo, hi):
+    return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(lo, hi)))
+
+
+def _toc(rng):
+    lines = []
+    for chapter in range(1, rng.randint(4, 15) + 1):
+        lines.append(f"Chapter {chapter} {_words(rng, 2, 4)} ..... {rng.randint(1, 500)}")
+        for section in range(1, rng.randint(2, 8) + 1):
+            lines.append(f"{chapter}.{section} {_words(rng, 2, 5)} {rng.randint(1, 500)}")
+            if rng.random() < 0.2:
+                lines.append(_words(rng, 2, 4))  # 부제/연속 라인
+    return '<br/>\n'.join(f"<p>{line}</p>" for line in lines)
+
+
+class FakeCorpus:
+    """카테고리별 합성 도서 목록. 책 정보는 (seed, ISBN)으로 결정되므로 필요할 때 생성합니다."""
+
+    def __init__(self, books_per_category, keyword_hit_ratio=0.3, toc_ratio=0.9, seed=0):
+        if not 0 < books_per_category <= 10 ** 4:
+            raise ValueError('books_per_category must be between 1 and 10000')
+        self.books_per_category = books_per_category
+        self.keyword_hit_ratio = keyword_hit_ratio
+        self.toc_ratio = toc_ratio
+        self.seed = seed
+        self._categories = {}
+        self._lock = threading.Lock()
+
+    def category(self, category_id):
+        with self._lock:
+            if category_id not in self._categories:
+                base = int(hashlib.sha256(f"{self.seed}:{category_id}".encode()).hexdigest()[:6], 16) % 10 ** 4
+                self._categories[category_id] = [
+                    f"{FAKE_ISBN_PREFIX}{base:04d}{i:04d}" for i in range(self.books_per_category)
+                ]
+            return self._categories[category_id]
+
+    def list_item(self, isbn):
+        """ItemList/ItemSearch 응답의 item (subInfo 없음)"""
+        rng = _rng(self.seed, isbn)
+        return {
+            'title': f"{_words(rng, 2, 4)} {rng.choice(['입문', '실전', '완벽 가이드', '레시피'])}",
+            'author': f"저자{rng.randint(1, 500)} (지은이)",
+            'pubDate': f"{rng.randint(2005, 2025)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            'description': _words(rng, 10, 30),
+            'isbn': isbn[3:],
+            'isbn13': isbn,
+            'itemId': int(isbn[-8:]),
+            'priceStandard': rng.randint(10, 60) * 1000,
+            'publisher': rng.choice(PUBLISHERS),
+            'salesPoint': rng.randint(0, 100000),
+            'categoryName': '국내도서>컴퓨터/모바일',
+        }
+
+    def lookup_item(self, isbn):
+        """ItemLookUp 응답의 item (OptResult에 해당하는 subInfo 포함)"""
+        item = self.list_item(isbn)
+        rng = _rng(self.seed, isbn, 'detail')
+        item['fullDescription'] = _words(rng, 40, 120)
+        item['publisherReview'] = _words(rng, 20, 60)
+        item['subInfo'] = {
+            'subTitle': _words(rng, 1, 3),
+            'itemPage': rng.randint(120, 900),
+            'authors': [{'authorType': 'author', 'authorName': item['author'].split(' ')[0], 'authorId': rng.randint(1, 10 ** 6)}],
+            'toc': _toc(rng) if rng.random() < self.toc_ratio else '',
+        }
+        return item
+
+    @functools.lru_cache(maxsize=4096)
+    def _ordered(self, category_id, query_type, query):
+        """(카테고리, 목록 종류, 검색어)별 정렬된 ISBN 튜플. 페이지마다 다시 정렬하지 않도록 캐시합니다."""
+        isbns = self.category(category_id)
+        if query:
+            isbns = [isbn for isbn in isbns if _rng(self.seed, query, isbn).random() < self.keyword_hit_ratio]
+        if query_type == 'ItemNewAll':
+            return tuple(sorted(isbns, key=lambda isbn: self.list_item(isbn)['pubDate'], reverse=True))
+        return tuple(sorted(isbns, key=lambda isbn: -self.list_item(isbn)['salesPoint']))
+
+    def item_list(self, params):
+        query_type = params.get('QueryType', 'Bestseller')
+        ordered = self._ordered(params.get('CategoryId', '0'), query_type, '')
+        return ordered, {'query': f"QueryType={query_type};CategoryId={params.get('CategoryId')}"}
+
+    def item_search(self, params):
+        query = params.get('Query', '')
+        return self._ordered(params.get('CategoryId', '0'), 'SalesPoint', query), {'query': query}
+
+
+class FakeAladinStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.calls = {}
+            self.errors = 0
+            self.listed_isbns = set()
+            self.looked_up_isbns = set()
+            self.started_at = time.time()
+
+    def record(self, endpoint, error=False, listed=(), looked_up=None):
+        with self._lock:
+            self.calls[endpoint] = self.calls.get(endpoint, 0) + 1
+            self.errors += int(error)
+            self.listed_isbns.update(listed)
+            if looked_up:
+                self.looked_up_isbns.add(looked_up)
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                'calls': dict(self.calls),
+                'total_calls': sum(self.calls.values()),
+                'errors': self.errors,
+                'listed_isbns': len(self.listed_isbns),
+                'looked_up_isbns': len(self.looked_up_isbns),
+                'since': self.started_at,
+            }
+
+
+class FakeAladinHandler(BaseHTTPRequestHandler):
+    server_version = 'FakeAladin/1.0'
+
+    def log_message(self, format, *args):  # noqa: A002 - BaseHTTPRequestHandler 시그니처
+        logger.debug(format, *args)
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        if self.path == '/_reset':
+            self.server.stats.reset()
+            return self._send_json(200, {'status': 'reset'})
+        return self._send_json(404, {'error': 'not found'})
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == '/_stats':
+            return self._send_json(200, self.server.stats.as_dict())
+        if not url.path.startswith(API_PREFIX):
+            return self._send_json(404, {'error': 'not found'})
+
+        endpoint = url.path[len(API_PREFIX):]
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        server = self.server
+
+        latency = server.latency_ms + random.uniform(0, server.jitter_ms)
+        time.sleep(latency / 1000)
+
+        if random.random() < server.error_rate:
+            server.stats.record(endpoint, error=True)
+            return self._send_json(503, {'errorCode': 503, 'errorMessage': 'fake_aladin: injected error'})
+
+        if endpoint == 'ItemLookUp.aspx':
+            isbn = params.get('ItemId', '')
+            if not isbn.startswith(FAKE_ISBN_PREFIX):
+                server.stats.record(endpoint)
+                return self._send_json(200, {'errorCode': 8, 'errorMessage': '존재하지 않는 상품입니다.'})
+            server.stats.record(endpoint, looked_up=isbn)
+            return self._send_json(200, {
+                'version': '20131101', 'totalResults': 1, 'startIndex': 1, 'itemsPerPage': 1,
+                'item': [server.corpus.lookup_item(isbn)],
+            })
+
+        if endpoint in ('ItemList.aspx', 'ItemSearch.aspx'):
+            handler = server.corpus.item_list if endpoint == 'ItemList.aspx' else server.corpus.item_search
+            isbns, extra = handler(params)
+            isbns = isbns[:MAX_TOTAL_RESULTS]
+            per_page = min(int(params.get('MaxResults', 10)), MAX_RESULTS_LIMIT)
+            start = max(int(params.get('start', 1)), 1)
+            page = isbns[(start - 1) * per_page:start * per_page]
+            server.stats.record(endpoint, listed=page)
+            return self._send_json(200, {
+                'version': '20131101', 'totalResults': len(isbns), 'startIndex': start, 'itemsPerPage': per_page,
+                **extra, 'item': [server.corpus.list_item(isbn) for isbn in page],
+            })
+
+        return self._send_json(404, {'errorCode': 404, 'errorMessage': f'unknown endpoint {endpoint}'})
+
+
+class FakeAladinServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, corpus, latency_ms=50.0, jitter_ms=20.0, error_rate=0.0):
+        super().__init__(address, FakeAladinHandler)
+        self.corpus = corpus
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.stats = FakeAladinStats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local Aladin Open API stand-in for load tests')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8002)
+    parser.add_argument('--books-per-category', type=int, default=500)
+    parser.add_argument('--keyword-hit-ratio', type=float, default=0.3, help='ItemSearch 키워드마다 매칭되는 카테고리 도서 비율')
+    parser.add_argument('--toc-ratio', type=float, default=0.9, help='목차가 있는 도서 비율')
+    parser.add_argument('--latency-ms', type=float, default=50.0)
+    parser.add_argument('--jitter-ms', type=float, default=20.0)
+    parser.add_argument('--error-rate', type=float, default=0.0, help='503을 돌려줄 요청 비율 (0~1)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    corpus = FakeCorpus(args.books_per_category, args.keyword_hit_ratio, args.toc_ratio, args.seed)
+    server = FakeAladinServer((args.host, args.port), corpus, args.latency_ms, args.jitter_ms, args.error_rate)
+    logger.info(f"Fake Aladin API listening on http://{args.host}:{args.port}{API_PREFIX} "
+                f"({args.books_per_category} books/category, latency {args.latency_ms}ms, error rate {args.error_rate})")
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
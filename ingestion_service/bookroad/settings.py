@@ -39,6 +39,8 @@ ALLOWED_HOSTS = []
 INSTALLED_APPS = [
     'books',
     'analysis',
+    'rest_framework',
+    'django.contrib.postgres',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -90,6 +92,12 @@ WSGI_APPLICATION = 'bookroad.wsgi.application'
 DATABASES = {
     'default': env.db() # .env의 DATABASE_URL을 자동으로 파싱하여 설정
 }
+# 연결 재사용: 요청/태스크마다 새로 연결하지 않고 CONN_MAX_AGE초 동안 유지합니다.
+# Celery의 Django fixup이 태스크 전후로 close_if_unusable_or_obsolete()를 호출하므로 워커에도 그대로 적용되며,
+# 재사용 전에 CONN_HEALTH_CHECKS로 끊어진 연결(DB 재시작, idle timeout)을 걸러냅니다.
+# threads 풀 워커는 스레드마다 연결을 하나씩 유지하므로 Postgres max_connections를 함께 확인하세요. (0이면 매번 새 연결)
+DATABASES['default']['CONN_MAX_AGE'] = env.int('DB_CONN_MAX_AGE', default=300)
+DATABASES['default']['CONN_HEALTH_CHECKS'] = env.bool('DB_CONN_HEALTH_CHECKS', default=True)
 
 
 # Password validation
@@ -142,5 +150,108 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'Asia/Seoul'
+# 결과 백엔드에는 chord가 모아야 하는 탐색 결과(카테고리 ID)만 저장합니다. 도서별 체인 태스크는 결과를 저장하지 않고
+# (task ignore_result), 최종 결과는 run별 요약(books/progress.py)에 집계됩니다. 남은 결과 키는 이 시간 후 만료됩니다.
+CELERY_TASK_IGNORE_RESULT = True
+CELERY_RESULT_EXPIRES = env.int('CELERY_RESULT_EXPIRES', default=60 * 60 * 6)
+
+# 단계별 큐 (bookroad/celery_config.py가 task_queues/task_routes로 등록)
+# - io : 알라딘 API 호출(탐색/상세 조회)과 DB 필터링. 대부분 네트워크 대기이므로 threads 풀 + 높은 동시성
+# - cpu: 목차 파싱(+ 로컬 모델 임베딩). prefork 풀 + 코어 수만큼의 동시성
+CELERY_IO_QUEUE = env('CELERY_IO_QUEUE', default='io')
+CELERY_CPU_QUEUE = env('CELERY_CPU_QUEUE', default='cpu')
+CELERY_TASK_DEFAULT_QUEUE = CELERY_CPU_QUEUE
+# 긴 CPU 태스크가 한 프로세스에 몰리지 않도록 1개씩만 미리 가져옵니다. (io 워커는 CLI에서 --prefetch-multiplier로 올림)
+CELERY_WORKER_PREFETCH_MULTIPLIER = env.int('CELERY_WORKER_PREFETCH_MULTIPLIER', default=1)
 
 ALADIN_TTB_KEY = env('ALADIN_TTB_KEY')
+# 비워두면 실제 알라딘 API(http://www.aladin.co.kr/ttb/api)를 사용합니다.
+ALADIN_API_BASE_URL = env('ALADIN_API_BASE_URL', default='')
+
+# 수확률 기반 탐색 (books.tasks.discover_isbns_for_category, books.models.DiscoveryStat)
+# - 페이지의 신규 ISBN이 이 수보다 적으면 해당 전략의 다음 페이지를 요청하지 않습니다.
+DISCOVERY_MIN_NEW_PER_PAGE = env.int('DISCOVERY_MIN_NEW_PER_PAGE', default=1)
+# - 연속 N회 실행 동안 신규 ISBN이 없던 검색어 전략은 건너뜁니다. 마지막 실행 후 REPROBE_DAYS가 지나면 다시 시도합니다.
+DISCOVERY_SKIP_AFTER_ZERO_RUNS = env.int('DISCOVERY_SKIP_AFTER_ZERO_RUNS', default=3)
+DISCOVERY_REPROBE_DAYS = env.int('DISCOVERY_REPROBE_DAYS', default=14)
+# - 카테고리당 목록/검색 페이지 요청 상한. 수확률이 높은 전략부터 사용합니다. (0이면 제한 없음)
+DISCOVERY_MAX_PAGES_PER_CATEGORY = env.int('DISCOVERY_MAX_PAGES_PER_CATEGORY', default=0)
+# 상세 조회(ItemLookUp): 탐색 단계에서 목록 정보로 staging된 도서만, 배치 단위로 조회합니다.
+INGEST_LOOKUP_BATCH_SIZE = env.int('INGEST_LOOKUP_BATCH_SIZE', default=20)
+# 워커당 분당 상세 조회 수 상한 (배치 태스크의 rate_limit = 이 값 / 배치 크기)
+ALADIN_LOOKUPS_PER_MINUTE = env.int('ALADIN_LOOKUPS_PER_MINUTE', default=60)
+
+# 갱신 스케줄러 (books.tasks.refresh_stale_books, Celery beat). 시간당 상세 조회 예산이 0이면 스케줄을 등록하지 않습니다.
+REFRESH_LOOKUPS_PER_HOUR = env.int('REFRESH_LOOKUPS_PER_HOUR', default=300)
+REFRESH_INTERVAL_SECONDS = env.int('REFRESH_INTERVAL_SECONDS', default=60 * 60)
+# 마지막 상세 조회 후 이 기간이 지난 도서만 다시 조회합니다.
+REFRESH_MIN_AGE_DAYS = env.int('REFRESH_MIN_AGE_DAYS', default=7)
+# 출간 후 이 기간 이내의 도서는 소개/목차가 보강될 가능성이 높아 갱신 후보로 봅니다.
+REFRESH_RECENT_DAYS = env.int('REFRESH_RECENT_DAYS', default=180)
+CELERY_BEAT_SCHEDULE = {
+    'refresh-stale-books': {
+        'task': 'books.tasks.refresh_stale_books',
+        'schedule': REFRESH_INTERVAL_SECONDS,
+    },
+} if REFRESH_LOOKUPS_PER_HOUR > 0 else {}
+
+# 수집 파이프라인 상태 (진행 카운터, 제출한 ISBN 집합, 탐색 ISBN stash, 갱신 예산). TTL이 지나면 자동으로 정리됩니다.
+# 축출되면 --wait가 멈추거나 탐색 결과가 사라지므로 maxmemory-policy가 noeviction인 Redis여야 합니다.
+# (docker-compose의 redis 서비스. LRU 축출을 쓰는 검색 캐시는 SEARCH_CACHE_URL의 별도 인스턴스)
+PIPELINE_PROGRESS_URL = env('PIPELINE_PROGRESS_URL', default=CELERY_BROKER_URL)
+PIPELINE_PROGRESS_TTL = env.int('PIPELINE_PROGRESS_TTL', default=60 * 60 * 24 * 3)
+
+# Embedding / Search
+EMBEDDING_MODEL_NAME = env('EMBEDDING_MODEL_NAME', default='jhgan/ko-sroberta-multitask')
+# 설정 시 모델을 직접 로드하지 않고 임베딩 서버(bookroad.services.embedding_server)를 호출합니다.
+EMBEDDING_SERVICE_URL = env('EMBEDDING_SERVICE_URL', default='')
+EMBEDDING_SERVICE_TIMEOUT = env.float('EMBEDDING_SERVICE_TIMEOUT', default=30.0)
+# 로컬 모델을 쓰는 prefork 워커(cpu)에서 fork 전에 모델을 한 번만 로드 (bookroad/celery_config.py의 worker_init 훅)
+EMBEDDING_PRELOAD_IN_WORKER = env.bool('EMBEDDING_PRELOAD_IN_WORKER', default=False)
+# prefork 자식 프로세스당 torch 스레드 수
+EMBEDDING_TORCH_THREADS = env.int('EMBEDDING_TORCH_THREADS', default=1)
+
+# 개정판/세트 도서 중복 판별 (toc_parser/minhash.py). 목차 MinHash 추정 유사도가 임계값 이상이면 같은 클러스터로 묶고,
+# 같은 클러스터에서 텍스트가 같은 요약/챕터 제목의 임베딩을 재사용합니다. 후보 수는 파싱 태스크당 조회 상한입니다.
+TOC_DUPLICATE_THRESHOLD = env.float('TOC_DUPLICATE_THRESHOLD', default=0.8)
+TOC_DUPLICATE_MAX_CANDIDATES = env.int('TOC_DUPLICATE_MAX_CANDIDATES', default=50)
+
+# 태스크 -> 큐 라우팅. 임베딩 서버를 쓰면 임베딩 태스크는 HTTP 대기뿐이므로 io 큐로 보냅니다.
+CELERY_TASK_ROUTES = {
+    'books.tasks.discover_isbns_for_category': {'queue': CELERY_IO_QUEUE},
+    'books.tasks.process_discovered_isbns': {'queue': CELERY_IO_QUEUE},
+    'books.tasks.fetch_book_details_batch': {'queue': CELERY_IO_QUEUE},
+    'books.tasks.refresh_stale_books': {'queue': CELERY_IO_QUEUE},
+    'books.tasks.parse_toc_and_create_chapters': {'queue': CELERY_CPU_QUEUE},
+    'books.tasks.generate_embeddings_for_book': {
+        'queue': CELERY_IO_QUEUE if EMBEDDING_SERVICE_URL else CELERY_CPU_QUEUE,
+    },
+}
+
+SEARCH_MAX_K = env.int('SEARCH_MAX_K', default=50)
+# 테이블별 검색 벡터 정밀도: 'vector'(float32 HNSW) 또는 'halfvec'(float16 표현식 HNSW, 인덱스 메모리 약 1/2)
+# 테이블마다 설정된 정밀도의 HNSW 인덱스 하나만 유지합니다. 바꾼 뒤에는 `manage.py sync_vector_indexes`를 실행하세요.
+# (migrate는 설정과 무관하게 'vector' 인덱스만 만들므로, 'halfvec'을 쓰려면 migrate 후에도 실행해야 합니다.)
+SEARCH_VECTOR_PRECISION = {
+    'book': env('SEARCH_BOOK_VECTOR_PRECISION', default='vector'),
+    'chapter': env('SEARCH_CHAPTER_VECTOR_PRECISION', default='vector'),
+}
+# 하이브리드 검색: 벡터/어휘 각각의 후보 수와 RRF 상수
+SEARCH_HYBRID_CANDIDATES = env.int('SEARCH_HYBRID_CANDIDATES', default=100)
+SEARCH_RRF_K = env.int('SEARCH_RRF_K', default=60)
+# 책 단위 그룹핑 검색(target=grouped): 챕터 후보 수 = min(k * FACTOR, MAX)
+SEARCH_GROUP_CANDIDATE_FACTOR = env.int('SEARCH_GROUP_CANDIDATE_FACTOR', default=20)
+SEARCH_GROUP_MAX_CANDIDATES = env.int('SEARCH_GROUP_MAX_CANDIDATES', default=1000)
+# collapse_duplicates=true(기본)일 때 같은 중복 클러스터의 결과를 하나로 접기 위해 k * FACTOR개를 먼저 가져옵니다.
+SEARCH_COLLAPSE_OVERFETCH = env.int('SEARCH_COLLAPSE_OVERFETCH', default=3)
+
+# 검색어 임베딩 / 검색 결과 캐시 (Redis). 키에 TTL이 있으므로 volatile-lru 정책의 전용 인스턴스(redis_cache)에서
+# LRU 축출됩니다. 브로커/파이프라인 상태 Redis(noeviction)와 같은 인스턴스를 쓰면 메모리가 찼을 때 캐시 쓰기가 실패합니다.
+SEARCH_CACHE_URL = env('SEARCH_CACHE_URL', default=CELERY_BROKER_URL)
+SEARCH_EMBEDDING_CACHE_TTL = env.int('SEARCH_EMBEDDING_CACHE_TTL', default=60 * 60 * 24 * 7)
+SEARCH_RESULT_CACHE_TTL = env.int('SEARCH_RESULT_CACHE_TTL', default=60 * 10)
+# 임베딩 태스크가 결과 캐시 세대를 올리는 최소 간격(초). 연속 수집 중 결과 캐시가 책마다 무효화되지 않게 합니다.
+SEARCH_GENERATION_BUMP_INTERVAL = env.int('SEARCH_GENERATION_BUMP_INTERVAL', default=60)
+# bench_search 명령이 비교하는 지연 시간 목표치 (ms)
+SEARCH_LATENCY_TARGET_P50_MS = env.int('SEARCH_LATENCY_TARGET_P50_MS', default=50)
+SEARCH_LATENCY_TARGET_P99_MS = env.int('SEARCH_LATENCY_TARGET_P99_MS', default=250)
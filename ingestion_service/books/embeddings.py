@@ -0,0 +1,94 @@
+# books/embeddings.py
+import gc
+import threading
+import time
+
+from django.conf import settings
+
+from bookroad.services.embedding_client import EmbeddingClient
+
+_model = None
+_model_lock = threading.Lock()
+_client = None
+
+
+def _load_model():
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                from sentence_transformers import SentenceTransformer
+                _model = SentenceTransformer(settings.EMBEDDING_MODEL_NAME)
+                return True
+    return False
+
+
+def get_embedding_model():
+    """
+    sentence-transformer 모델을 프로세스당 한 번만 로드합니다. (첫 호출 시 지연 로딩)
+    이 프로세스에서 처음 로드했다면 torch 스레드 수도 EMBEDDING_TORCH_THREADS로 제한합니다.
+    (preload 없이 워커 자식이 첫 태스크에서 모델을 로드하는 경우에도 스레드 수가 제한되도록)
+    """
+    if _load_model():
+        _limit_torch_threads()
+    return _model
+
+
+def preload_embedding_model():
+    """
+    Celery prefork 부모 프로세스(worker_init)에서 모델을 미리 로드합니다.
+    자식 프로세스는 fork 시점의 메모리를 copy-on-write로 공유하므로 모델 가중치를 한 벌만 갖게 되고,
+    자식마다 첫 태스크에서 모델을 로드하는 지연도 사라집니다.
+    (부모에서 encode를 호출하지 않습니다. fork 전에 torch의 OpenMP 스레드 풀이 만들어지면 자식에서 멈출 수 있습니다.)
+
+    반환값: 로드에 걸린 시간(초)
+    """
+    started = time.perf_counter()
+    # 부모에서는 스레드 수를 설정하지 않습니다. 자식의 worker_process_init에서 configure_worker_process()가 설정합니다.
+    _load_model()
+    # 로드 과정에서 만들어진 객체를 GC 추적 대상에서 빼서, 자식의 GC가 refcount/헤더를 건드려 페이지를 복사하지 않게 합니다.
+    gc.freeze()
+    return time.perf_counter() - started
+
+
+def _limit_torch_threads():
+    import torch
+    torch.set_num_threads(settings.EMBEDDING_TORCH_THREADS)
+
+
+def configure_worker_process():
+    """
+    fork된 자식 프로세스(worker_process_init)에서 torch 스레드 수를 제한합니다.
+    prefork 동시성 N x 코어 수만큼 스레드가 생겨 서로 경합하는 것을 막습니다.
+    부모에서 preload한 모델이 없으면 torch를 import하지 않고, 자식이 모델을 처음 로드할 때
+    get_embedding_model()이 같은 제한을 적용합니다.
+    """
+    if _model is None:
+        return
+    _limit_torch_threads()
+
+
+def get_embedding_client():
+    global _client
+    if _client is None:
+        _client = EmbeddingClient()
+    return _client
+
+
+def encode_texts(texts):
+    """
+    텍스트 목록을 한 번의 배치로 임베딩하여 float 리스트의 리스트로 반환합니다.
+    EMBEDDING_SERVICE_URL이 설정되어 있으면 embedding_server(모델 1벌 + 동적 배칭)를 호출하고,
+    없으면 이 프로세스에 모델을 직접 로드합니다.
+    """
+    if not texts:
+        return []
+    if settings.EMBEDDING_SERVICE_URL:
+        return get_embedding_client().encode(texts)
+    vectors = get_embedding_model().encode(list(texts), batch_size=32, show_progress_bar=False)
+    return [vector.tolist() for vector in vectors]
+
+
+def encode_query(text):
+    """검색어 하나를 임베딩합니다."""
+    return encode_texts([text])[0]
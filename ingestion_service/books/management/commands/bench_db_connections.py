@@ -0,0 +1,72 @@
+# books/management/commands/bench_db_connections.py
+
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+from django.db.backends.signals import connection_created
+
+from books.models import Book
+
+
+def _simulated_task(isbns):
+    """
+    Celery 태스크 하나의 DB 사용을 흉내 냅니다.
+    태스크 전후의 close_old_connections()는 Celery Django fixup이 task_prerun/task_postrun에서 하는 일과 같습니다.
+    """
+    close_old_connections()
+    existing = set(Book.objects.filter(isbn__in=isbns).values_list('isbn', flat=True))
+    close_old_connections()
+    return existing
+
+
+class Command(BaseCommand):
+    help = ('태스크당 DB 오버헤드를 CONN_MAX_AGE=0(태스크마다 새 연결)과 현재 설정(연결 재사용)으로 비교합니다. '
+            '작은 조회 하나를 하는 태스크를 N번 실행하고 태스크당 지연과 새 연결 수를 출력합니다.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=500, help='모드별로 실행할 가상 태스크 수')
+
+    def handle(self, *args, **options):
+        opened = []
+        connection_created.connect(lambda sender, connection, **kwargs: opened.append(1), weak=False)
+
+        configured = settings.DATABASES['default']['CONN_MAX_AGE']
+        health_checks = settings.DATABASES['default'].get('CONN_HEALTH_CHECKS', False)
+        isbns = list(Book.objects.values_list('isbn', flat=True)[:50]) or ['9780000000000']
+
+        results = {}
+        for label, max_age in (('CONN_MAX_AGE=0', 0), (f'CONN_MAX_AGE={configured}', configured)):
+            # close_at은 연결 시점의 settings_dict로 계산되므로, 설정을 바꾼 뒤 기존 연결을 닫고 시작합니다.
+            connection.close()
+            connection.settings_dict['CONN_MAX_AGE'] = max_age
+            _simulated_task(isbns)  # 워밍업 (쿼리 컴파일/임포트 비용 제외)
+            opened.clear()
+
+            timings = []
+            for _ in range(options['tasks']):
+                started = time.perf_counter()
+                _simulated_task(isbns)
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            results[label] = {
+                'mean': statistics.fmean(timings),
+                'p50': timings[len(timings) // 2],
+                'p95': timings[int(len(timings) * 0.95) - 1],
+                'connections': len(opened),
+            }
+
+        connection.close()
+        connection.settings_dict['CONN_MAX_AGE'] = configured
+
+        self.stdout.write(f"가상 태스크 {options['tasks']}개/모드, CONN_HEALTH_CHECKS={health_checks}")
+        self.stdout.write(f"{'':<22}{'mean':>9}{'p50':>9}{'p95':>9}{'새 연결':>9}")
+        for label, r in results.items():
+            self.stdout.write(f"{label:<22}{r['mean']:>7.2f}ms{r['p50']:>7.2f}ms{r['p95']:>7.2f}ms{r['connections']:>9}")
+        before, after = results.values()
+        self.stdout.write(self.style.SUCCESS(
+            f"\n태스크당 DB 오버헤드: {before['mean']:.2f}ms -> {after['mean']:.2f}ms "
+            f"(연결 {before['connections']}회 -> {after['connections']}회)"
+        ))
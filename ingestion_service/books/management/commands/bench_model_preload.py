@@ -0,0 +1,97 @@
+# books/management/commands/bench_model_preload.py
+
+import multiprocessing
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from books import embeddings
+
+SAMPLE_TEXTS = ['파이썬으로 배우는 데이터 분석', '1장 자료구조와 알고리즘', '머신러닝 입문']
+
+
+def _smaps_rollup(pid):
+    """/proc/<pid>/smaps_rollup에서 Rss/Pss(kB)를 읽습니다. Pss는 공유 페이지를 공유 프로세스 수로 나눈 값입니다."""
+    values = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            key, _, rest = line.partition(':')
+            if key in ('Rss', 'Pss'):
+                values[key] = int(rest.split()[0])
+    return values
+
+
+def _child(forked_at, ready, release):
+    """fork된 워커 자식처럼 동작: 첫 encode까지 걸린 시간을 보고한 뒤, 메모리를 측정할 때까지 대기합니다."""
+    embeddings.configure_worker_process()
+    embeddings.get_embedding_model().encode(SAMPLE_TEXTS, batch_size=32, show_progress_bar=False)
+    ready.put((os.getpid(), time.perf_counter() - forked_at))
+    release.wait()
+
+
+def _run(mode, processes):
+    """mode='lazy'는 자식마다 모델을 로드하고, mode='preload'는 부모에서 한 번 로드한 뒤 fork합니다."""
+    ctx = multiprocessing.get_context('fork')
+    ready, release = ctx.Queue(), ctx.Event()
+
+    parent_load = 0.0
+    if mode == 'preload':
+        parent_load = embeddings.preload_embedding_model()
+
+    started = time.perf_counter()
+    children = [ctx.Process(target=_child, args=(time.perf_counter(), ready, release)) for _ in range(processes)]
+    for child in children:
+        child.start()
+    first_encode = dict(ready.get(timeout=600) for _ in children)
+    all_ready = time.perf_counter() - started
+
+    memory = {pid: _smaps_rollup(pid) for pid in first_encode}
+    parent_memory = _smaps_rollup(os.getpid())
+    release.set()
+    for child in children:
+        child.join()
+
+    return {
+        'parent_load': parent_load,
+        'first_encode_max': max(first_encode.values()),
+        'all_ready': all_ready,
+        'children_rss_mb': sum(m['Rss'] for m in memory.values()) / 1024,
+        'children_pss_mb': sum(m['Pss'] for m in memory.values()) / 1024,
+        'parent_pss_mb': parent_memory['Pss'] / 1024,
+    }
+
+
+class Command(BaseCommand):
+    help = ('prefork 워커에서 임베딩 모델을 자식마다 로드하는 경우(lazy)와 부모에서 미리 로드해 '
+            'copy-on-write로 공유하는 경우(preload)의 기동 시간과 메모리(RSS/PSS)를 비교합니다. (Linux 전용)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=4, help='fork할 자식 프로세스 수 (워커 concurrency)')
+
+    def handle(self, *args, **options):
+        if not os.path.exists('/proc/self/smaps_rollup'):
+            raise CommandError('/proc/<pid>/smaps_rollup을 읽을 수 없습니다. (Linux 4.14+ 필요)')
+        if embeddings._model is not None:
+            raise CommandError('모델이 이미 로드된 프로세스에서는 lazy 모드를 측정할 수 없습니다.')
+
+        processes = options['processes']
+        self.stdout.write(f"모델 '{settings.EMBEDDING_MODEL_NAME}', 자식 {processes}개, "
+                          f"torch 스레드/자식 {settings.EMBEDDING_TORCH_THREADS}")
+        # lazy를 먼저 측정해야 부모에 모델이 없는 상태에서 fork됩니다.
+        results = {mode: _run(mode, processes) for mode in ('lazy', 'preload')}
+
+        self.stdout.write(f"\n{'':<8}{'부모 로드':>10}{'첫 encode(최대)':>16}{'전체 준비':>10}"
+                          f"{'자식 RSS 합':>12}{'자식 PSS 합':>12}{'부모 PSS':>10}")
+        for mode, r in results.items():
+            self.stdout.write(
+                f"{mode:<8}{r['parent_load']:>9.1f}s{r['first_encode_max']:>15.1f}s{r['all_ready']:>9.1f}s"
+                f"{r['children_rss_mb']:>10.0f}MB{r['children_pss_mb']:>10.0f}MB{r['parent_pss_mb']:>8.0f}MB"
+            )
+        lazy, preload = results['lazy'], results['preload']
+        self.stdout.write(self.style.SUCCESS(
+            f"\n메모리(자식 PSS + 부모 PSS): {lazy['children_pss_mb'] + lazy['parent_pss_mb']:.0f}MB -> "
+            f"{preload['children_pss_mb'] + preload['parent_pss_mb']:.0f}MB, "
+            f"자식 첫 encode까지: {lazy['first_encode_max']:.1f}s -> {preload['first_encode_max']:.1f}s"
+        ))
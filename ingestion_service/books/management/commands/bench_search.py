@@ -0,0 +1,85 @@
+# books/management/commands/bench_search.py
+
+import json
+import statistics
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+DEFAULT_QUERIES = ['파이썬 입문', '딥러닝', '자료구조와 알고리즘', '리액트 상태 관리', 'SQL 튜닝', '쿠버네티스 운영']
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class Command(BaseCommand):
+    help = '검색 API(/api/search/)에 동시 요청을 보내 p50/p95/p99 지연 시간과 처리량을 측정합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', type=str, default='http://localhost:8000/api/search/', help='검색 API URL')
+        parser.add_argument('--concurrency', type=int, default=8, help='동시 요청 수 (스레드)')
+        parser.add_argument('--requests', type=int, default=200, help='총 요청 수')
+        parser.add_argument('--warmup', type=int, default=5, help='측정 전 워밍업 요청 수 (모델 로딩 등)')
+        parser.add_argument('--target', type=str, default='chapters', choices=['books', 'chapters', 'grouped'])
+        parser.add_argument('--k', type=int, default=10)
+        parser.add_argument('--query', type=str, action='append', help='사용할 검색어 (여러 번 지정 가능)')
+
+    def handle(self, *args, **options):
+        queries = options['query'] or DEFAULT_QUERIES
+
+        def call(i):
+            params = urllib.parse.urlencode({
+                'q': queries[i % len(queries)],
+                'target': options['target'],
+                'k': options['k'],
+            })
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(f"{options['url']}?{params}", timeout=30) as response:
+                    json.load(response)
+                ok = True
+            except (urllib.error.URLError, ValueError):
+                ok = False
+            return ok, (time.perf_counter() - started) * 1000
+
+        for i in range(options['warmup']):
+            call(i)
+
+        wall_started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+            outcomes = list(executor.map(call, range(options['requests'])))
+        wall_elapsed = time.perf_counter() - wall_started
+
+        latencies = sorted(ms for ok, ms in outcomes if ok)
+        errors = sum(1 for ok, _ in outcomes if not ok)
+        if not latencies:
+            self.stdout.write(self.style.ERROR(f"모든 요청이 실패했습니다. ({errors} errors)"))
+            return
+
+        p50 = _percentile(latencies, 50)
+        p95 = _percentile(latencies, 95)
+        p99 = _percentile(latencies, 99)
+        self.stdout.write(
+            f"requests={len(outcomes)} concurrency={options['concurrency']} errors={errors} "
+            f"throughput={len(latencies) / wall_elapsed:.1f} req/s"
+        )
+        self.stdout.write(
+            f"latency ms: mean={statistics.fmean(latencies):.1f} p50={p50:.1f} p95={p95:.1f} p99={p99:.1f} "
+            f"max={latencies[-1]:.1f}"
+        )
+
+        target_p50 = settings.SEARCH_LATENCY_TARGET_P50_MS
+        target_p99 = settings.SEARCH_LATENCY_TARGET_P99_MS
+        if p50 <= target_p50 and p99 <= target_p99:
+            self.stdout.write(self.style.SUCCESS(f"✅ 목표 충족 (p50 <= {target_p50}ms, p99 <= {target_p99}ms)"))
+        else:
+            self.stdout.write(self.style.WARNING(f"⚠️ 목표 미달 (p50 <= {target_p50}ms, p99 <= {target_p99}ms)"))
@@ -0,0 +1,133 @@
+# books/management/commands/load_test_pipeline.py
+
+import json
+import time
+import urllib.error
+import urllib.request
+
+from celery import chain, group
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from bookroad.services.fake_aladin import FAKE_ISBN_PREFIX
+from books import progress as run_progress
+from books.models import Book, BookContent, Chapter
+from books.tasks import discover_isbns_for_category, process_discovered_isbns
+
+WRITE_TABLES = (Book._meta.db_table, BookContent._meta.db_table, Chapter._meta.db_table)
+
+
+def _db_writes():
+    """books_book / books_bookcontent / books_chapter의 누적 insert/update/delete 튜플 수. (pg_stat_user_tables)"""
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_stat_clear_snapshot()')  # 트랜잭션 안에서도 최신 통계를 읽도록
+        cursor.execute(
+            'SELECT relname, n_tup_ins, n_tup_upd, n_tup_del FROM pg_stat_user_tables WHERE relname = ANY(%s)',
+            [list(WRITE_TABLES)],
+        )
+        return {relname: {'ins': ins, 'upd': upd, 'del': dele} for relname, ins, upd, dele in cursor.fetchall()}
+
+
+def _progress():
+    books = Book.objects.filter(isbn__startswith=FAKE_ISBN_PREFIX)
+    return {
+        'books': books.count(),
+        'parsed': books.exclude(toc_parser_version='').count(),
+        'embedded': books.filter(summary_embedding__isnull=False).count(),
+        'chapters': Chapter.objects.filter(book__isbn__startswith=FAKE_ISBN_PREFIX).count(),
+    }
+
+
+class Command(BaseCommand):
+    help = ('로컬 알라딘 대역 서버(bookroad.services.fake_aladin)를 대상으로 전체 수집 파이프라인을 실행하고 '
+            'books/min, 책당 API 호출 수, 책당 DB 쓰기 수를 보고합니다. '
+            '워커는 ALADIN_API_BASE_URL=<fake-url>/ttb/api 로 실행되어 있어야 합니다.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fake-url', type=str, default='http://fake_aladin:8002', help='대역 서버 주소 (관리 API용)')
+        parser.add_argument('--categories', type=int, nargs='+', default=[90001, 90002, 90003],
+                            help='탐색할 카테고리 ID (대역 서버는 어떤 ID든 합성 도서를 만들어 응답합니다)')
+        parser.add_argument('--purge', action='store_true', help='시작 전에 대역 서버 ISBN 대역의 Book/Chapter를 삭제')
+        parser.add_argument('--idle-seconds', type=int, default=30, help='이 시간 동안 진행이 없으면 완료로 판단')
+        parser.add_argument('--timeout', type=int, default=3600)
+        parser.add_argument('--poll', type=float, default=2.0)
+
+    def _fake(self, path, method='GET'):
+        request = urllib.request.Request(f"{self.fake_url}{path}", method=method)
+        try:
+            with urllib.request.urlopen(request, timeout=10) as response:
+                return json.load(response)
+        except (urllib.error.URLError, ValueError) as e:
+            raise CommandError(f"대역 서버({self.fake_url})에 연결할 수 없습니다: {e}")
+
+    def handle(self, *args, **options):
+        self.fake_url = options['fake_url'].rstrip('/')
+
+        if options['purge']:
+            deleted, _ = Book.objects.filter(isbn__startswith=FAKE_ISBN_PREFIX).delete()
+            self.stdout.write(f"Purged {deleted} rows in the fake ISBN range ({FAKE_ISBN_PREFIX}*).")
+
+        self._fake('/_reset', method='POST')
+        writes_before = _db_writes()
+        progress_before = _progress()
+
+        run_id = run_progress.new_run(categories_total=len(options['categories']), batches_total=1)
+        pipeline = chain(
+            group(discover_isbns_for_category.s(cid, run_id=run_id) for cid in options['categories'])
+            | process_discovered_isbns.s(run_id=run_id)
+        )
+        started = time.monotonic()
+        pipeline.apply_async()
+        self.stdout.write(self.style.WARNING(
+            f"🚀 Dispatched discovery for {len(options['categories'])} categories. Waiting for the pipeline to go idle..."
+        ))
+
+        last_change, last_snapshot = started, None
+        while True:
+            time.sleep(options['poll'])
+            stats = self._fake('/_stats')
+            snapshot = (_progress(), stats['total_calls'])
+            now = time.monotonic()
+            if snapshot != last_snapshot:
+                last_change, last_snapshot = now, snapshot
+                progress = snapshot[0]
+                self.stdout.write(
+                    f"  t={now - started:6.0f}s  api={stats['total_calls']:6d}  books={progress['books']:6d}  "
+                    f"parsed={progress['parsed']:6d}  embedded={progress['embedded']:6d}  chapters={progress['chapters']:7d}"
+                )
+            if stats['total_calls'] == 0 and now - started > 60:
+                raise CommandError('대역 서버로 요청이 오지 않습니다. 워커의 ALADIN_API_BASE_URL 설정을 확인하세요.')
+            if now - last_change >= options['idle_seconds'] or now - started >= options['timeout']:
+                break
+
+        elapsed = last_change - started
+        stats = self._fake('/_stats')
+        progress = _progress()
+        writes_after = _db_writes()
+
+        new_books = progress['books'] - progress_before['books']
+        per_book = (lambda value: value / new_books) if new_books else (lambda value: float('nan'))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"\n📊 Pipeline load test ({elapsed:.0f}s until idle, {len(options['categories'])} categories)"
+        ))
+        self.stdout.write(f"  books created   : {new_books} (parsed {progress['parsed'] - progress_before['parsed']}, "
+                          f"embedded {progress['embedded'] - progress_before['embedded']}, "
+                          f"{progress['chapters'] - progress_before['chapters']} chapters)")
+        self.stdout.write(f"  throughput      : {new_books / elapsed * 60 if elapsed else 0:.1f} books/min")
+        self.stdout.write(f"  API calls       : {stats['total_calls']} total, {per_book(stats['total_calls']):.2f}/book "
+                          f"({', '.join(f'{k} {v}' for k, v in sorted(stats['calls'].items()))}; "
+                          f"{stats['errors']} injected errors)")
+        self.stdout.write(f"  ISBN funnel     : {stats['listed_isbns']} listed -> {stats['looked_up_isbns']} looked up "
+                          f"-> {new_books} saved")
+        total_writes = 0
+        for table in WRITE_TABLES:
+            before, after = writes_before.get(table, {}), writes_after.get(table, {})
+            delta = {k: after.get(k, 0) - before.get(k, 0) for k in ('ins', 'upd', 'del')}
+            total_writes += sum(delta.values())
+            self.stdout.write(f"  DB writes {table:<17}: ins {delta['ins']}, upd {delta['upd']}, del {delta['del']}")
+        self.stdout.write(f"  DB writes/book  : {per_book(total_writes):.2f} rows")
+        summary = run_progress.get_summary(run_id)
+        if summary:
+            self.stdout.write(f"  outcomes        : "
+                              f"{', '.join(f'{k} {v}' for k, v in sorted(summary['outcomes'].items())) or '-'}")
@@ -2,9 +2,11 @@
 
 import json
 import os
+import time
 from django.conf import settings
 from django.core.management.base import BaseCommand, CommandError
 from celery import group, chain
+from books import progress
 from books.tasks import discover_isbns_for_category, process_discovered_isbns
 
 
@@ -19,6 +21,37 @@ class Command(BaseCommand):
             default='target_categories.json',
             help='사용할 카테고리 ID가 포함된 JSON 파일 경로. (기본값: target_categories.json)'
         )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=0,
+            help='한 번에 제출할 카테고리 수. 앞 청크의 탐색이 끝나야 다음 청크를 제출합니다. (기본값: 0 = 전체 한 번에)'
+        )
+        parser.add_argument(
+            '--max-pending-books',
+            type=int,
+            default=0,
+            help='청크 제출 시, 처리 중인 도서 체인이 이 수 이하로 줄어들 때까지 기다립니다. (기본값: 0 = 제한 없음)'
+        )
+        parser.add_argument(
+            '--wait',
+            action='store_true',
+            help='파이프라인이 끝날 때까지 진행 상황을 출력하고 마지막에 처리량 요약을 보여줍니다.'
+        )
+        parser.add_argument('--poll', type=float, default=5.0, help='진행 상황 조회 간격(초)')
+        parser.add_argument(
+            '--timeout',
+            type=float,
+            default=0,
+            help='대기(청크 간 대기와 --wait 각각)의 최대 시간(초). 넘으면 마지막 진행 상황을 출력하고 중단합니다. (기본값: 0 = 제한 없음)'
+        )
+        parser.add_argument(
+            '--stall-polls',
+            type=int,
+            default=120,
+            help='진행 카운터가 이 횟수만큼 연속으로 조회되는 동안 변하지 않으면 중단합니다. '
+                 '(탐색 태스크 실패로 chord 콜백이 실행되지 않은 경우 등) (기본값: 120, 0 = 사용 안 함)'
+        )
 
     def handle(self, *args, **options):
         file_path = options['file']
@@ -39,20 +72,120 @@ class Command(BaseCommand):
         except json.JSONDecodeError:
             raise CommandError(f"'{file_path}' 파일이 올바른 JSON 형식이 아닙니다.")
 
+        chunk_size = options['chunk_size'] if options['chunk_size'] > 0 else len(category_ids)
+        chunks = [category_ids[i:i + chunk_size] for i in range(0, len(category_ids), chunk_size)]
+        run_id = progress.new_run(categories_total=len(category_ids), batches_total=len(chunks))
+
         self.stdout.write(
-            self.style.SUCCESS(f"✅ '{file_path}' 파일에서 {len(category_ids)}개 카테고리를 읽었습니다. 파이프라인을 시작합니다.")
+            self.style.SUCCESS(f"✅ '{file_path}' 파일에서 {len(category_ids)}개 카테고리를 읽었습니다. "
+                               f"{len(chunks)}개 청크로 파이프라인을 시작합니다. (run_id={run_id})")
         )
 
-        # [변경점 3] 파이프라인 로직은 그대로 유지
-        discovery_group = group(discover_isbns_for_category.s(cid) for cid in category_ids)
-        process_task = process_discovered_isbns.s()
-        pipeline = chain(discovery_group | process_task)
+        # [변경점 3] 청크마다 [카테고리 탐색 group -> 신규 ISBN 필터링/체인 제출] 파이프라인을 제출합니다.
+        self.started = time.time()
+        submitted = 0
+        for index, chunk in enumerate(chunks):
+            if index > 0:
+                # 앞 청크의 탐색이 끝나고 처리 중인 도서가 충분히 줄어들 때까지 대기 (버스트 방지)
+                self._wait_until(
+                    run_id, options,
+                    lambda p: p['categories_discovered'] >= submitted and p['batches_processed'] >= index and (
+                        options['max_pending_books'] <= 0
+                        or p['isbns_new'] - p['books_finished'] <= options['max_pending_books']
+                    ),
+                )
+
+            discovery_group = group(discover_isbns_for_category.s(cid, run_id=run_id) for cid in chunk)
+            process_task = process_discovered_isbns.s(run_id=run_id)
+            pipeline = chain(discovery_group | process_task)
+            pipeline.apply_async()
+            submitted += len(chunk)
+            self.stdout.write(f"   청크 {index + 1}/{len(chunks)} 제출: 카테고리 {len(chunk)}개")
+
+        if not options['wait']:
+            self.stdout.write(
+                self.style.WARNING("🚀 Celery 워커에게 작업을 전달했습니다. 백그라운드에서 데이터 구축이 시작됩니다.")
+            )
+            self.stdout.write(
+                self.style.NOTICE(f"   (진행 상황은 'python manage.py start_discovery --wait'를 사용하거나 "
+                                  f"Redis 해시 '{progress.RUN_KEY_PREFIX}:{run_id}:progress'로 확인하세요)")
+            )
+            return
+
+        final = self._wait_until(run_id, options, progress.is_finished)
+        self._print_summary(final)
+        self._print_outcomes(progress.get_summary(run_id))
+
+    def _wait_until(self, run_id, options, predicate):
+        """
+        진행 카운터를 poll초마다 조회/출력하며 predicate(progress)가 참이 될 때까지 기다립니다.
+        --timeout을 넘기거나 카운터가 --stall-polls번 연속으로 그대로이면 마지막 진행 상황을 출력하고 중단합니다.
+        (탐색 태스크 하나가 실패하면 chord 콜백인 process_discovered_isbns가 실행되지 않아 카운터가 멈춥니다)
+        """
+        poll, timeout, stall_polls = options['poll'], options['timeout'], options['stall_polls']
+        deadline = time.time() + timeout if timeout > 0 else None
+        last, unchanged = None, 0
+        while True:
+            current = progress.get_progress(run_id)
+            if current is None:
+                raise CommandError(f"진행 카운터를 읽을 수 없습니다. (run_id={run_id}, PIPELINE_PROGRESS_URL 확인)")
+            if current != last:
+                self._print_progress(current)
+                last, unchanged = current, 0
+            else:
+                unchanged += 1
+            if predicate(current):
+                return current
 
-        pipeline.apply_async()
+            if deadline is not None and time.time() >= deadline:
+                self._abort_wait(run_id, current, f"{timeout:.0f}초 안에 끝나지 않았습니다.")
+            if stall_polls > 0 and unchanged >= stall_polls:
+                self._abort_wait(
+                    run_id, current,
+                    f"진행 카운터가 {unchanged}회({unchanged * poll:.0f}초) 연속으로 변하지 않았습니다. "
+                    f"탐색 태스크 실패로 process_discovered_isbns가 실행되지 않았을 수 있습니다. (워커 로그 확인)",
+                )
+            time.sleep(poll)
 
+    def _abort_wait(self, run_id, current, reason):
+        """마지막 진행 상황과 결과 분포를 출력하고 CommandError로 중단합니다."""
+        self.stdout.write(self.style.WARNING("⚠️ 마지막 진행 상황:"))
+        self._print_progress(current)
         self.stdout.write(
-            self.style.WARNING("🚀 Celery 워커에게 작업을 전달했습니다. 백그라운드에서 데이터 구축이 시작됩니다.")
+            f"   배치 {current['batches_processed']}/{current['batches_total']} 처리 "
+            f"(Redis 해시 '{progress.RUN_KEY_PREFIX}:{run_id}:progress')"
         )
+        self._print_outcomes(progress.get_summary(run_id))
+        raise CommandError(f"대기를 중단합니다: {reason} (run_id={run_id})")
+
+    def _print_progress(self, p):
+        elapsed = time.time() - self.started
         self.stdout.write(
-            self.style.NOTICE("   (진행 상황은 'docker-compose logs -f celery_worker' 명령어로 확인하세요)")
-        )
\ No newline at end of file
+            f"   [{elapsed:7.0f}s] 카테고리 {p['categories_discovered']}/{p['categories_total']} | "
+            f"ISBN 발견 {p['isbns_found']} (신규 {p['isbns_new']}) | "
+            f"조회 {p['books_fetched']} · 파싱 {p['books_parsed']} · 임베딩 {p['books_embedded']} · "
+            f"실패 {p['books_failed']} | 완료 {p['books_finished']}/{p['isbns_new']}"
+        )
+
+    def _print_summary(self, p):
+        elapsed = max(time.time() - self.started, 1e-9)
+        per_min = lambda count: count / elapsed * 60  # noqa: E731
+        self.stdout.write(self.style.SUCCESS(f"\n📊 파이프라인 완료 ({elapsed:.0f}초)"))
+        self.stdout.write(f"   카테고리   : {p['categories_discovered']}개 ({per_min(p['categories_discovered']):.1f}/분)")
+        self.stdout.write(f"   ISBN       : 발견 {p['isbns_found']}, 신규 {p['isbns_new']}")
+        self.stdout.write(f"   상세 조회  : {p['books_fetched']}권 ({per_min(p['books_fetched']):.1f}권/분)")
+        self.stdout.write(f"   목차 파싱  : {p['books_parsed']}권")
+        self.stdout.write(f"   임베딩     : {p['books_embedded']}권 ({per_min(p['books_embedded']):.1f}권/분)")
+        self.stdout.write(f"   실패       : {p['books_failed']}권")
+
+    def _print_outcomes(self, summary):
+        """도서별 최종 결과 분포와 최근 실패 샘플을 출력합니다. (태스크 반환값 대신 run 요약에 집계된 값)"""
+        if not summary:
+            return
+        outcomes = ', '.join(f"{outcome} {count}" for outcome, count in sorted(summary['outcomes'].items()))
+        self.stdout.write(f"   결과 분포  : {outcomes or '-'}")
+        for failure in summary['failures'][:10]:
+            self.stdout.write(f"     - {failure}")
+        if len(summary['failures']) > 10:
+            self.stdout.write(f"     ... (최근 {len(summary['failures'])}건 보관, "
+                              f"{progress.RUN_KEY_PREFIX}:<run_id>:failures)")
@@ -0,0 +1,18 @@
+# books/management/commands/sync_vector_indexes.py
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from books.vector_indexes import sync_vector_indexes
+
+
+class Command(BaseCommand):
+    help = ('SEARCH_BOOK_VECTOR_PRECISION / SEARCH_CHAPTER_VECTOR_PRECISION에 맞는 HNSW 인덱스만 남깁니다. '
+            '(새 인덱스를 CONCURRENTLY로 만든 뒤 다른 정밀도의 인덱스를 제거)')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"정밀도 설정: {settings.SEARCH_VECTOR_PRECISION}")
+        for table, index_name, dropped in sync_vector_indexes(connection):
+            self.stdout.write(self.style.SUCCESS(
+                f"{table}: {index_name} 유지" + (f", 제거 대상 {', '.join(dropped)}" if dropped else "")))
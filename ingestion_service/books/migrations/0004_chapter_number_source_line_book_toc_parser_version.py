@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-19 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0003_alter_chapter_title'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='toc_parser_version',
+            field=models.CharField(blank=True, help_text='Chapter를 생성한 toc_parser 버전', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='chapter',
+            name='number',
+            field=models.CharField(blank=True, help_text='챕터 번호 (예: 1, 1.2, IV)', max_length=50),
+        ),
+        migrations.AddField(
+            model_name='chapter',
+            name='source_line',
+            field=models.PositiveIntegerField(default=0, help_text='raw_toc 내 원본 라인 번호'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.7 on 2026-10-19 10:03
+
+import pgvector.django.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0004_chapter_number_source_line_book_toc_parser_version'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='book',
+            index=pgvector.django.indexes.HnswIndex(ef_construction=64, fields=['summary_embedding'], m=16, name='book_summary_emb_hnsw', opclasses=['vector_cosine_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='chapter',
+            index=pgvector.django.indexes.HnswIndex(ef_construction=64, fields=['title_embedding'], m=16, name='chapter_title_emb_hnsw', opclasses=['vector_cosine_ops']),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-19 11:20
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0005_book_summary_emb_hnsw_chapter_title_emb_hnsw'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+
+        migrations.AddIndex(
+            model_name='book',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['title'], name='book_title_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['author'], name='book_author_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='chapter',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['title'], name='chapter_title_trgm', opclasses=['gin_trgm_ops']),
+        ),
+    ]
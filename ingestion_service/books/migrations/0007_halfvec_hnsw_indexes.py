@@ -0,0 +1,14 @@
+# Generated by Django 5.2.7 on 2026-10-19 13:41
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # halfvec 표현식 HNSW 인덱스는 여기서 만들지 않습니다. (같은 컬럼에 그래프를 두 벌 만들지 않도록)
+    # 정밀도 전환은 `manage.py sync_vector_indexes`가 담당합니다. (books/vector_indexes.py, 0016 참고)
+
+    dependencies = [
+        ('books', '0006_trigram_indexes'),
+    ]
+
+    operations = []
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0007_halfvec_hnsw_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookContent',
+            fields=[
+                ('book', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='content', serialize=False, to='books.book')),
+                ('full_description', models.TextField(blank=True, help_text='책소개 (상세)')),
+                ('publisher_description', models.TextField(blank=True, help_text='출판사 제공 책소개')),
+                ('authors_json', models.JSONField(blank=True, help_text='저자 상세 정보 (JSON)', null=True)),
+                ('raw_toc', models.TextField(blank=True, help_text='알라딘 API 원본 목차(파싱 전)')),
+            ],
+        ),
+    ]
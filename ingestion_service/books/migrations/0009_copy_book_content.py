@@ -0,0 +1,55 @@
+# books/migrations/0009_copy_book_content.py
+
+from django.db import migrations
+
+# 한 트랜잭션에서 옮길 Book id 범위. (atomic=False이므로 배치마다 커밋되어 books_book 잠금/WAL이 배치 단위로 끝납니다)
+BATCH_SIZE = 5000
+
+
+def _book_id_range(cursor):
+    cursor.execute('SELECT MIN(id), MAX(id) FROM books_book')
+    return cursor.fetchone()
+
+
+def copy_book_content(apps, schema_editor):
+    """books_book의 큰 필드를 books_bookcontent로 배치 복사합니다. 다시 실행해도 안전합니다. (ON CONFLICT DO NOTHING)"""
+    with schema_editor.connection.cursor() as cursor:
+        low, high = _book_id_range(cursor)
+        if low is None:
+            return
+        for start in range(low, high + 1, BATCH_SIZE):
+            cursor.execute(
+                'INSERT INTO books_bookcontent (book_id, full_description, publisher_description, authors_json, raw_toc) '
+                'SELECT id, full_description, publisher_description, authors_json, raw_toc '
+                'FROM books_book WHERE id >= %s AND id < %s '
+                'ON CONFLICT (book_id) DO NOTHING',
+                [start, start + BATCH_SIZE],
+            )
+
+
+def restore_book_content(apps, schema_editor):
+    """역방향: books_bookcontent의 값을 books_book으로 배치 복사합니다. (0010을 되돌려 컬럼이 다시 생긴 뒤 실행됨)"""
+    with schema_editor.connection.cursor() as cursor:
+        low, high = _book_id_range(cursor)
+        if low is None:
+            return
+        for start in range(low, high + 1, BATCH_SIZE):
+            cursor.execute(
+                'UPDATE books_book b SET full_description = c.full_description, '
+                'publisher_description = c.publisher_description, authors_json = c.authors_json, raw_toc = c.raw_toc '
+                'FROM books_bookcontent c WHERE c.book_id = b.id AND b.id >= %s AND b.id < %s',
+                [start, start + BATCH_SIZE],
+            )
+
+
+class Migration(migrations.Migration):
+    # 배치마다 커밋합니다. 중간에 실패해도 다시 migrate하면 ON CONFLICT로 이미 옮긴 행을 건너뛰며 이어서 복사됩니다.
+    atomic = False
+
+    dependencies = [
+        ('books', '0008_bookcontent'),
+    ]
+
+    operations = [
+        migrations.RunPython(copy_book_content, restore_book_content),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:04
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0009_copy_book_content'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='book',
+            name='authors_json',
+        ),
+        migrations.RemoveField(
+            model_name='book',
+            name='full_description',
+        ),
+        migrations.RemoveField(
+            model_name='book',
+            name='publisher_description',
+        ),
+        migrations.RemoveField(
+            model_name='book',
+            name='raw_toc',
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0010_remove_book_payload_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DiscoveryStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category_id', models.CharField(help_text='알라딘 카테고리 ID', max_length=32)),
+                ('strategy', models.CharField(help_text='탐색 전략 키 (예: list:Bestseller, search:파이썬)', max_length=128)),
+                ('runs', models.PositiveIntegerField(default=0, help_text='실행 횟수')),
+                ('pages_fetched', models.PositiveIntegerField(default=0, help_text='누적 조회 페이지 수')),
+                ('isbns_returned', models.PositiveIntegerField(default=0, help_text='누적 응답 ISBN 수')),
+                ('isbns_new', models.PositiveIntegerField(default=0, help_text='누적 신규 ISBN 수 (DB와 같은 실행의 앞선 전략에 없던 것)')),
+                ('zero_yield_runs', models.PositiveIntegerField(default=0, help_text='신규 ISBN이 없었던 연속 실행 수')),
+                ('last_run_at', models.DateTimeField(blank=True, null=True)),
+                ('last_new_at', models.DateTimeField(blank=True, help_text='마지막으로 신규 ISBN을 찾은 시각', null=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('category_id', 'strategy'), name='discovery_stat_category_strategy')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0011_discoverystat'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='details_fetched_at',
+            field=models.DateTimeField(blank=True, help_text='상세 조회 완료 시각 (null이면 목록 정보만 있음)', null=True),
+        ),
+        # 기존 도서는 모두 상세 조회(fetch_and_save_book_details)로 만들어졌으므로 마지막 갱신 시각으로 채웁니다.
+        migrations.RunSQL(
+            'UPDATE books_book SET details_fetched_at = updated_at WHERE details_fetched_at IS NULL',
+            migrations.RunSQL.noop,
+        ),
+    ]
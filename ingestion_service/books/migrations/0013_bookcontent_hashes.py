@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-19 17:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0012_book_details_fetched_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bookcontent',
+            name='summary_hash',
+            field=models.CharField(blank=True, help_text='Book.summary 해시', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='bookcontent',
+            name='toc_hash',
+            field=models.CharField(blank=True, help_text='raw_toc 해시', max_length=64),
+        ),
+    ]
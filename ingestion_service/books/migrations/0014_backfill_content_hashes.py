@@ -0,0 +1,37 @@
+# books/migrations/0014_backfill_content_hashes.py
+
+from django.db import migrations
+
+# 0009와 같은 방식으로 book_id 범위별로 커밋합니다.
+BATCH_SIZE = 5000
+
+# books.tasks.content_hash(text) == sha256(text.encode('utf-8')).hexdigest() 와 같은 값
+HASH_SQL = "encode(sha256(convert_to({column}, 'UTF8')), 'hex')"
+
+
+def backfill_hashes(apps, schema_editor):
+    """기존 도서의 toc_hash/summary_hash를 채워, 첫 갱신(refresh) 때 내용이 같은 도서까지 다시 파싱/임베딩하지 않게 합니다."""
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute('SELECT MIN(book_id), MAX(book_id) FROM books_bookcontent')
+        low, high = cursor.fetchone()
+        if low is None:
+            return
+        for start in range(low, high + 1, BATCH_SIZE):
+            cursor.execute(
+                f"UPDATE books_bookcontent c SET toc_hash = {HASH_SQL.format(column='c.raw_toc')}, "
+                f"summary_hash = {HASH_SQL.format(column='b.summary')} "
+                "FROM books_book b WHERE b.id = c.book_id AND c.book_id >= %s AND c.book_id < %s",
+                [start, start + BATCH_SIZE],
+            )
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('books', '0013_bookcontent_hashes'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_hashes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:40
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0014_backfill_content_hashes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='toc_minhash',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.BigIntegerField(), blank=True, help_text='목차 MinHash 시그니처', null=True, size=None),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='toc_lsh_bands',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=16), blank=True, default=list, help_text='목차 LSH 밴드 키', size=None),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='toc_cluster',
+            field=models.CharField(blank=True, db_index=True, help_text='중복 클러스터 대표 ISBN', max_length=13),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['toc_lsh_bands'], name='book_toc_lsh_bands_gin'),
+        ),
+    ]
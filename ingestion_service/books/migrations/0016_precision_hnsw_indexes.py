@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-19 19:10
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # DROP INDEX CONCURRENTLY는 트랜잭션 안에서 실행할 수 없습니다.
+    atomic = False
+
+    dependencies = [
+        ('books', '0015_book_toc_minhash'),
+    ]
+
+    operations = [
+        # HNSW 인덱스는 모델 Meta가 아니라 `manage.py sync_vector_indexes`가 정밀도 설정에 따라 관리합니다.
+        # 마이그레이션은 설정과 무관하게 float32 인덱스(0005)만 남기는 고정 스키마입니다.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.RemoveIndex(model_name='book', name='book_summary_emb_hnsw'),
+                migrations.RemoveIndex(model_name='chapter', name='chapter_title_emb_hnsw'),
+            ],
+        ),
+        # 이전 0007이 만들었던 halfvec 인덱스 제거 (그 0007을 적용한 DB에만 있음)
+        migrations.RunSQL(
+            'DROP INDEX CONCURRENTLY IF EXISTS book_summary_emb_half_hnsw',
+            migrations.RunSQL.noop,
+        ),
+        migrations.RunSQL(
+            'DROP INDEX CONCURRENTLY IF EXISTS chapter_title_emb_half_hnsw',
+            migrations.RunSQL.noop,
+        ),
+    ]
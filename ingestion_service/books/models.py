@@ -1,7 +1,27 @@
 # books/models.py
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
 from pgvector.django import VectorField
 
+EMBEDDING_DIMENSIONS = 768
+
+
+class BookManager(models.Manager):
+    """
+    Book 기본 조회에서 summary_embedding(768차원 벡터)을 지연 로딩합니다.
+    중복 확인/목록/목차 파싱처럼 벡터가 필요 없는 조회가 행마다 벡터를 읽고 역직렬화하지 않도록 합니다.
+    벡터가 필요하면 Book.objects.with_embedding()을 사용하세요.
+    (주의: 기본 queryset에 .only('summary_embedding', ...)를 붙이면 지연 목록이 우선하여 벡터가 빠집니다.)
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().defer('summary_embedding')
+
+    def with_embedding(self):
+        return super().get_queryset()
+
+
 class Book(models.Model):
     # --- 기본 정보 ---
     title = models.CharField(max_length=512, help_text="도서 제목")
@@ -14,34 +34,105 @@ class Book(models.Model):
     publisher = models.CharField(max_length=256, blank=True, help_text="출판사")
     publication_date = models.DateField(null=True, blank=True, help_text="출간일")
     page_count = models.PositiveIntegerField(null=True, blank=True, help_text="쪽수")
-    full_description = models.TextField(blank=True, help_text="책소개 (상세)")
-    publisher_description = models.TextField(blank=True, help_text="출판사 제공 책소개")
-    authors_json = models.JSONField(null=True, blank=True, help_text="저자 상세 정보 (JSON)")
-
-    # 원본 목차
-    raw_toc = models.TextField(blank=True, help_text="알라딘 API 원본 목차(파싱 전)")
-
+    # 책소개/저자 상세/원본 목차처럼 큰 필드는 BookContent(book.content)에 있습니다.
 
     # --- 상태 관리 및 임베딩 ---
     toc_parsing_failed = models.BooleanField(default=False, help_text="목차 파싱 실패 여부")
-    summary_embedding = VectorField(dimensions=768, null=True, blank=True, help_text="요약 정보 임베딩 벡터")
+    toc_parser_version = models.CharField(max_length=64, blank=True, help_text="Chapter를 생성한 toc_parser 버전")
+    summary_embedding = VectorField(dimensions=EMBEDDING_DIMENSIONS, null=True, blank=True, help_text="요약 정보 임베딩 벡터")
+    # 탐색 단계에서 목록 응답의 메타데이터로 먼저 저장(staging)된 뒤, 상세 조회(ItemLookUp)로 목차/상세 소개를 채운 시각
+    details_fetched_at = models.DateTimeField(null=True, blank=True, help_text="상세 조회 완료 시각 (null이면 목록 정보만 있음)")
+
+    # --- 중복 판별 (개정판/세트 도서) ---
+    # 목차 파싱 시 전처리된 라인으로 계산한 MinHash 시그니처와 LSH 밴드 키 (toc_parser/minhash.py)
+    toc_minhash = ArrayField(models.BigIntegerField(), null=True, blank=True, help_text="목차 MinHash 시그니처")
+    toc_lsh_bands = ArrayField(models.CharField(max_length=16), default=list, blank=True, help_text="목차 LSH 밴드 키")
+    # 목차가 거의 같은 도서 묶음의 대표 ISBN (중복이 없으면 자기 ISBN, 아직 파싱 전이면 빈 값)
+    toc_cluster = models.CharField(max_length=13, blank=True, db_index=True, help_text="중복 클러스터 대표 ISBN")
 
     # --- 타임스탬프 ---
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = BookManager()
+
+    class Meta:
+        indexes = [
+            # 검색 API의 top-k 코사인 유사도 쿼리용 HNSW 인덱스는 SEARCH_BOOK_VECTOR_PRECISION에 맞는 것 하나만
+            # books/vector_indexes.py(sync_vector_indexes)가 관리합니다.
+            # 하이브리드 검색의 제목/저자 어휘 매칭 (ILIKE, % 연산자)용 trigram 인덱스
+            GinIndex(name='book_title_trgm', fields=['title'], opclasses=['gin_trgm_ops']),
+            GinIndex(name='book_author_trgm', fields=['author'], opclasses=['gin_trgm_ops']),
+            # 중복 후보 조회(toc_lsh_bands && 밴드 키 목록)용
+            GinIndex(name='book_toc_lsh_bands_gin', fields=['toc_lsh_bands']),
+        ]
+
     def __str__(self):
         return self.title
 
+
+class BookContent(models.Model):
+    """
+    Book의 큰 텍스트/JSON 필드를 분리한 1:1 테이블.
+    중복 확인/목록/검색은 books_book의 작은 행만 읽고, 원본 목차나 상세 소개가 필요할 때만 이 테이블을 조회합니다.
+    """
+    book = models.OneToOneField(Book, primary_key=True, related_name='content', on_delete=models.CASCADE)
+    full_description = models.TextField(blank=True, help_text="책소개 (상세)")
+    publisher_description = models.TextField(blank=True, help_text="출판사 제공 책소개")
+    authors_json = models.JSONField(null=True, blank=True, help_text="저자 상세 정보 (JSON)")
+    # 원본 목차
+    raw_toc = models.TextField(blank=True, help_text="알라딘 API 원본 목차(파싱 전)")
+    # 상세 조회 시 내용이 바뀐 도서만 다시 파싱/임베딩하기 위한 sha256 해시 (books.tasks.content_hash)
+    toc_hash = models.CharField(max_length=64, blank=True, help_text="raw_toc 해시")
+    summary_hash = models.CharField(max_length=64, blank=True, help_text="Book.summary 해시")
+
+    def __str__(self):
+        return f"Content of book {self.book_id}"
+
+
 class Chapter(models.Model):
     book = models.ForeignKey(Book, related_name='chapters', on_delete=models.CASCADE, help_text="연관 도서")
     order = models.PositiveIntegerField(help_text="챕터 순서")
     level = models.PositiveIntegerField(default=1, help_text="챕터 계층 레벨")
+    number = models.CharField(max_length=50, blank=True, help_text="챕터 번호 (예: 1, 1.2, IV)")
     title = models.TextField(help_text="챕터 제목")
-    title_embedding = VectorField(dimensions=768, null=True, blank=True, help_text="챕터 제목 임베딩 벡터")
+    source_line = models.PositiveIntegerField(default=0, help_text="raw_toc 내 원본 라인 번호")
+    title_embedding = VectorField(dimensions=EMBEDDING_DIMENSIONS, null=True, blank=True, help_text="챕터 제목 임베딩 벡터")
 
     class Meta:
         ordering = ['order']
+        indexes = [
+            # HNSW 인덱스: SEARCH_CHAPTER_VECTOR_PRECISION에 맞는 것 하나만 (books/vector_indexes.py)
+            GinIndex(name='chapter_title_trgm', fields=['title'], opclasses=['gin_trgm_ops']),
+        ]
+
+    def __str__(self):
+        return f"[{self.book.title}] {self.title}"
+
+
+class DiscoveryStat(models.Model):
+    """
+    카테고리 x 탐색 전략(목록 종류 또는 검색어)별 신규 ISBN 수확률 통계.
+    discover_isbns_for_category가 실행마다 갱신하고, 다음 실행에서 전략 순서와 건너뛰기 여부를 정하는 데 사용합니다.
+    """
+    category_id = models.CharField(max_length=32, help_text="알라딘 카테고리 ID")
+    strategy = models.CharField(max_length=128, help_text="탐색 전략 키 (예: list:Bestseller, search:파이썬)")
+    runs = models.PositiveIntegerField(default=0, help_text="실행 횟수")
+    pages_fetched = models.PositiveIntegerField(default=0, help_text="누적 조회 페이지 수")
+    isbns_returned = models.PositiveIntegerField(default=0, help_text="누적 응답 ISBN 수")
+    isbns_new = models.PositiveIntegerField(default=0, help_text="누적 신규 ISBN 수 (DB와 같은 실행의 앞선 전략에 없던 것)")
+    zero_yield_runs = models.PositiveIntegerField(default=0, help_text="신규 ISBN이 없었던 연속 실행 수")
+    last_run_at = models.DateTimeField(null=True, blank=True)
+    last_new_at = models.DateTimeField(null=True, blank=True, help_text="마지막으로 신규 ISBN을 찾은 시각")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['category_id', 'strategy'], name='discovery_stat_category_strategy'),
+        ]
+
+    @property
+    def yield_per_page(self):
+        return self.isbns_new / self.pages_fetched if self.pages_fetched else 0.0
 
     def __str__(self):
-        return f"[{self.book.title}] {self.title}"
\ No newline at end of file
+        return f"{self.category_id}/{self.strategy}: {self.isbns_new} new in {self.pages_fetched} pages"
@@ -0,0 +1,214 @@
+# books/progress.py
+import json
+import logging
+import time
+import uuid
+
+import redis
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# 수집 실행(run) 하나의 진행 카운터. start_discovery가 run_id를 만들고, 각 태스크가 run_id로 HINCRBY 합니다.
+# run_id가 없거나(None) Redis 장애 시에는 카운터 없이 태스크가 그대로 진행됩니다.
+RUN_KEY_PREFIX = 'bookroad:run'
+
+FIELDS = (
+    'categories_total',       # 제출할 카테고리 수
+    'categories_discovered',  # 탐색이 끝난 카테고리 수
+    'isbns_found',            # 카테고리별로 찾은 ISBN 수 (카테고리 간 중복 포함)
+    'batches_total',          # process_discovered_isbns 실행 예정 수 (= 청크 수)
+    'batches_processed',      # process_discovered_isbns 실행 완료 수
+    'isbns_new',              # DB/이번 실행에 없던 ISBN -> 도서별 체인 제출 수
+    'books_fetched',          # 상세 조회/저장 성공
+    'books_parsed',           # 목차 파싱 성공
+    'books_embedded',         # 임베딩 생성 성공
+    'books_failed',           # 상세 조회 재시도 소진 등으로 체인이 중단된 도서
+    'books_finished',         # 체인이 끝난 도서 (성공/건너뜀/실패 모두 포함)
+)
+
+# 도서별 체인의 최종 결과(outcome)별 도서 수. 태스크 반환값 대신 run 요약에 집계합니다.
+OUTCOMES = (
+    'embedded',        # 임베딩까지 완료
+    'no_details',      # 상세 조회 응답에 도서가 없음
+    'fetch_failed',    # 상세 조회 재시도 소진
+    'no_toc',          # raw_toc 없음 (파싱/임베딩 건너뜀)
+    'parse_error',     # 목차 파싱 중 예외
+    'not_found',       # 다음 단계에서 Book을 찾지 못함
+    'embed_error',     # 임베딩 중 예외
+    'unchanged',       # 갱신 조회 결과 목차/요약 해시가 같아 다시 처리하지 않음
+)
+# 실패 도서 샘플 ('isbn outcome: detail')은 이 수만큼만 보관합니다.
+FAILURE_SAMPLE_SIZE = 200
+
+_client = None
+
+
+def get_client():
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(settings.PIPELINE_PROGRESS_URL, socket_timeout=1, socket_connect_timeout=1)
+    return _client
+
+
+def _key(run_id, suffix='progress'):
+    return f"{RUN_KEY_PREFIX}:{run_id}:{suffix}"
+
+
+def new_run(categories_total, batches_total):
+    """진행 카운터를 만들고 run_id를 반환합니다."""
+    run_id = uuid.uuid4().hex[:12]
+    try:
+        pipe = get_client().pipeline()
+        pipe.hset(_key(run_id), mapping={
+            **{field: 0 for field in FIELDS},
+            'categories_total': categories_total,
+            'batches_total': batches_total,
+            'started_at': time.time(),
+        })
+        pipe.expire(_key(run_id), settings.PIPELINE_PROGRESS_TTL)
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning("Pipeline progress unavailable (new run): %s", e)
+    return run_id
+
+
+def incr(run_id, **amounts):
+    """incr(run_id, books_fetched=1) 처럼 여러 필드를 한 번에 올립니다. (한 트랜잭션으로 원자적)"""
+    if not run_id:
+        return
+    try:
+        pipe = get_client().pipeline()
+        for field, amount in amounts.items():
+            pipe.hincrby(_key(run_id), field, amount)
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning("Failed to update pipeline progress %s: %s", amounts, e)
+
+
+def claim_isbns(run_id, isbns):
+    """
+    이번 실행에서 아직 체인을 제출하지 않은 ISBN만 돌려줍니다. (SADD 결과로 판별)
+    청크끼리 같은 ISBN을 찾아도, 앞선 청크의 체인이 아직 DB에 저장하기 전이라면 중복 제출을 막아줍니다.
+    """
+    if not run_id or not isbns:
+        return list(isbns)
+    key = _key(run_id, 'queued')
+    try:
+        pipe = get_client().pipeline()
+        for isbn in isbns:
+            pipe.sadd(key, isbn)
+        pipe.expire(key, settings.PIPELINE_PROGRESS_TTL)
+        added = pipe.execute()[:-1]
+    except redis.RedisError as e:
+        logger.warning("Pipeline progress unavailable (claim): %s", e)
+        return list(isbns)
+    return [isbn for isbn, was_added in zip(isbns, added) if was_added]
+
+
+def stash_isbns(run_id, category_id, items):
+    """
+    카테고리 탐색 결과({isbn: 목록 응답 메타데이터})를 run별 Redis 해시에 저장합니다. 성공하면 True.
+    discover 태스크는 ISBN 목록 대신 category_id만 결과 백엔드로 넘기고,
+    process 태스크가 read_isbns로 읽은 뒤 처리를 마치면 clear_isbns로 지웁니다.
+    """
+    if not run_id:
+        return False
+    key = _key(run_id, f'found:{category_id}')
+    try:
+        pipe = get_client().pipeline()
+        pipe.delete(key)
+        if items:
+            pipe.hset(key, mapping={isbn: json.dumps(metadata, ensure_ascii=False) for isbn, metadata in items.items()})
+        pipe.expire(key, settings.PIPELINE_PROGRESS_TTL)
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning("Pipeline progress unavailable (stash): %s", e)
+        return False
+    return True
+
+
+def read_isbns(run_id, category_ids):
+    """
+    stash_isbns로 저장한 카테고리들의 {isbn: 메타데이터}를 합쳐 읽습니다. 키는 지우지 않습니다.
+    Redis 장애 시 redis.RedisError를 그대로 올립니다. (빈 dict로 넘어가면 탐색 결과가 조용히 사라지므로)
+    """
+    if not run_id or not category_ids:
+        return {}
+    pipe = get_client().pipeline()
+    for category_id in category_ids:
+        pipe.hgetall(_key(run_id, f'found:{category_id}'))
+    found = pipe.execute()
+    return {isbn.decode(): json.loads(metadata) for items in found for isbn, metadata in items.items()}
+
+
+def clear_isbns(run_id, category_ids):
+    """Book 저장과 상세 조회 제출이 끝난 뒤 stash 키를 지웁니다. 실패해도 키는 TTL로 만료되므로 로그만 남깁니다."""
+    if not run_id or not category_ids:
+        return
+    try:
+        get_client().delete(*[_key(run_id, f'found:{category_id}') for category_id in category_ids])
+    except redis.RedisError as e:
+        logger.warning("Pipeline progress unavailable (clear stash): %s", e)
+
+
+def record_outcome(run_id, outcome, isbn=None, detail=''):
+    """
+    도서 하나의 최종 결과를 run 요약에 집계합니다. 실패(embedded 외)는 ISBN과 사유를 샘플 목록에 남깁니다.
+    run_id가 없으면 로그만 남깁니다.
+    """
+    if outcome != 'embedded':
+        logger.info("Book %s ended with %s: %s", isbn, outcome, detail)
+    if not run_id:
+        return
+    try:
+        pipe = get_client().pipeline()
+        pipe.hincrby(_key(run_id, 'outcomes'), outcome, 1)
+        pipe.expire(_key(run_id, 'outcomes'), settings.PIPELINE_PROGRESS_TTL)
+        if outcome != 'embedded':
+            pipe.lpush(_key(run_id, 'failures'), f"{isbn} {outcome}: {str(detail)[:200]}")
+            pipe.ltrim(_key(run_id, 'failures'), 0, FAILURE_SAMPLE_SIZE - 1)
+            pipe.expire(_key(run_id, 'failures'), settings.PIPELINE_PROGRESS_TTL)
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning("Failed to record outcome %s for %s: %s", outcome, isbn, e)
+
+
+def get_summary(run_id):
+    """run 요약: {'outcomes': {outcome: 도서 수}, 'failures': [최근 실패 샘플]}. 읽을 수 없으면 None."""
+    try:
+        pipe = get_client().pipeline()
+        pipe.hgetall(_key(run_id, 'outcomes'))
+        pipe.lrange(_key(run_id, 'failures'), 0, -1)
+        outcomes, failures = pipe.execute()
+    except redis.RedisError as e:
+        logger.warning("Pipeline progress unavailable (summary): %s", e)
+        return None
+    return {
+        'outcomes': {outcome.decode(): int(count) for outcome, count in outcomes.items()},
+        'failures': [failure.decode() for failure in failures],
+    }
+
+
+def get_progress(run_id):
+    """{필드: int, 'started_at': float}. 카운터가 없으면 None."""
+    try:
+        raw = get_client().hgetall(_key(run_id))
+    except redis.RedisError as e:
+        logger.warning("Pipeline progress unavailable (read): %s", e)
+        return None
+    if not raw:
+        return None
+    progress = {field: 0 for field in FIELDS}
+    for field, value in raw.items():
+        field = field.decode()
+        progress[field] = float(value) if field == 'started_at' else int(value)
+    return progress
+
+
+def is_finished(progress):
+    """모든 청크의 탐색/필터링이 끝났고, 제출된 도서 체인이 모두 끝났는지."""
+    return (
+        progress['batches_processed'] >= progress['batches_total']
+        and progress['books_finished'] >= progress['isbns_new']
+    )
@@ -0,0 +1,88 @@
+# books/refresh.py
+import logging
+from datetime import timedelta
+
+import redis
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from . import progress
+from .models import Book
+
+logger = logging.getLogger(__name__)
+
+# 시간(정시) 단위 상세 조회 예산 사용량. 비트(beat) 주기와 관계없이, 수동 실행이 겹쳐도 시간당 예산을 넘지 않게 합니다.
+BUDGET_KEY_PREFIX = 'bookroad:refresh:budget'
+
+
+def _budget_key(now):
+    return f"{BUDGET_KEY_PREFIX}:{now:%Y%m%d%H}"
+
+
+def reserve_budget(requested, now=None):
+    """
+    이번 시간의 상세 조회 예산(REFRESH_LOOKUPS_PER_HOUR)에서 최대 requested개를 예약하고 예약된 수를 반환합니다.
+    Redis를 쓸 수 없으면 0을 반환합니다. (예산을 확인할 수 없으면 API를 호출하지 않음)
+    """
+    if requested <= 0:
+        return 0
+    key = _budget_key(now or timezone.now())
+    try:
+        pipe = progress.get_client().pipeline()
+        pipe.incrby(key, requested)
+        pipe.expire(key, 60 * 60 * 2)
+        used = pipe.execute()[0]
+    except redis.RedisError as e:
+        logger.warning("Refresh budget unavailable: %s", e)
+        return 0
+    over = max(0, used - settings.REFRESH_LOOKUPS_PER_HOUR)
+    granted = max(0, requested - over)
+    if granted < requested:
+        # 쓰지 못한 몫은 돌려놓아 같은 시간의 다음 실행이 쓸 수 있게 합니다.
+        try:
+            progress.get_client().decrby(key, requested - granted)
+        except redis.RedisError:
+            pass
+    return granted
+
+
+def stale_candidates(now=None):
+    """
+    갱신 후보를 우선순위 순으로 (사유, queryset) 목록으로 반환합니다.
+    한 번 이상 상세 조회했고 마지막 조회 후 REFRESH_MIN_AGE_DAYS가 지난 도서만 대상이며,
+    각 그룹 안에서는 가장 오래전에 조회한 도서부터 고릅니다.
+    1. 목차 없음: 알라딘이 나중에 목차를 추가하는 경우가 많습니다.
+    2. 목차 파싱 실패: 원본 목차가 고쳐졌을 수 있습니다.
+    3. 최근 출간(REFRESH_RECENT_DAYS 이내): 출간 직후에는 소개/목차가 자주 보강됩니다.
+    상세 조회 전인 staging 도서(details_fetched_at이 NULL)는 수집 실행이 이미 상세 조회를 제출했거나 곧 제출하므로 제외합니다.
+    (포함하면 진행 중인 실행과 같은 ISBN을 중복 조회하여 시간당 예산을 낭비합니다)
+    """
+    now = now or timezone.now()
+    stale = Book.objects.filter(
+        details_fetched_at__isnull=False,
+        details_fetched_at__lt=now - timedelta(days=settings.REFRESH_MIN_AGE_DAYS),
+    )
+    recent_since = (now - timedelta(days=settings.REFRESH_RECENT_DAYS)).date()
+    groups = [
+        ('missing_toc', stale.filter(Q(content__isnull=True) | Q(content__raw_toc=''))),
+        ('parse_failed', stale.filter(toc_parsing_failed=True)),
+        ('recent', stale.filter(publication_date__gte=recent_since)),
+    ]
+    return [
+        (reason, queryset.order_by('details_fetched_at', 'id'))
+        for reason, queryset in groups
+    ]
+
+
+def select_stale_books(limit, now=None):
+    """우선순위 그룹 순서대로 최대 limit개의 ISBN을 고릅니다. 반환값: ([isbn, ...], {사유: 수})"""
+    selected, reasons = [], {}
+    for reason, queryset in stale_candidates(now):
+        remaining = limit - len(selected)
+        if remaining <= 0:
+            break
+        isbns = [isbn for isbn in queryset.exclude(isbn__in=selected).values_list('isbn', flat=True)[:remaining]]
+        selected.extend(isbns)
+        reasons[reason] = len(isbns)
+    return selected, reasons
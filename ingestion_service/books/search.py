@@ -0,0 +1,355 @@
+# books/search.py
+from django.conf import settings
+from django.db import connection
+from django.db.models.functions import Cast
+from pgvector import HalfVector
+from pgvector.django import CosineDistance, HalfVectorField
+
+from .models import EMBEDDING_DIMENSIONS, Book, Chapter
+
+BOOK_RESULT_FIELDS = ('id', 'isbn', 'title', 'author', 'publisher', 'publication_date', 'summary', 'toc_cluster')
+
+
+def _apply_book_filters(queryset, filters, prefix=''):
+    """publisher / publication_date 범위 필터를 적용합니다. (Chapter 검색 시 prefix='book__')"""
+    if filters.get('publisher'):
+        queryset = queryset.filter(**{f'{prefix}publisher': filters['publisher']})
+    if filters.get('published_from'):
+        queryset = queryset.filter(**{f'{prefix}publication_date__gte': filters['published_from']})
+    if filters.get('published_to'):
+        queryset = queryset.filter(**{f'{prefix}publication_date__lte': filters['published_to']})
+    return queryset
+
+
+def _chapter_queryset():
+    return (
+        Chapter.objects
+        .select_related('book')
+        .only('id', 'level', 'number', 'title', *(f'book__{field}' for field in BOOK_RESULT_FIELDS))
+    )
+
+
+def _cosine_distance(table, field_name, query_vector):
+    """
+    settings.SEARCH_VECTOR_PRECISION[table]에 맞는 거리 표현식.
+    'halfvec'이면 halfvec 표현식 인덱스(*_half_hnsw)와 같은 캐스팅으로 조회합니다.
+    """
+    if settings.SEARCH_VECTOR_PRECISION[table] == 'halfvec':
+        return CosineDistance(
+            Cast(field_name, HalfVectorField(dimensions=EMBEDDING_DIMENSIONS)), HalfVector(query_vector))
+    return CosineDistance(field_name, query_vector)
+
+
+def _distance_sql(table, column):
+    """raw SQL용 거리 표현식. (_cosine_distance와 같은 인덱스를 사용)"""
+    if settings.SEARCH_VECTOR_PRECISION[table] == 'halfvec':
+        return f'{column}::halfvec({EMBEDDING_DIMENSIONS}) <=> %(qvec)s::halfvec({EMBEDDING_DIMENSIONS})'
+    return f'{column} <=> %(qvec)s::vector'
+
+
+def _with_similarity(hits):
+    # 코사인 거리 -> 유사도
+    for hit in hits:
+        hit.score = 1.0 - hit.distance
+    return hits
+
+
+def search_books(query_vector, k, filters):
+    """
+    Book.summary_embedding에 대한 top-k 코사인 유사도 검색.
+    ORDER BY distance LIMIT k 형태이므로 HNSW 인덱스(vector_cosine_ops 또는 halfvec_cosine_ops)를 사용합니다.
+    """
+    queryset = (
+        Book.objects
+        .filter(summary_embedding__isnull=False)
+        .only(*BOOK_RESULT_FIELDS)
+        .annotate(distance=_cosine_distance('book', 'summary_embedding', query_vector))
+    )
+    queryset = _apply_book_filters(queryset, filters)
+    return _with_similarity(list(queryset.order_by('distance')[:k]))
+
+
+def search_chapters(query_vector, k, filters):
+    """Chapter.title_embedding에 대한 top-k 코사인 유사도 검색. (level 필터 지원)"""
+    queryset = (
+        _chapter_queryset()
+        .filter(title_embedding__isnull=False)
+        .annotate(distance=_cosine_distance('chapter', 'title_embedding', query_vector))
+    )
+    queryset = _apply_book_filters(queryset, filters, prefix='book__')
+    if filters.get('level'):
+        queryset = queryset.filter(level=filters['level'])
+    return _with_similarity(list(queryset.order_by('distance')[:k]))
+
+
+# --- 하이브리드 (어휘 + 벡터) 검색 ---
+# 벡터 후보(HNSW)와 어휘 후보(pg_trgm GIN: 제목/저자/챕터 제목, ISBN 일치)를 각각 순위화한 뒤
+# Reciprocal Rank Fusion(RRF)으로 합칩니다. 후보 추출과 융합은 하나의 SQL로 실행됩니다.
+
+def _vector_literal(vector):
+    return '[' + ','.join(f'{value:.7g}' for value in vector) + ']'
+
+
+def _book_filter_sql(filters, alias):
+    clauses = []
+    if filters.get('publisher'):
+        clauses.append(f'{alias}.publisher = %(publisher)s')
+    if filters.get('published_from'):
+        clauses.append(f'{alias}.publication_date >= %(published_from)s')
+    if filters.get('published_to'):
+        clauses.append(f'{alias}.publication_date <= %(published_to)s')
+    return ''.join(f' AND {clause}' for clause in clauses)
+
+
+def _like_pattern(query_text):
+    """ILIKE '%...%' 패턴. 검색어의 \\, %, _가 와일드카드로 해석되지 않도록 이스케이프합니다. (PostgreSQL 기본 ESCAPE '\\')"""
+    escaped = query_text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f'%{escaped}%'
+
+
+def _hybrid_params(query_text, query_vector, k, filters):
+    compact = query_text.replace('-', '').replace(' ', '')
+    return {
+        **{key: filters.get(key) for key in ('publisher', 'published_from', 'published_to', 'level')},
+        'q': query_text,
+        'like': _like_pattern(query_text),
+        'isbn': compact if compact.isdigit() and len(compact) == 13 else None,
+        'qvec': _vector_literal(query_vector),
+        'candidates': max(k, settings.SEARCH_HYBRID_CANDIDATES),
+        'rrf_k': settings.SEARCH_RRF_K,
+        'k': k,
+    }
+
+
+_RRF_FUSION_SQL = '''
+SELECT id, SUM(1.0 / (%(rrf_k)s + rnk)) AS score
+FROM (SELECT id, rnk FROM vec UNION ALL SELECT id, rnk FROM lex) AS fused
+GROUP BY id
+ORDER BY score DESC
+LIMIT %(k)s
+'''
+
+_HYBRID_BOOKS_SQL = '''
+WITH vec AS (
+    SELECT id, row_number() OVER (ORDER BY dist) AS rnk FROM (
+        SELECT b.id, {book_distance} AS dist
+        FROM books_book b
+        WHERE b.summary_embedding IS NOT NULL{filters}
+        ORDER BY dist
+        LIMIT %(candidates)s
+    ) AS v
+),
+lex AS (
+    SELECT id, row_number() OVER (ORDER BY sim DESC, id) AS rnk FROM (
+        SELECT b.id, GREATEST(
+            CASE WHEN b.isbn = %(isbn)s THEN 2.0 ELSE 0 END,
+            CASE WHEN b.title ILIKE %(like)s THEN 1.0 ELSE 0 END,
+            similarity(b.title, %(q)s),
+            similarity(b.author, %(q)s)
+        ) AS sim
+        FROM books_book b
+        WHERE (b.isbn = %(isbn)s OR b.title ILIKE %(like)s OR b.title %% %(q)s OR b.author %% %(q)s){filters}
+        ORDER BY sim DESC
+        LIMIT %(candidates)s
+    ) AS l
+)
+''' + _RRF_FUSION_SQL
+
+_HYBRID_CHAPTERS_SQL = '''
+WITH vec AS (
+    SELECT id, row_number() OVER (ORDER BY dist) AS rnk FROM (
+        SELECT c.id, {chapter_distance} AS dist
+        FROM books_chapter c JOIN books_book b ON b.id = c.book_id
+        WHERE c.title_embedding IS NOT NULL{filters}
+        ORDER BY dist
+        LIMIT %(candidates)s
+    ) AS v
+),
+lex AS (
+    SELECT id, row_number() OVER (ORDER BY sim DESC, id) AS rnk FROM (
+        SELECT c.id, GREATEST(
+            CASE WHEN c.title ILIKE %(like)s THEN 1.0 ELSE 0 END,
+            similarity(c.title, %(q)s)
+        ) AS sim
+        FROM books_chapter c JOIN books_book b ON b.id = c.book_id
+        WHERE (c.title ILIKE %(like)s OR c.title %% %(q)s){filters}
+        ORDER BY sim DESC
+        LIMIT %(candidates)s
+    ) AS l
+)
+''' + _RRF_FUSION_SQL
+
+
+def _run_fusion(sql, params):
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [(pk, float(score)) for pk, score in cursor.fetchall()]
+
+
+def hybrid_search_books(query_text, query_vector, k, filters):
+    params = _hybrid_params(query_text, query_vector, k, filters)
+    ranked = _run_fusion(_HYBRID_BOOKS_SQL.format(
+        filters=_book_filter_sql(filters, 'b'), book_distance=_distance_sql('book', 'b.summary_embedding')), params)
+    return load_cached_books(ranked)
+
+
+def hybrid_search_chapters(query_text, query_vector, k, filters):
+    params = _hybrid_params(query_text, query_vector, k, filters)
+    filter_sql = _book_filter_sql(filters, 'b')
+    if filters.get('level'):
+        filter_sql += ' AND c.level = %(level)s'
+    ranked = _run_fusion(_HYBRID_CHAPTERS_SQL.format(
+        filters=filter_sql, chapter_distance=_distance_sql('chapter', 'c.title_embedding')), params)
+    return load_cached_chapters(ranked)
+
+
+# --- 책 단위 그룹핑 검색 ---
+# 같은 책의 챕터가 top-k를 독점하지 않도록, 제한된 수의 챕터 후보를 뽑은 뒤 DB 안에서 book_id로 묶어
+# 책 점수 = 가장 가까운 챕터의 유사도(max-pooling)로 상위 N권과 책별 상위 챕터를 반환합니다.
+
+_GROUPED_CHAPTERS_SQL = '''
+WITH candidates AS (
+    SELECT c.id, c.book_id, {chapter_distance} AS dist
+    FROM books_chapter c JOIN books_book b ON b.id = c.book_id
+    WHERE c.title_embedding IS NOT NULL{filters}
+    ORDER BY dist
+    LIMIT %(candidates)s
+),
+top_books AS (
+    SELECT book_id, MIN(dist) AS book_dist
+    FROM candidates
+    GROUP BY book_id
+    ORDER BY book_dist
+    LIMIT %(k)s
+),
+ranked AS (
+    SELECT id, book_id, dist, row_number() OVER (PARTITION BY book_id ORDER BY dist) AS chapter_rank
+    FROM candidates
+    WHERE book_id IN (SELECT book_id FROM top_books)
+)
+SELECT t.book_id, t.book_dist, r.id, r.dist
+FROM top_books t JOIN ranked r ON r.book_id = t.book_id
+WHERE r.chapter_rank <= %(per_book)s
+ORDER BY t.book_dist, r.dist
+'''
+
+
+def grouped_search_chapters(query_vector, k, filters):
+    """
+    챕터 벡터 검색 결과를 책 단위로 묶어 상위 k권과 각 책의 상위 chapters_per_book개 챕터를 반환합니다.
+    후보 수는 k * SEARCH_GROUP_CANDIDATE_FACTOR (최대 SEARCH_GROUP_MAX_CANDIDATES)로 제한됩니다.
+    RAG DB의 toc_chunks가 아니라 이 서비스의 books_chapter.title_embedding을 묶습니다. (검색 API가 조회하는 DB가
+    ingestion DB뿐이므로) 벡터 검색만 지원하며, mode=hybrid 요청은 SearchQuerySerializer에서 거절됩니다.
+    """
+    filter_sql = _book_filter_sql(filters, 'b')
+    if filters.get('level'):
+        filter_sql += ' AND c.level = %(level)s'
+    params = {
+        **{key: filters.get(key) for key in ('publisher', 'published_from', 'published_to', 'level')},
+        'qvec': _vector_literal(query_vector),
+        'candidates': min(k * settings.SEARCH_GROUP_CANDIDATE_FACTOR, settings.SEARCH_GROUP_MAX_CANDIDATES),
+        'per_book': filters.get('chapters_per_book') or 3,
+        'k': k,
+    }
+
+    grouped = {}
+    with connection.cursor() as cursor:
+        cursor.execute(_GROUPED_CHAPTERS_SQL.format(
+            filters=filter_sql, chapter_distance=_distance_sql('chapter', 'c.title_embedding')), params)
+        for book_id, book_dist, chapter_id, chapter_dist in cursor.fetchall():
+            entry = grouped.setdefault(book_id, [book_id, 1.0 - book_dist, []])
+            entry[2].append((chapter_id, 1.0 - chapter_dist))
+    return load_grouped(list(grouped.values()))
+
+
+def load_grouped(ranked_groups):
+    """[(book_pk, score, [(chapter_pk, score), ...]), ...]를 matched_chapters가 붙은 Book 목록으로 읽어옵니다."""
+    books = _load_in_order(Book.objects.only(*BOOK_RESULT_FIELDS), [(pk, score) for pk, score, _ in ranked_groups])
+    chapter_ids = [chapter_pk for _, _, chapters in ranked_groups for chapter_pk, _ in chapters]
+    chapters = Chapter.objects.only('id', 'book_id', 'level', 'number', 'title').in_bulk(chapter_ids)
+
+    matched = {}
+    for book_pk, _, chapter_hits in ranked_groups:
+        matched[book_pk] = []
+        for chapter_pk, score in chapter_hits:
+            chapter = chapters.get(chapter_pk)
+            if chapter is not None:
+                chapter.score = score
+                matched[book_pk].append(chapter)
+    for book in books:
+        book.matched_chapters = matched.get(book.pk, [])
+    return books
+
+
+def _dispatch_search(query, query_vector, k):
+    if query['target'] == 'grouped':
+        return grouped_search_chapters(query_vector, k, query)
+    if query['mode'] == 'hybrid':
+        search = hybrid_search_books if query['target'] == 'books' else hybrid_search_chapters
+        return search(query['q'], query_vector, k, query)
+    search = search_books if query['target'] == 'books' else search_chapters
+    return search(query_vector, k, query)
+
+
+def _duplicate_key(target, hit):
+    """중복 클러스터 단위의 접기 키. 챕터는 같은 클러스터 안에서 제목이 같은 챕터끼리 접습니다."""
+    if target == 'chapters':
+        return (hit.book.toc_cluster or hit.book_id, hit.title)
+    return hit.toc_cluster or hit.pk
+
+
+def collapse_duplicates(target, hits):
+    """점수 순서를 유지하면서 같은 중복 클러스터(Book.toc_cluster)의 결과 중 첫 번째(최고 점수)만 남깁니다."""
+    seen = set()
+    collapsed = []
+    for hit in hits:
+        key = _duplicate_key(target, hit)
+        if key not in seen:
+            seen.add(key)
+            collapsed.append(hit)
+    return collapsed
+
+
+def run_search(query, query_vector):
+    """검증된 검색 파라미터(target, mode, k, 필터)에 맞는 검색 함수를 실행합니다."""
+    k = query['k']
+    if not query.get('collapse_duplicates'):
+        return _dispatch_search(query, query_vector, k)
+    # 접힌 만큼 결과가 모자라지 않도록 k * SEARCH_COLLAPSE_OVERFETCH개를 가져온 뒤 접고 k개로 자릅니다.
+    hits = _dispatch_search(query, query_vector, k * settings.SEARCH_COLLAPSE_OVERFETCH)
+    return collapse_duplicates(query['target'], hits)[:k]
+
+
+def dump_ranked(target, hits):
+    """검색 결과를 캐시에 저장할 수 있는 (pk, score) 형태로 변환합니다. (load_ranked의 역연산)"""
+    if target == 'grouped':
+        return [(book.pk, book.score, [(chapter.pk, chapter.score) for chapter in book.matched_chapters])
+                for book in hits]
+    return [(hit.pk, hit.score) for hit in hits]
+
+
+def load_ranked(target, ranked_hits):
+    """캐시된 (pk, score) 목록을 target에 맞는 모델 객체로 읽어옵니다."""
+    if target == 'grouped':
+        return load_grouped(ranked_hits)
+    return load_cached_books(ranked_hits) if target == 'books' else load_cached_chapters(ranked_hits)
+
+
+def _load_in_order(queryset, ranked_hits):
+    """[(pk, score), ...] 순서대로 객체를 한 번의 IN 쿼리로 읽고 score를 붙입니다."""
+    objects = queryset.in_bulk([pk for pk, _ in ranked_hits])
+    hits = []
+    for pk, score in ranked_hits:
+        obj = objects.get(pk)
+        if obj is not None:
+            obj.score = score
+            hits.append(obj)
+    return hits
+
+
+def load_cached_books(ranked_hits):
+    return _load_in_order(Book.objects.only(*BOOK_RESULT_FIELDS), ranked_hits)
+
+
+def load_cached_chapters(ranked_hits):
+    return _load_in_order(_chapter_queryset(), ranked_hits)
@@ -0,0 +1,116 @@
+# books/search_cache.py
+import hashlib
+import json
+import logging
+from array import array
+
+import redis
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# ETL(run_etl.py)과 임베딩 태스크가 데이터를 다시 적재할 때마다 INCR하는 세대 카운터.
+# 결과 캐시 키에 세대가 포함되므로 카운터가 바뀌면 이전 결과는 더 이상 조회되지 않고 TTL로 사라집니다.
+GENERATION_KEY = 'bookroad:search:generation'
+EMBEDDING_KEY_PREFIX = 'bookroad:search:emb'
+RESULT_KEY_PREFIX = 'bookroad:search:res'
+# 수집 중 세대 올리기 제한용 키. (SET NX EX로 SEARCH_GENERATION_BUMP_INTERVAL초에 한 번만 INCR)
+BUMP_THROTTLE_KEY = 'bookroad:search:generation:throttle'
+
+_client = None
+
+
+def get_client():
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(settings.SEARCH_CACHE_URL, socket_timeout=0.2, socket_connect_timeout=0.2)
+    return _client
+
+
+def normalize_query(text):
+    return ' '.join(text.split())
+
+
+def _digest(payload):
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+
+
+def get_generation():
+    try:
+        return int(get_client().get(GENERATION_KEY) or 0)
+    except redis.RedisError as e:
+        logger.warning("Search cache unavailable (generation): %s", e)
+        return None
+
+
+def bump_generation():
+    """검색 대상 임베딩이 바뀌었음을 알립니다. (기존 결과 캐시 무효화)"""
+    try:
+        return get_client().incr(GENERATION_KEY)
+    except redis.RedisError as e:
+        logger.warning("Failed to bump search cache generation: %s", e)
+        return None
+
+
+def bump_generation_throttled():
+    """
+    임베딩 태스크처럼 자주 호출되는 곳에서 사용합니다. SEARCH_GENERATION_BUMP_INTERVAL초에 한 번만 세대를 올리므로
+    연속 수집 중에도 결과 캐시가 매번 무효화되지 않습니다. 건너뛴 변경은 다음 bump나 결과 캐시 TTL
+    (SEARCH_RESULT_CACHE_TTL) 안에 반영됩니다. 실제로 올렸으면 새 세대, 건너뛰었거나 실패하면 None을 반환합니다.
+    """
+    try:
+        client = get_client()
+        if not client.set(BUMP_THROTTLE_KEY, 1, nx=True, ex=settings.SEARCH_GENERATION_BUMP_INTERVAL):
+            return None
+        return client.incr(GENERATION_KEY)
+    except redis.RedisError as e:
+        logger.warning("Failed to bump search cache generation: %s", e)
+        return None
+
+
+def get_or_encode_query(text, encode):
+    """
+    검색어 -> 임베딩 캐시. 모델 이름이 키에 포함되며 float32 바이트로 저장합니다.
+    Redis 장애 시에는 캐시 없이 encode(text)를 그대로 호출합니다.
+    """
+    key = f"{EMBEDDING_KEY_PREFIX}:{_digest(settings.EMBEDDING_MODEL_NAME + chr(31) + text)}"
+    try:
+        cached = get_client().get(key)
+    except redis.RedisError as e:
+        logger.warning("Search cache unavailable (embedding): %s", e)
+        return encode(text)
+
+    if cached is not None:
+        vector = array('f')
+        vector.frombytes(cached)
+        return vector.tolist()
+
+    vector = encode(text)
+    try:
+        get_client().set(key, array('f', vector).tobytes(), ex=settings.SEARCH_EMBEDDING_CACHE_TTL)
+    except redis.RedisError as e:
+        logger.warning("Failed to store query embedding: %s", e)
+    return vector
+
+
+def result_cache_key(generation, params):
+    """(검색어, 필터, k, target) + 세대로 결과 캐시 키를 만듭니다."""
+    payload = json.dumps(params, sort_keys=True, default=str, ensure_ascii=False)
+    return f"{RESULT_KEY_PREFIX}:{generation}:{_digest(payload)}"
+
+
+def get_cached_results(key):
+    """캐시된 순위 목록(search.dump_ranked 형식)을 반환합니다. 없으면 None."""
+    try:
+        cached = get_client().get(key)
+    except redis.RedisError as e:
+        logger.warning("Search cache unavailable (results): %s", e)
+        return None
+    return json.loads(cached) if cached is not None else None
+
+
+def set_cached_results(key, ranked):
+    try:
+        get_client().set(key, json.dumps(ranked), ex=settings.SEARCH_RESULT_CACHE_TTL)
+    except redis.RedisError as e:
+        logger.warning("Failed to store search results: %s", e)
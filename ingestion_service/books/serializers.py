@@ -0,0 +1,73 @@
+# books/serializers.py
+from django.conf import settings
+from rest_framework import serializers
+
+from .models import Book, Chapter
+
+
+class SearchQuerySerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=512, trim_whitespace=True)
+    target = serializers.ChoiceField(choices=['books', 'chapters', 'grouped'], default='chapters')
+    k = serializers.IntegerField(min_value=1, max_value=settings.SEARCH_MAX_K, default=10)
+    publisher = serializers.CharField(max_length=256, required=False)
+    published_from = serializers.DateField(required=False)
+    published_to = serializers.DateField(required=False)
+    level = serializers.IntegerField(min_value=1, required=False)
+    # hybrid: 벡터 + 어휘(제목/저자/ISBN) RRF 융합, vector: 벡터 유사도만
+    # 기본값은 hybrid이며, target=grouped는 벡터 검색만 지원하므로 vector가 기본이고 hybrid를 주면 400입니다.
+    mode = serializers.ChoiceField(choices=['hybrid', 'vector'], required=False)
+    # target=grouped: 책마다 반환할 최대 챕터 수
+    chapters_per_book = serializers.IntegerField(min_value=1, max_value=10, default=3)
+    # 목차가 거의 같은 개정판/세트 도서(Book.toc_cluster)의 결과를 가장 높은 점수 하나로 접습니다.
+    collapse_duplicates = serializers.BooleanField(default=True)
+
+    def validate(self, attrs):
+        if attrs.get('published_from') and attrs.get('published_to') and attrs['published_from'] > attrs['published_to']:
+            raise serializers.ValidationError("published_from은 published_to보다 이후일 수 없습니다.")
+        if attrs['target'] == 'grouped':
+            if attrs.get('mode') == 'hybrid':
+                raise serializers.ValidationError({'mode': "target=grouped는 mode=vector만 지원합니다."})
+            attrs['mode'] = 'vector'
+        else:
+            attrs.setdefault('mode', 'hybrid')
+        return attrs
+
+
+class BookSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Book
+        fields = ['isbn', 'title', 'author', 'publisher', 'publication_date']
+
+
+class BookResultSerializer(serializers.ModelSerializer):
+    # vector 모드: 코사인 유사도, hybrid 모드: RRF 점수
+    score = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = Book
+        fields = ['isbn', 'title', 'author', 'publisher', 'publication_date', 'summary', 'score']
+
+
+class ChapterResultSerializer(serializers.ModelSerializer):
+    book = BookSummarySerializer(read_only=True)
+    score = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = Chapter
+        fields = ['id', 'level', 'number', 'title', 'book', 'score']
+
+
+class MatchedChapterSerializer(serializers.ModelSerializer):
+    score = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = Chapter
+        fields = ['id', 'level', 'number', 'title', 'score']
+
+
+class GroupedBookResultSerializer(BookResultSerializer):
+    # 책 점수 = 가장 잘 맞는 챕터의 유사도 (max-pooling)
+    chapters = MatchedChapterSerializer(source='matched_chapters', many=True, read_only=True)
+
+    class Meta(BookResultSerializer.Meta):
+        fields = BookResultSerializer.Meta.fields + ['chapters']
@@ -1,66 +1,196 @@
 # books/tasks.py
+import hashlib
 import time
 
+import redis
 from celery import shared_task, group, chain
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
 from bookroad.services import AladinAPI
-from .models import Book, Chapter  # 1단계에서 만든 Book, Chapter 모델
-from datetime import datetime
-import re  # 목차 파싱을 위해 re (정규표현식) 임포트
+from .models import Book, BookContent, Chapter, DiscoveryStat  # 1단계에서 만든 Book, Chapter 모델
+from .embeddings import encode_texts  # 임베딩 서버 또는 로컬 모델
+from .search_cache import bump_generation_throttled as bump_search_cache_generation
+from . import progress, refresh
+from datetime import datetime, timedelta
+from toc_parser import PARSER_VERSION, estimate_jaccard, parse_book_toc, toc_signature  # ETL과 공유하는 계층형 목차 파서
 
 
-# (참고) 임베딩 생성을 위한 임시 헬퍼 함수
-# 실제로는 HuggingFace Transformers 같은 라이브러리를 사용해야 합니다.
-def get_embedding_vector(text):
-    """[임시 STUB] 실제 임베딩 모델을 호출하는 함수입니다."""
-    # 예: from sentence_transformers import SentenceTransformer
-    # model = SentenceTransformer('model_name')
-    # return model.encode(text)
+# --- (헬퍼 함수: _fetch_all_pages) ---
+def _isbn13(item):
+    """목록/검색 응답 항목의 isbn13. (리스트이면 첫 번째 요소, 13자리가 아니면 None)"""
+    isbn_value = item.get('isbn13')
+    if isinstance(isbn_value, list):
+        isbn_value = isbn_value[0] if isbn_value else None
+    return isbn_value if isbn_value and len(isbn_value) == 13 else None
 
-    # 지금은 768차원의 임시 벡터(0)를 반환합니다.
-    # 이 함수는 실제 모델로 교체되어야 합니다.
-    print(f"[Embedding Stub] Processing: {text[:30]}...")
-    return [0.0] * 768
 
+def content_hash(text):
+    """상세 조회 결과가 바뀌었는지 비교하기 위한 해시. (migrations/0014의 SQL과 같은 값)"""
+    return hashlib.sha256((text or '').encode('utf-8')).hexdigest()
 
-# --- (헬퍼 함수: _fetch_all_pages) ---
-# 이 함수는 기존과 동일합니다. (변경 없음)
-def _fetch_all_pages(api, method, params):
-    isbns = []
+
+def _parse_pub_date(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except (ValueError, TypeError):
+        return None
+
+
+def _list_metadata(item):
+    """목록/검색 응답 항목에서 Book에 바로 저장(staging)할 필드만 추립니다. (Redis에 stash되므로 작게 유지)"""
+    return {
+        'title': item.get('title', ''),
+        'author': item.get('author', ''),
+        'publisher': item.get('publisher', ''),
+        'pubDate': item.get('pubDate', ''),
+        'description': item.get('description', ''),
+        'salesPoint': item.get('salesPoint', 0),
+    }
+
+
+def _staged_book(isbn, metadata):
+    """목록 메타데이터만으로 만든 Book. (details_fetched_at=None -> 상세 조회 대상)"""
+    return Book(
+        isbn=isbn,
+        title=metadata.get('title', '')[:512],
+        author=metadata.get('author', '')[:256],
+        summary=metadata.get('description', ''),
+        publisher=metadata.get('publisher', '')[:256],
+        publication_date=_parse_pub_date(metadata.get('pubDate')),
+    )
+
+
+def _lookup_priority(metadata):
+    """상세 조회 우선순위: 최근 출간, 판매지수가 높은 순. (목록 정보가 없는 ISBN은 맨 뒤)"""
+    return metadata.get('pubDate') or '', metadata.get('salesPoint') or 0
+
+
+def _fetch_all_pages(api, method, params, known=None, max_pages=None, metadata=None):
+    """
+    목록/검색 결과를 페이지 단위로 조회하여 (ISBN 목록, 페이지별 신규 ISBN 수, 요청 실패 여부)를 반환합니다.
+    요청 실패(API 오류/응답 없음)는 결과가 없는 페이지와 구분합니다. 실패한 페이지는 페이지별 신규 수에 넣지 않습니다.
+    known(set)이 주어지면 known과 DB에 모두 없는 ISBN만 신규로 세고, 한 페이지의 신규 수가
+    DISCOVERY_MIN_NEW_PER_PAGE보다 적으면 다음 페이지를 요청하지 않습니다. (known은 조회한 ISBN으로 갱신됨)
+    max_pages는 이번 호출에서 요청할 수 있는 최대 페이지 수입니다.
+    metadata(dict)가 주어지면 {isbn: 목록 메타데이터}를 채웁니다.
+    """
+    isbns, page_yields = [], []
+    failed = False
     start_page = 1
     MAX_RESULTS_PER_PAGE = 50
     MAX_TOTAL_RESULTS = 200
 
-    while True:
+    while max_pages is None or start_page <= max_pages:
         page_params = {**params, 'start': start_page, 'MaxResults': MAX_RESULTS_PER_PAGE}
         response = api.item_list(**page_params) if method == 'item_list' else api.item_search(**page_params)
 
-        if not response or 'item' not in response: break
+        if response is None or 'errorCode' in response:
+            failed = True
+            break
+        if 'item' not in response: break
+        page_isbns = []
         for item in response['item']:
-            if 'isbn13' in item and item['isbn13']:
-                # isbn13이 리스트인 경우 첫 번째 요소를 사용하도록 수정
-                isbn_value = item['isbn13']
-                if isinstance(isbn_value, list):
-                    if isbn_value: # 리스트가 비어있지 않은 경우
-                        isbn_value = isbn_value[0]
-                    else: # 리스트가 비어있는 경우 건너뜀
-                        continue
-                
-                if len(isbn_value) == 13:
-                    isbns.append(isbn_value)
+            isbn = _isbn13(item)
+            if isbn:
+                page_isbns.append(isbn)
+                if metadata is not None:
+                    metadata[isbn] = _list_metadata(item)
+        isbns.extend(page_isbns)
+
+        if known is None:
+            page_yields.append(len(page_isbns))
+        else:
+            candidates = set(page_isbns) - known
+            existing = set(Book.objects.filter(isbn__in=candidates).values_list('isbn', flat=True)) if candidates else set()
+            known.update(page_isbns)
+            page_yields.append(len(candidates - existing))
+            if page_yields[-1] < settings.DISCOVERY_MIN_NEW_PER_PAGE:
+                break
 
         total_results = response.get('totalResults', 0)
         if not total_results or total_results <= start_page * MAX_RESULTS_PER_PAGE or start_page * MAX_RESULTS_PER_PAGE >= MAX_TOTAL_RESULTS:
             break
         start_page += 1
-    return isbns
+    return isbns, page_yields, failed
+
+
+def _strategy_key(strategy):
+    """DiscoveryStat에 저장하는 전략 키. (list:<QueryType> 또는 search:<검색어>)"""
+    if strategy['method'] == 'item_list':
+        return f"list:{strategy['params']['QueryType']}"
+    return f"search:{strategy['params']['Query']}"[:128]
+
+
+def _plan_strategies(strategies, stats):
+    """
+    지난 실행의 수확률 통계(stats: {전략 키: DiscoveryStat})로 이번 실행의 전략 순서를 정합니다.
+    - 기본 목록(베스트셀러/신간)은 항상 먼저, 그대로 실행합니다.
+    - 검색어는 처음 보는 것, 페이지당 신규 ISBN 수가 높은 것 순으로 실행합니다.
+    - 연속 DISCOVERY_SKIP_AFTER_ZERO_RUNS회 신규가 없던 검색어는 DISCOVERY_REPROBE_DAYS가 지날 때까지 건너뜁니다.
+    반환값: (실행할 전략 목록, 건너뛴 전략 키 목록)
+    """
+    reprobe_before = timezone.now() - timedelta(days=settings.DISCOVERY_REPROBE_DAYS)
+    base, keywords, skipped = [], [], []
+    for strategy in strategies:
+        stat = stats.get(strategy['key'])
+        if strategy['method'] == 'item_list':
+            base.append(strategy)
+        elif (stat and stat.zero_yield_runs >= settings.DISCOVERY_SKIP_AFTER_ZERO_RUNS
+              and stat.last_run_at and stat.last_run_at > reprobe_before):
+            skipped.append(strategy['key'])
+        else:
+            keywords.append(strategy)
+    keywords.sort(key=lambda strategy: -stats[strategy['key']].yield_per_page if strategy['key'] in stats else float('-inf'))
+    return base + keywords, skipped
+
+
+def _save_discovery_stats(category_id, stats, results):
+    """
+    이번 실행의 전략별 결과(results: {전략 키: (응답 ISBN 수, 페이지별 신규 수, 요청 실패 여부)})를 DiscoveryStat에 누적합니다.
+    요청이 실패한 전략은 신규가 없던 실행(zero_yield_runs)으로 세지 않습니다. (API 장애로 검색어가 건너뛰어지지 않도록)
+    한 페이지도 받지 못한 전략은 통계를 갱신하지 않습니다.
+    """
+    now = timezone.now()
+    rows = []
+    for key, (returned, page_yields, failed) in results.items():
+        if failed and not page_yields:
+            continue
+        stat = stats.get(key) or DiscoveryStat(category_id=str(category_id), strategy=key)
+        new = sum(page_yields)
+        stat.runs += 1
+        stat.pages_fetched += len(page_yields)
+        stat.isbns_returned += returned
+        stat.isbns_new += new
+        if new:
+            stat.zero_yield_runs = 0
+        elif not failed:
+            stat.zero_yield_runs += 1
+        stat.last_run_at = now
+        if new:
+            stat.last_new_at = now
+        rows.append(stat)
+    DiscoveryStat.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=['category_id', 'strategy'],
+        update_fields=['runs', 'pages_fetched', 'isbns_returned', 'isbns_new', 'zero_yield_runs',
+                       'last_run_at', 'last_new_at'],
+    )
 
 
 # === 파이프라인 1 (검색어 대폭 확장) ===
-@shared_task(rate_limit='1/s')
-def discover_isbns_for_category(category_id):
-    """하이브리드 및 다중 질의 전략으로 ISBN 목록을 확장하여 탐색합니다."""
+# chord(group | process_discovered_isbns)의 헤더이므로 결과를 저장해야 합니다. (전역 기본값은 CELERY_TASK_IGNORE_RESULT=True)
+@shared_task(rate_limit='1/s', ignore_result=False)
+def discover_isbns_for_category(category_id, run_id=None):
+    """
+    하이브리드 및 다중 질의 전략으로 ISBN 목록을 확장하여 탐색합니다.
+    전략별 신규 ISBN 수확률(DiscoveryStat)에 따라 전략 순서를 정하고, 신규가 없는 페이지에서 멈추며,
+    계속 신규가 없던 검색어는 건너뜁니다.
+    """
     api = AladinAPI()
     unique_isbns = set()
+    found = {}  # {isbn: 목록 메타데이터} -> process_discovered_isbns가 Book으로 staging
 
     # 1. 기본 전략 (베스트셀러, 신간)
     base_strategies = [
@@ -85,13 +215,27 @@ def discover_isbns_for_category(category_id):
          'params': {'Query': keyword, 'CategoryId': category_id, 'SearchTarget': 'Book', 'Sort': 'SalesPoint'}}
         for keyword in extended_keywords
     ]
-
     for strategy in query_strategies:
+        strategy['key'] = _strategy_key(strategy)
+
+    # 4. 지난 실행의 수확률 통계로 순서/건너뛰기를 정합니다.
+    stats = {stat.strategy: stat for stat in DiscoveryStat.objects.filter(category_id=str(category_id))}
+    planned_strategies, skipped = _plan_strategies(query_strategies, stats)
+    pages_left = settings.DISCOVERY_MAX_PAGES_PER_CATEGORY or None
+    results = {}
+
+    for strategy in planned_strategies:
+        if pages_left is not None and pages_left <= 0:
+            skipped.append(strategy['key'])
+            continue
         try:
-            # _fetch_all_pages는 API 요청 실패 시 빈 리스트 []를 반환해야 합니다. (혹은 None)
-            isbns_from_query = _fetch_all_pages(api, strategy['method'], strategy['params'])
-            if isbns_from_query:
-                unique_isbns.update(isbns_from_query)
+            # 요청 실패 시 그때까지 받은 페이지와 failed=True를 반환합니다. (unique_isbns는 함수 안에서 갱신)
+            isbns_from_query, page_yields, failed = _fetch_all_pages(
+                api, strategy['method'], strategy['params'], known=unique_isbns, max_pages=pages_left, metadata=found
+            )
+            results[strategy['key']] = (len(isbns_from_query), page_yields, failed)
+            if pages_left is not None:
+                pages_left -= len(page_yields)
 
             time.sleep(0.5)
         except Exception as e:
@@ -99,20 +243,41 @@ def discover_isbns_for_category(category_id):
             print(f"Warning: Failed fetching strategy {strategy.get('params')} for CID {category_id}. Error: {e}")
             time.sleep(1)
 
+    _save_discovery_stats(category_id, stats, results)
+    new_isbns = sum(sum(page_yields) for _, page_yields, _ in results.values())
+    pages = sum(len(page_yields) for _, page_yields, _ in results.values())
+    failed_strategies = sum(1 for _, _, failed in results.values() if failed)
     print(
-        f"Category {category_id}: Discovered {len(unique_isbns)} unique ISBNs from {len(query_strategies)} strategies.")
+        f"Category {category_id}: Discovered {len(unique_isbns)} unique ISBNs ({new_isbns} new) "
+        f"from {len(results)} strategies in {pages} pages ({len(skipped)} low-yield strategies skipped, "
+        f"{failed_strategies} failed requests).")
+    progress.incr(run_id, categories_discovered=1, isbns_found=len(unique_isbns))
+    # run_id가 있으면 ISBN과 목록 메타데이터는 run별 Redis 해시에 두고, 결과 백엔드로는 카테고리 표식만 넘깁니다.
+    if progress.stash_isbns(run_id, category_id, found):
+        return {'category_id': category_id}
     return list(unique_isbns)
 
 
 # === 파이프라인 2 (ISBN 중복이면 "스킵" 로직) ===
-@shared_task
-def process_discovered_isbns(isbn_list):
+@shared_task(bind=True, max_retries=3, default_retry_delay=30)
+def process_discovered_isbns(self, isbn_list, run_id=None):
     """
     ISBN 목록을 받아 DB와 비교 후,
-    '새로운' (중복되지 않은) ISBN에 대해서만 [정보 저장 -> 목차 파싱 -> 임베딩] 체인을 실행합니다.
+    '새로운' ISBN은 목록 메타데이터(제목/저자/출판사/출간일/소개)로 Book을 바로 저장(staging)하고,
+    상세 정보가 없는 도서만 우선순위 순으로 배치 상세 조회(-> 목차 파싱 -> 임베딩)에 넘깁니다.
+    run_id가 주어지면 같은 실행의 다른 청크가 이미 제출한 ISBN도 건너뛰고, 진행 카운터를 갱신합니다.
+    isbn_list의 {'category_id': ...} 항목은 탐색 태스크가 Redis에 저장해 둔 {isbn: 메타데이터}를 가리킵니다.
+    저장해 둔 결과는 Book 저장과 상세 조회 제출이 끝난 뒤에 지우고, 읽기에 실패하면 태스크를 재시도합니다.
     """
     if not isbn_list:
-        return "No ISBNs to process."
+        progress.incr(run_id, batches_processed=1)
+        return
+
+    stashed_categories = [item['category_id'] for item in isbn_list if isinstance(item, dict) and 'category_id' in item]
+    try:
+        metadata = progress.read_isbns(run_id, stashed_categories)
+    except redis.RedisError as e:
+        raise self.retry(exc=e)
 
     # 1. 중첩 리스트(list[list])를 1차원 set(set[str])으로 펼칩니다. (방어 코드)
     try:
@@ -125,138 +290,232 @@ def process_discovered_isbns(isbn_list):
     except TypeError:
         flat_isbn_set = {str(item) for item in isbn_list if
                          isinstance(item, str) and item.isdigit() and len(item) == 13}
+    flat_isbn_set |= metadata.keys()
 
     if not flat_isbn_set:
-        return f"No valid ISBNs found after flattening list of length {len(isbn_list)}."
+        progress.clear_isbns(run_id, stashed_categories)
+        progress.incr(run_id, batches_processed=1)
+        print(f"No valid ISBNs found after flattening list of length {len(isbn_list)}.")
+        return
 
     # ▼▼▼ [핵심] DB 필터링 ("중복이면 스킵") 로직 ▼▼▼
 
-    # 2-1. DB에 이미 있는 ISBN 목록을 조회
-    existing_isbns = set(
-        Book.objects.filter(isbn__in=flat_isbn_set).values_list('isbn', flat=True)
+    # 2-1. DB에 이미 있는 ISBN과 상세 조회 여부를 조회
+    existing = dict(
+        Book.objects.filter(isbn__in=flat_isbn_set).values_list('isbn', 'details_fetched_at')
     )
 
-    # 2-2. '새로운' ISBN 목록만 필터링
-    new_isbns = [isbn for isbn in flat_isbn_set if isbn not in existing_isbns]
+    # 2-2. '새로운' ISBN은 목록 메타데이터로 한 번에 staging (상세 조회 전에도 목록/검색 대상이 됨)
+    new_isbns = [isbn for isbn in flat_isbn_set if isbn not in existing]
+    Book.objects.bulk_create(
+        [_staged_book(isbn, metadata.get(isbn, {})) for isbn in new_isbns], ignore_conflicts=True, batch_size=500
+    )
+
+    # 2-3. 상세 정보(목차/상세 소개/저자)가 없는 도서만 상세 조회 대상 (이전 실행에서 staging만 된 도서 포함)
+    lookup_isbns = new_isbns + [isbn for isbn, fetched_at in existing.items() if fetched_at is None]
+    lookup_isbns = progress.claim_isbns(run_id, lookup_isbns)
 
-    if not new_isbns:
-        return f"No new ISBNs to fetch. (Processed {len(flat_isbn_set)}, all existed)."
+    if not lookup_isbns:
+        progress.clear_isbns(run_id, stashed_categories)
+        progress.incr(run_id, batches_processed=1)
+        print(f"No new ISBNs to fetch. (Processed {len(flat_isbn_set)}, all existed).")
+        return
     # ▲▲▲ [핵심] "중복이면 스킵" 로직 끝 ▲▲▲
 
-    # 'new_isbns' (필터링된 리스트)를 사용합니다.
+    # 최근 출간/판매지수 높은 도서부터 상세 조회하도록 정렬한 뒤 배치로 나눕니다. (큐는 FIFO)
+    lookup_isbns.sort(key=lambda isbn: _lookup_priority(metadata.get(isbn, {})), reverse=True)
+    batch_size = settings.INGEST_LOOKUP_BATCH_SIZE
+    # 태스크끼리는 ISBN 목록/isbn13(또는 실패 시 None)만 메시지로 넘기고, 결과 백엔드에는 아무것도 저장하지 않습니다.
     job_group = group(
-        chain(
-            fetch_and_save_book_details.s(isbn),
-            parse_toc_and_create_chapters.s(),
-            generate_embeddings_for_book.s()
-        )
-        for isbn in new_isbns  # "새로운" ISBN에 대해서만 체인 생성
+        fetch_book_details_batch.s(lookup_isbns[i:i + batch_size], run_id=run_id)
+        for i in range(0, len(lookup_isbns), batch_size)
     )
 
+    # 체인을 제출하기 전에 카운터를 올려야 --wait가 '끝난 도서 수 >= 제출 수'를 너무 일찍 만족하지 않습니다.
+    progress.incr(run_id, isbns_new=len(lookup_isbns), batches_processed=1)
     job_group.apply_async()
-    return f"Started processing chains for {len(new_isbns)} new ISBNs (out of {len(flat_isbn_set)} discovered)."
+    progress.clear_isbns(run_id, stashed_categories)
+    print(f"Staged {len(new_isbns)} new books and queued {len(lookup_isbns)} detail lookups "
+          f"(out of {len(flat_isbn_set)} discovered).")
 
 
 # === 파이프라인 3 ===
-@shared_task(bind=True, max_retries=3, default_retry_delay=60, rate_limit='60/m')
-def fetch_and_save_book_details(self, isbn13):
-    """ISBN13으로 상세 정보를 조회하고 'Book' 모델에 저장 (또는 업데이트) 합니다."""
+# 상세 조회에서만 얻을 수 있는 필드 (목록 응답에 없는 것)
+LOOKUP_OPT_RESULT = 'authors,Toc,fullDescription,publisherReview,itemPage'  # Toc(대문자) 요청
+BOOK_DETAIL_FIELDS = ['title', 'author', 'summary', 'publisher', 'publication_date', 'subtitle', 'page_count',
+                      'details_fetched_at', 'updated_at']
+CONTENT_FIELDS = ['full_description', 'publisher_description', 'authors_json', 'raw_toc', 'toc_hash', 'summary_hash']
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60,
+             rate_limit=f"{max(1, settings.ALADIN_LOOKUPS_PER_MINUTE // settings.INGEST_LOOKUP_BATCH_SIZE)}/m")
+def fetch_book_details_batch(self, isbns, run_id=None):
+    """
+    staging된 도서들의 상세 정보(목차, 상세 소개, 저자 상세, 쪽수)를 ItemLookUp으로 채웁니다.
+    ItemLookUp은 요청당 ISBN 하나만 받으므로, 배치 안에서는 HTTP 연결을 재사용하고 DB 쓰기를 bulk로 묶습니다.
+    요청이 실패한 ISBN만 모아 배치를 재시도합니다.
+    이미 상세 정보가 있던 도서(갱신)는 저장된 해시와 비교하여, 목차가 바뀌었거나 파서 버전이 다르면 [목차 파싱 -> 임베딩],
+    요약만 바뀌었으면 [임베딩]만 다시 실행하고, 바뀐 것이 없으면 아무것도 하지 않습니다.
+    """
     api = AladinAPI()
-    try:
-        response = api.item_lookup(
-            ItemId=isbn13,
-            ItemIdType='ISBN13',
-            OptResult='authors,Toc,fullDescription,publisherReview,itemPage'  # Toc(대문자) 요청
-        )
-        if not response or 'item' not in response or not response['item']:
-            return f"Failed: No details for {isbn13}"
+    books = {book.isbn: book for book in Book.objects.filter(isbn__in=isbns)}
+    stored_hashes = dict(
+        (book_id, (toc_hash, summary_hash)) for book_id, toc_hash, summary_hash in
+        BookContent.objects.filter(book__in=books.values()).values_list('book_id', 'toc_hash', 'summary_hash')
+    )
+    now = timezone.now()
+    updated_books, contents, fetched, no_details, retry_isbns = [], [], [], [], []
+    reparse, reembed, unchanged = [], [], []
+
+    for isbn13 in isbns:
+        book = books.get(isbn13)
+        if book is None:
+            progress.incr(run_id, books_finished=1)
+            progress.record_outcome(run_id, 'not_found', isbn13, 'Staged book not found before detail lookup.')
+            continue
+
+        response = api.item_lookup(ItemId=isbn13, ItemIdType='ISBN13', OptResult=LOOKUP_OPT_RESULT)
+        if response is None:
+            # 네트워크/HTTP 오류 -> 재시도 대상
+            retry_isbns.append(isbn13)
+            continue
+
+        book.details_fetched_at = now
+        book.updated_at = now
+        updated_books.append(book)
+        if 'item' not in response or not response['item']:
+            no_details.append(isbn13)
+            continue
 
         item = response['item'][0]
-
-        # ▼▼▼ [핵심 수정] subInfo 객체를 안전하게 가져옵니다. ▼▼▼
         # 만약 subInfo가 응답에 없으면, 빈 딕셔너리({})를 사용해 에러를 방지합니다.
         sub_info = item.get('subInfo', {})
-        # ▲▲▲ [핵심 수정] ▲▲▲
 
-        # ... (pub_date = None 및 날짜 파싱 로직은 그대로 둠) ...
-        pub_date = None
-        try:
-            pub_date = datetime.strptime(item.get('pubDate'), '%Y-%m-%d').date()
-        except (ValueError, TypeError):
-            pass
-
-        book, created = Book.objects.update_or_create(
-            isbn=item.get('isbn13'),  # 조회 기준 키
-            defaults={
-                # --- Top-Level 정보 ---
-                'title': item.get('title', ''),
-                'author': item.get('author', ''),
-                'summary': item.get('description', ''),
-                'publisher': item.get('publisher', ''),
-                'publication_date': pub_date,
-                'full_description': item.get('fullDescription', ''),
-
-                # --- [수정] Top-Level (Fallback 추가) ---
-                # publisherReview가 없으면 fullDescription2를 사용합니다.
-                'publisher_description': item.get('publisherReview', item.get('fullDescription2', '')),
-
-                # --- [수정] Nested (subInfo) 정보 ---
-                'subtitle': sub_info.get('subTitle', ''),
-                'page_count': sub_info.get('itemPage', None) or None,
-                'authors_json': sub_info.get('authors', None),
-                'raw_toc': sub_info.get('toc', ''),  # <-- ★★★ 드디어 'toc'를 올바르게 가져옵니다 ★★★
-            }
+        # --- Top-Level 정보 (목록 정보보다 상세 응답을 우선) ---
+        book.title = (item.get('title') or book.title)[:512]
+        book.author = (item.get('author') or book.author)[:256]
+        book.summary = item.get('description') or book.summary
+        book.publisher = (item.get('publisher') or book.publisher)[:256]
+        book.publication_date = _parse_pub_date(item.get('pubDate')) or book.publication_date
+        # --- Nested (subInfo) 정보 ---
+        book.subtitle = (sub_info.get('subTitle') or '')[:512]
+        book.page_count = sub_info.get('itemPage', None) or None
+
+        # 큰 텍스트/JSON 필드는 1:1 테이블(BookContent)에 저장합니다.
+        content = BookContent(
+            book=book,
+            full_description=item.get('fullDescription', ''),
+            # publisherReview가 없으면 fullDescription2를 사용합니다.
+            publisher_description=item.get('publisherReview', item.get('fullDescription2', '')),
+            authors_json=sub_info.get('authors', None),
+            raw_toc=sub_info.get('toc', ''),
+            summary_hash=content_hash(book.summary),
         )
+        content.toc_hash = content_hash(content.raw_toc)
+        contents.append(content)
+        fetched.append(isbn13)
+
+        # 해시 비교로 다음 단계를 정합니다. (처음 조회하는 도서는 저장된 해시가 없으므로 항상 파싱)
+        old_toc_hash, old_summary_hash = stored_hashes.get(book.id, (None, None))
+        if (content.toc_hash != old_toc_hash
+                or (content.raw_toc and book.toc_parser_version != PARSER_VERSION)):
+            reparse.append(isbn13)
+        elif content.summary_hash != old_summary_hash:
+            reembed.append(isbn13)
+        else:
+            unchanged.append(isbn13)
 
-        action = "Created" if created else "Updated"
-        print(f"Successfully {action} book: {book.title}")
-        return isbn13
-
+    try:
+        with transaction.atomic():
+            Book.objects.bulk_update(updated_books, BOOK_DETAIL_FIELDS, batch_size=100)
+            BookContent.objects.bulk_create(
+                contents, update_conflicts=True, unique_fields=['book'], update_fields=CONTENT_FIELDS, batch_size=100,
+            )
+            # 요약이 바뀐 도서는 요약 임베딩을 비워 임베딩 태스크가 다시 만들게 합니다. (목차가 바뀐 도서는 챕터가 새로 생김)
+            changed_summaries = [
+                isbn13 for isbn13 in reparse + reembed
+                if stored_hashes.get(books[isbn13].id, (None, None))[1] not in (None, content_hash(books[isbn13].summary))
+            ]
+            if changed_summaries:
+                Book.objects.filter(isbn__in=changed_summaries).update(summary_embedding=None)
     except Exception as e:
-        self.retry(exc=e)
-        return f"Error processing {isbn13}: {e}"
+        # 저장 실패 시 (DB에 있는) 배치 전체를 재시도합니다.
+        retry_isbns = [isbn13 for isbn13 in isbns if isbn13 in books]
+        failure = e
+    else:
+        failure = None
+        for isbn13 in no_details:
+            progress.record_outcome(run_id, 'no_details', isbn13)
+        for isbn13 in unchanged:
+            progress.record_outcome(run_id, 'unchanged', isbn13)
+        progress.incr(run_id, books_fetched=len(fetched), books_finished=len(no_details) + len(unchanged))
+        follow_ups = (
+            [chain(parse_toc_and_create_chapters.s(isbn, run_id=run_id), generate_embeddings_for_book.s(run_id=run_id))
+             for isbn in reparse]
+            + [generate_embeddings_for_book.s(isbn, run_id=run_id) for isbn in reembed]
+        )
+        if follow_ups:
+            group(follow_ups).apply_async()
+        print(f"Fetched details for {len(fetched)}/{len(isbns)} books: {len(reparse)} to parse, "
+              f"{len(reembed)} to re-embed, {len(unchanged)} unchanged ({len(retry_isbns)} to retry).")
+
+    if retry_isbns:
+        failure = failure or RuntimeError(f"Aladin ItemLookUp failed for {len(retry_isbns)} ISBNs")
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=failure, args=[retry_isbns], kwargs={'run_id': run_id})
+        # 재시도를 소진한 도서는 파이프라인에서 제외합니다.
+        for isbn13 in retry_isbns:
+            progress.record_outcome(run_id, 'fetch_failed', isbn13, failure)
+        progress.incr(run_id, books_failed=len(retry_isbns), books_finished=len(retry_isbns))
 
 
 # === 파이프라인 4 ===
 @shared_task
-def parse_toc_and_create_chapters(isbn13):
+def parse_toc_and_create_chapters(isbn13, run_id=None):
     """
     저장된 'Book'의 'raw_toc'를 파싱하여 'Chapter' 객체를 생성합니다.
-    (다음 태스크(5)로 isbn13을 넘김)
+    (성공 시 다음 태스크(5)로 isbn13을, 실패/건너뜀 시 None을 넘김. 사유는 run 요약에 기록)
     """
 
     # ▼▼▼ [핵심 수정] 방어 코드 추가 ▼▼▼
-    # 3번 태스크에서 실패 문자열을 넘겨받았는지 확인합니다.
+    # 3번 태스크가 실패(None)를 넘겼는지 확인합니다. (사유는 3번 태스크가 이미 기록)
     # (isbn13이 13자리 숫자가 아니면 실행 중단)
     if not (isinstance(isbn13, str) and isbn13.isdigit() and len(isbn13) == 13):
-        return f"Skipped TOC: Received invalid ISBN string '{str(isbn13)[:50]}...'"
+        return None
     # ▲▲▲ [핵심 수정] ▲▲▲
 
     try:
-        book = Book.objects.get(isbn=isbn13)
-        if not book.raw_toc:
-            return f"Skipped TOC: No raw_toc for {isbn13}"
+        # 파싱에 필요한 상태 필드와 원본 목차만 읽습니다. (다른 큰 필드/임베딩은 읽지 않음)
+        book = (
+            Book.objects.select_related('content')
+            .only('id', 'isbn', 'toc_parsing_failed', 'toc_parser_version', 'toc_minhash', 'toc_lsh_bands',
+                  'toc_cluster', 'content__raw_toc')
+            .get(isbn=isbn13)
+        )
+        raw_toc = book.content.raw_toc if hasattr(book, 'content') else ''
+        if not raw_toc:
+            progress.record_outcome(run_id, 'no_toc', isbn13)
+            return None
+
+        # 노이즈 필터링 + 규칙집 + Fallback 파서 (run_etl.py와 동일한 toc_parser 사용)
+        preprocessed_lines = []
+        nodes, failed_lines = parse_book_toc(raw_toc, isbn13, lines_out=preprocessed_lines)
+        # 전처리된 라인으로 MinHash 시그니처를 계산하고 목차가 거의 같은 기존 도서의 클러스터에 합류합니다.
+        book.toc_minhash, book.toc_lsh_bands = toc_signature(preprocessed_lines)
+        book.toc_cluster = _find_toc_cluster(book)
 
-        # ... (기존 목차 파싱 로직은 그대로) ...
         book.chapters.all().delete()
-        chapters_to_create = []
-        lines = book.raw_toc.split('\r\n')
-        order = 1
-
-        for line in lines:
-            cleaned_line = line.strip()
-            if not cleaned_line: continue
-            level = 1
-            if re.match(r'^(Part|부)\s*\d+', cleaned_line, re.IGNORECASE):
-                level = 1
-            elif re.match(r'^(Chapter|장)\s*\d+', cleaned_line, re.IGNORECASE):
-                level = 2
-            elif cleaned_line.startswith('  ') and not cleaned_line.startswith('    '):
-                level = 2
-            elif cleaned_line.startswith('    '):
-                level = 3
-            chapters_to_create.append(Chapter(book=book, order=order, level=level, title=cleaned_line))
-            order += 1
+        chapters_to_create = [
+            Chapter(
+                book=book,
+                order=order,
+                level=node.level,
+                number=node.number[:50],
+                title=node.title,
+                source_line=node.source_line,
+            )
+            for order, node in enumerate(nodes, start=1)
+        ]
 
         if chapters_to_create:
             Chapter.objects.bulk_create(chapters_to_create)
@@ -264,57 +523,149 @@ def parse_toc_and_create_chapters(isbn13):
         else:
             book.toc_parsing_failed = True
 
-        book.save()
-        print(f"Successfully parsed TOC for {isbn13} into {len(chapters_to_create)} chapters.")
+        book.toc_parser_version = PARSER_VERSION
+        book.save(update_fields=['toc_parsing_failed', 'toc_parser_version', 'toc_minhash', 'toc_lsh_bands',
+                                 'toc_cluster', 'updated_at'])
+        print(f"Successfully parsed TOC for {isbn13} into {len(chapters_to_create)} chapters "
+              f"({len(failed_lines)} unmatched lines).")
+        progress.incr(run_id, books_parsed=1)
         return isbn13  # [중요] '성공' 시에만 다음 태스크로 isbn13을 전달
 
     except Book.DoesNotExist:
-        return f"Failed TOC: Book {isbn13} not found in DB."
+        progress.record_outcome(run_id, 'not_found', isbn13, 'Book not found in DB before TOC parsing.')
+        return None
     except Exception as e:
-        try:
-            book = Book.objects.get(isbn=isbn13)
-            book.toc_parsing_failed = True
-            book.save()
-        except Book.DoesNotExist:
-            pass
-        return f"Error parsing TOC for {isbn13}: {e}"
+        Book.objects.filter(isbn=isbn13).update(toc_parsing_failed=True, updated_at=timezone.now())
+        progress.record_outcome(run_id, 'parse_error', isbn13, e)
+        return None
+
+
+def _find_toc_cluster(book):
+    """
+    LSH 밴드 키가 하나라도 겹치는 기존 도서 중 추정 유사도가 TOC_DUPLICATE_THRESHOLD 이상이고 가장 비슷한 도서의
+    클러스터를 반환합니다. 없으면 자기 ISBN(새 클러스터의 대표)을 반환합니다.
+    """
+    if book.toc_minhash is None:
+        return book.isbn
+    candidates = (
+        Book.objects
+        .filter(toc_lsh_bands__overlap=book.toc_lsh_bands, toc_minhash__isnull=False)
+        .exclude(pk=book.pk)
+        .values_list('isbn', 'toc_cluster', 'toc_minhash')[:settings.TOC_DUPLICATE_MAX_CANDIDATES]
+    )
+    best_cluster, best_similarity = book.isbn, settings.TOC_DUPLICATE_THRESHOLD
+    for isbn, cluster, signature in candidates:
+        similarity = estimate_jaccard(book.toc_minhash, signature)
+        if similarity >= best_similarity:
+            best_cluster, best_similarity = cluster or isbn, similarity
+    return best_cluster
+
+
+def _reusable_embeddings(book, titles):
+    """
+    같은 중복 클러스터의 다른 도서에서 이미 계산한 임베딩을 찾습니다. (텍스트가 완전히 같을 때만 재사용)
+    반환값: (요약 임베딩 또는 None, {챕터 제목: 임베딩})
+    """
+    if not book.toc_cluster:
+        return None, {}
+    others = Book.objects.with_embedding().filter(toc_cluster=book.toc_cluster).exclude(pk=book.pk)
+    summary_vector = None
+    if book.summary:
+        summary_vector = (
+            others.filter(summary=book.summary, summary_embedding__isnull=False)
+            .values_list('summary_embedding', flat=True).first()
+        )
+    title_vectors = {}
+    if titles:
+        title_vectors = dict(
+            Chapter.objects
+            .filter(book__in=others, title__in=titles, title_embedding__isnull=False)
+            .values_list('title', 'title_embedding')
+        )
+    return summary_vector, title_vectors
 
 
 # === 파이프라인 5 ===
 @shared_task
-def generate_embeddings_for_book(isbn13):
+def generate_embeddings_for_book(isbn13, run_id=None):
     """
     Book의 'summary'와 각 'Chapter'의 'title'에 대한 임베딩을 생성합니다.
     [최종 태스크]
     """
 
     # ▼▼▼ [핵심 수정] 방어 코드 추가 ▼▼▼
-    # 4번 태스크에서 실패 문자열을 넘겨받았는지 확인합니다.
+    # 4번 태스크가 실패/건너뜀(None)을 넘겼는지 확인합니다. (사유는 앞 태스크가 이미 기록)
     if not (isinstance(isbn13, str) and isbn13.isdigit() and len(isbn13) == 13):
-        return f"Skipped Embed: Received invalid result from TOC task '{str(isbn13)[:50]}...'"
+        progress.incr(run_id, books_finished=1)
+        return
     # ▲▲▲ [핵심 수정] ▲▲▲
 
     try:
-        book = Book.objects.get(isbn=isbn13)
+        book = Book.objects.with_embedding().only('id', 'isbn', 'summary', 'summary_embedding', 'toc_cluster').get(isbn=isbn13)
+
+        embed_summary = bool(book.summary) and book.summary_embedding is None
+        chapters_to_update = list(book.chapters.filter(title_embedding__isnull=True).only('id', 'title'))
 
-        # ... (기존 임베딩 생성 로직은 그대로) ...
-        if book.summary and not book.summary_embedding:
-            book.summary_embedding = get_embedding_vector(book.summary)
-            book.save()
+        # 같은 중복 클러스터(개정판/세트)에 같은 텍스트의 임베딩이 있으면 재사용하고,
+        # 나머지 중 서로 다른 텍스트만 한 번의 배치 요청으로 임베딩합니다.
+        summary_vector, known = None, {}
+        if embed_summary or chapters_to_update:
+            summary_vector, known = _reusable_embeddings(book, {chapter.title for chapter in chapters_to_update})
+        reused = (1 if embed_summary and summary_vector is not None else 0) + sum(
+            1 for chapter in chapters_to_update if chapter.title in known)
 
-        chapters_to_embed = book.chapters.filter(title_embedding__isnull=True)
-        chapters_to_update = []
+        texts = ([book.summary] if embed_summary and summary_vector is None else []) + [
+            chapter.title for chapter in chapters_to_update if chapter.title not in known]
+        pending = list(dict.fromkeys(texts))  # 한 책 안에서 반복되는 제목(예: '연습문제')도 한 번만 임베딩
+        known.update(zip(pending, encode_texts(pending)))
 
-        for chapter in chapters_to_embed:
-            chapter.title_embedding = get_embedding_vector(chapter.title)
-            chapters_to_update.append(chapter)
+        if embed_summary:
+            book.summary_embedding = summary_vector if summary_vector is not None else known[book.summary]
+            book.save(update_fields=['summary_embedding', 'updated_at'])
+
+        for chapter in chapters_to_update:
+            chapter.title_embedding = known[chapter.title]
 
         if chapters_to_update:
             Chapter.objects.bulk_update(chapters_to_update, ['title_embedding'])
 
-        return f"Successfully generated embeddings for {isbn13} (Book summary + {len(chapters_to_update)} chapters)."
+        # 검색 대상 임베딩이 바뀌었으므로 검색 결과 캐시 세대를 올립니다. (SEARCH_GENERATION_BUMP_INTERVAL초에 최대 한 번)
+        bump_search_cache_generation()
+        progress.incr(run_id, books_embedded=1, books_finished=1, embeddings_reused=reused)
+        progress.record_outcome(run_id, 'embedded', isbn13)
+        print(f"Successfully generated embeddings for {isbn13} (Book summary + {len(chapters_to_update)} chapters, "
+              f"{reused} reused from cluster {book.toc_cluster or '-'}).")
 
     except Book.DoesNotExist:
-        return f"Failed Embed: Book {isbn13} not found in DB."
+        progress.incr(run_id, books_finished=1)
+        progress.record_outcome(run_id, 'not_found', isbn13, 'Book not found in DB before embedding.')
     except Exception as e:
-        return f"Error generating embeddings for {isbn13}: {e}"
\ No newline at end of file
+        progress.incr(run_id, books_finished=1)
+        progress.record_outcome(run_id, 'embed_error', isbn13, e)
+
+
+# === 갱신 스케줄러 (Celery beat) ===
+@shared_task
+def refresh_stale_books():
+    """
+    오래된/바뀌었을 가능성이 높은 도서(목차 없음, 목차 파싱 실패, 최근 출간)를 골라 시간당 예산 안에서 다시 상세 조회합니다.
+    상세 조회 배치가 해시를 비교하여 내용이 바뀐 도서만 다시 파싱/임베딩합니다. (books/refresh.py 참고)
+    결과는 run 요약(books/progress.py)에 집계됩니다.
+    """
+    candidates, reasons = refresh.select_stale_books(settings.REFRESH_LOOKUPS_PER_HOUR)
+    granted = refresh.reserve_budget(len(candidates))
+    isbns = candidates[:granted]
+    if not isbns:
+        print(f"Refresh: nothing to do ({len(candidates)} candidates, budget granted {granted}).")
+        return
+
+    run_id = progress.new_run(categories_total=0, batches_total=0)
+    progress.incr(run_id, isbns_new=len(isbns))
+    batch_size = settings.INGEST_LOOKUP_BATCH_SIZE
+    group(
+        fetch_book_details_batch.s(isbns[i:i + batch_size], run_id=run_id)
+        for i in range(0, len(isbns), batch_size)
+    ).apply_async()
+    print(f"Refresh run {run_id}: queued {len(isbns)} lookups "
+          f"({', '.join(f'{reason} {count}' for reason, count in reasons.items())}; "
+          f"{len(candidates) - len(isbns)} deferred by budget).")
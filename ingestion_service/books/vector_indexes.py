@@ -0,0 +1,54 @@
+# books/vector_indexes.py
+import logging
+
+from django.conf import settings
+
+from .models import EMBEDDING_DIMENSIONS
+
+logger = logging.getLogger(__name__)
+
+# 임베딩 컬럼별 HNSW 인덱스. settings.SEARCH_VECTOR_PRECISION[키]에 맞는 인덱스 하나만 유지합니다.
+# - vector : float32 컬럼 그대로 (vector_cosine_ops)
+# - halfvec: halfvec(float16)으로 캐스팅한 표현식 인덱스 (halfvec_cosine_ops, 인덱스 크기/메모리 약 1/2)
+#   search._cosine_distance / _distance_sql이 같은 캐스팅 표현식으로 조회합니다.
+VECTOR_INDEXES = {
+    'book': ('books_book', {
+        'vector': ('book_summary_emb_hnsw', 'summary_embedding vector_cosine_ops'),
+        'halfvec': ('book_summary_emb_half_hnsw',
+                    f'(summary_embedding::halfvec({EMBEDDING_DIMENSIONS})) halfvec_cosine_ops'),
+    }),
+    'chapter': ('books_chapter', {
+        'vector': ('chapter_title_emb_hnsw', 'title_embedding vector_cosine_ops'),
+        'halfvec': ('chapter_title_emb_half_hnsw',
+                    f'(title_embedding::halfvec({EMBEDDING_DIMENSIONS})) halfvec_cosine_ops'),
+    }),
+}
+
+
+def sync_vector_indexes(connection, precisions=None):
+    """
+    테이블마다 설정된 정밀도의 HNSW 인덱스를 만들고 다른 정밀도의 인덱스는 제거합니다.
+    그래프를 두 벌 유지하지 않도록, 정밀도 설정(SEARCH_*_VECTOR_PRECISION)을 바꾼 뒤에는
+    `manage.py sync_vector_indexes`를 실행하세요.
+    CONCURRENTLY를 사용하므로 트랜잭션 밖(autocommit)에서 호출해야 합니다. 새 인덱스를 먼저 만든 뒤
+    이전 인덱스를 제거하므로, 전환 중에도 조회는 항상 인덱스 하나를 사용할 수 있습니다.
+    반환값: [(테이블, 유지한 인덱스, [제거한 인덱스, ...]), ...]
+    """
+    precisions = precisions or settings.SEARCH_VECTOR_PRECISION
+    results = []
+    with connection.cursor() as cursor:
+        for key, (table, indexes) in VECTOR_INDEXES.items():
+            precision = precisions[key]
+            if precision not in indexes:
+                raise ValueError(f"Unknown vector precision for {key}: {precision!r} (vector 또는 halfvec)")
+            index_name, index_expr = indexes[precision]
+            cursor.execute(
+                f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name} ON {table} '
+                f'USING hnsw ({index_expr}) WITH (m = 16, ef_construction = 64)'
+            )
+            dropped = [name for other, (name, _) in indexes.items() if other != precision]
+            for name in dropped:
+                cursor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
+            logger.info("HNSW index for %s: %s (%s), dropped %s", table, index_name, precision, dropped)
+            results.append((table, index_name, dropped))
+    return results
@@ -1,3 +1,75 @@
-from django.shortcuts import render
+import time
 
-# Create your views here.
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from . import search_cache
+from .embeddings import encode_query
+from .search import dump_ranked, load_ranked, run_search
+from .serializers import (
+    BookResultSerializer,
+    ChapterResultSerializer,
+    GroupedBookResultSerializer,
+    SearchQuerySerializer,
+)
+
+RESULT_SERIALIZERS = {
+    'books': BookResultSerializer,
+    'chapters': ChapterResultSerializer,
+    'grouped': GroupedBookResultSerializer,
+}
+
+
+class SearchAPIView(APIView):
+    """
+    GET /api/search/?q=파이썬 입문&target=chapters&mode=hybrid&k=10&publisher=...&published_from=2020-01-01&level=2
+
+    검색어를 한 번 임베딩한 뒤 Book.summary_embedding(target=books) 또는
+    Chapter.title_embedding(target=chapters)에 대해 top-k 벡터 유사도 검색을 수행합니다.
+    mode=hybrid(기본)이면 제목/저자/ISBN 어휘 검색 결과와 RRF로 합칩니다.
+    target=grouped이면 챕터 검색 결과를 책 단위로 묶어 상위 k권과 책별 상위 챕터(chapters_per_book)를 반환합니다.
+    (grouped는 벡터 검색만 지원하므로 mode를 생략하면 vector, mode=hybrid이면 400)
+    collapse_duplicates=true(기본)이면 목차가 거의 같은 개정판/세트 도서(Book.toc_cluster)의 결과를 하나로 접습니다.
+    검색어 임베딩과 (검색어, 필터, k) 결과 id는 Redis에 캐시됩니다. (search_cache 참고)
+    """
+    authentication_classes = []
+    permission_classes = []
+
+    def get(self, request):
+        params = SearchQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        query = params.validated_data
+
+        query['q'] = search_cache.normalize_query(query['q'])
+        started = time.perf_counter()
+
+        # 1. 결과 캐시 조회 (ETL 세대가 키에 포함되어 있어 재적재 후에는 자동으로 miss)
+        generation = search_cache.get_generation()
+        cache_key = search_cache.result_cache_key(generation, query) if generation is not None else None
+        cached_hits = search_cache.get_cached_results(cache_key) if cache_key else None
+
+        if cached_hits is not None:
+            embedded = time.perf_counter()
+            hits = load_ranked(query['target'], cached_hits)
+        else:
+            # 2. 검색어 임베딩 (캐시) -> 벡터/하이브리드 검색
+            query_vector = search_cache.get_or_encode_query(query['q'], encode_query)
+            embedded = time.perf_counter()
+            hits = run_search(query, query_vector)
+            if cache_key:
+                search_cache.set_cached_results(cache_key, dump_ranked(query['target'], hits))
+
+        results = RESULT_SERIALIZERS[query['target']](hits, many=True).data
+        finished = time.perf_counter()
+
+        return Response({
+            'query': query['q'],
+            'target': query['target'],
+            'count': len(results),
+            'cache': 'hit' if cached_hits is not None else 'miss',
+            'timings_ms': {
+                'embed': round((embedded - started) * 1000, 2),
+                'search': round((finished - embedded) * 1000, 2),
+            },
+            'results': results,
+        })
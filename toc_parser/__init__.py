@@ -0,0 +1,33 @@
+# toc_parser/__init__.py
+"""
+계층형 목차(TOC) 파서 공용 패키지.
+
+books.tasks.parse_toc_and_create_chapters(수집 시점)와 run_etl.py(ETL)가 함께 사용합니다.
+PARSER_VERSION은 규칙집 해시(RULES_VERSION)를 포함하므로 규칙을 수정하면 자동으로 바뀌고,
+저장된 Chapter 행과 ParseCache 항목이 재파싱 대상으로 인식됩니다.
+파싱 로직(parser.py) 자체를 바꿀 때는 PARSER_LOGIC_VERSION을 올리세요.
+"""
+from .cache import ParseCache
+from .minhash import DuplicateClusters, estimate_jaccard, toc_signature
+from .parser import TocNode, parse_book_toc, preprocess_line
+from .profiling import RulebookProfile
+from .rules import NOISE_PATTERNS, PATTERNS_RULEBOOK, FALLBACK_PATTERN, RULES_VERSION
+
+PARSER_LOGIC_VERSION = "2"
+PARSER_VERSION = f"{PARSER_LOGIC_VERSION}-{RULES_VERSION}"
+
+__all__ = (
+    'PARSER_VERSION',
+    'RULES_VERSION',
+    'ParseCache',
+    'DuplicateClusters',
+    'estimate_jaccard',
+    'toc_signature',
+    'RulebookProfile',
+    'TocNode',
+    'parse_book_toc',
+    'preprocess_line',
+    'NOISE_PATTERNS',
+    'PATTERNS_RULEBOOK',
+    'FALLBACK_PATTERN',
+)
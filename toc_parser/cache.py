@@ -0,0 +1,90 @@
+# toc_parser/cache.py
+import hashlib
+import json
+import logging
+import sqlite3
+
+from .parser import TocNode, parse_book_toc
+
+logger = logging.getLogger(__name__)
+
+
+def hash_raw_toc(raw_toc):
+    return hashlib.sha256(raw_toc.encode("utf-8")).hexdigest()
+
+
+class ParseCache:
+    """
+    (raw_toc의 sha256, 파서 버전)을 키로 parse_book_toc 결과를 저장하는 SQLite 캐시입니다.
+
+    파서 버전에는 규칙집 해시가 포함되어 있으므로, 규칙을 수정하면 기존 항목은 더 이상 조회되지 않고
+    prune()으로 정리됩니다. 같은 목차를 가진 다른 ISBN도 캐시를 공유합니다. (결과 노드의 isbn만 바꿔서 반환)
+    """
+
+    def __init__(self, path, parser_version):
+        self.path = path
+        self.parser_version = parser_version
+        self.hits = 0
+        self.misses = 0
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS parse_cache ("
+            " toc_sha TEXT NOT NULL,"
+            " parser_version TEXT NOT NULL,"
+            " nodes TEXT NOT NULL,"
+            " failures TEXT NOT NULL,"
+            " PRIMARY KEY (toc_sha, parser_version))"
+        )
+        self._conn.commit()
+
+    def get(self, raw_toc, isbn):
+        row = self._conn.execute(
+            "SELECT nodes, failures FROM parse_cache WHERE toc_sha = ? AND parser_version = ?",
+            (hash_raw_toc(raw_toc), self.parser_version),
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        nodes = [TocNode(isbn, level, number, title, source_line)
+                 for level, number, title, source_line in json.loads(row[0])]
+        failures = [{"isbn": isbn, "line_num": line_num, "line_content": line_content}
+                    for line_num, line_content in json.loads(row[1])]
+        return nodes, failures
+
+    def put(self, raw_toc, nodes, failures):
+        nodes_payload = json.dumps(
+            [(node.level, node.number, node.title, node.source_line) for node in nodes], ensure_ascii=False)
+        failures_payload = json.dumps(
+            [(item["line_num"], item["line_content"]) for item in failures], ensure_ascii=False)
+        self._conn.execute(
+            "INSERT OR REPLACE INTO parse_cache (toc_sha, parser_version, nodes, failures) VALUES (?, ?, ?, ?)",
+            (hash_raw_toc(raw_toc), self.parser_version, nodes_payload, failures_payload),
+        )
+
+    def parse(self, raw_toc, isbn):
+        """캐시에 있으면 저장된 결과를, 없으면 parse_book_toc을 실행하고 결과를 저장합니다."""
+        cached = self.get(raw_toc, isbn)
+        if cached is not None:
+            return cached
+        nodes, failures = parse_book_toc(raw_toc, isbn)
+        self.put(raw_toc, nodes, failures)
+        return nodes, failures
+
+    def prune(self):
+        """현재 파서 버전이 아닌(규칙이 바뀌기 전의) 항목을 삭제합니다."""
+        deleted = self._conn.execute(
+            "DELETE FROM parse_cache WHERE parser_version != ?", (self.parser_version,)
+        ).rowcount
+        self._conn.commit()
+        if deleted:
+            logger.info("Pruned %d parse cache entries from older rulebook versions.", deleted)
+        return deleted
+
+    def commit(self):
+        self._conn.commit()
+
+    def close(self):
+        self._conn.commit()
+        self._conn.close()
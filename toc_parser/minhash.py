@@ -0,0 +1,123 @@
+# toc_parser/minhash.py
+"""
+전처리된 목차 라인에 대한 MinHash 시그니처와 LSH 밴드 키.
+
+개정판/전면개정판/세트 도서는 목차가 거의 같으므로, 시그니처의 밴드 키가 하나라도 겹치는 도서를 후보로 찾고
+추정 Jaccard 유사도가 임계값 이상이면 같은 중복 클러스터로 묶습니다.
+순열 계수는 고정 시드로 만들므로 프로세스/머신이 달라도 같은 목차는 같은 시그니처를 가집니다.
+"""
+import hashlib
+import random
+import re
+
+NUM_PERM = 64
+NUM_BANDS = 16  # 밴드당 4행: 추정 유사도 0.8에서 후보로 잡힐 확률 약 0.999, 0.5에서 약 0.64
+DEFAULT_THRESHOLD = 0.8
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(0x70C5)
+_PERMUTATIONS = tuple(
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME)) for _ in range(NUM_PERM)
+)
+
+# 개정판은 장 번호/연도만 바뀌는 경우가 많으므로 숫자와 구두점/공백을 지운 라인을 비교합니다.
+_NORMALIZE_PATTERN = re.compile(r'[\d\W_]+')
+
+
+def toc_shingles(lines):
+    """전처리된 목차 라인 목록을 정규화된 라인 집합(슁글)으로 바꿉니다. 정규화 후 빈 라인은 제외합니다."""
+    shingles = set()
+    for line in lines:
+        normalized = _NORMALIZE_PATTERN.sub('', line).casefold()
+        if normalized:
+            shingles.add(normalized)
+    return shingles
+
+
+def _shingle_hash(shingle):
+    return int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def minhash_signature(shingles):
+    """
+    슁글 집합의 MinHash 시그니처(NUM_PERM개의 정수, 모두 2^61 미만)를 반환합니다.
+    슁글이 없으면 None을 반환합니다. (빈 목차끼리 중복으로 묶이지 않도록)
+    """
+    if not shingles:
+        return None
+    hashes = [_shingle_hash(shingle) for shingle in shingles]
+    return [
+        min((a * h + b) % _MERSENNE_PRIME for h in hashes)
+        for a, b in _PERMUTATIONS
+    ]
+
+
+def lsh_bands(signature):
+    """
+    시그니처를 NUM_BANDS개의 밴드로 나눈 밴드 키 목록. 키 앞 두 자리는 밴드 번호이므로
+    서로 다른 밴드의 값이 우연히 같아도 충돌하지 않습니다.
+    """
+    rows = NUM_PERM // NUM_BANDS
+    keys = []
+    for band in range(NUM_BANDS):
+        chunk = ','.join(str(value) for value in signature[band * rows:(band + 1) * rows])
+        keys.append(f"{band:02d}{hashlib.blake2b(chunk.encode('ascii'), digest_size=6).hexdigest()}")
+    return keys
+
+
+def estimate_jaccard(signature_a, signature_b):
+    """두 시그니처에서 같은 위치의 값이 일치하는 비율(= Jaccard 유사도 추정치)."""
+    return sum(1 for a, b in zip(signature_a, signature_b) if a == b) / NUM_PERM
+
+
+def toc_signature(lines):
+    """전처리된 목차 라인 -> (시그니처, 밴드 키). 비교할 라인이 없으면 (None, [])."""
+    signature = minhash_signature(toc_shingles(lines))
+    if signature is None:
+        return None, []
+    return signature, lsh_bands(signature)
+
+
+class DuplicateClusters:
+    """
+    메모리 안에서 도서들을 중복 클러스터로 묶습니다. (ETL처럼 여러 권을 한 번에 처리할 때 사용)
+    같은 밴드 버킷에 들어간 도서 쌍 중 추정 유사도가 threshold 이상인 것만 union-find로 합칩니다.
+    클러스터 ID는 먼저 추가된 도서의 키입니다.
+    """
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self._signatures = {}
+        self._buckets = {}
+        self._parent = {}
+        self._order = {}
+
+    def _find(self, key):
+        while self._parent[key] != key:
+            self._parent[key] = self._parent[self._parent[key]]
+            key = self._parent[key]
+        return key
+
+    def add(self, key, signature, bands=None):
+        if key not in self._parent:
+            self._parent[key] = key
+            self._order[key] = len(self._order)
+        if signature is None:
+            return
+        self._signatures[key] = signature
+        for band_key in bands or lsh_bands(signature):
+            bucket = self._buckets.setdefault(band_key, [])
+            for other in bucket:
+                root, other_root = self._find(key), self._find(other)
+                if root != other_root and estimate_jaccard(signature, self._signatures[other]) >= self.threshold:
+                    # 먼저 추가된 도서가 대표가 되도록 나중에 추가된 쪽의 루트를 붙입니다.
+                    first, later = sorted((root, other_root), key=self._order.__getitem__)
+                    self._parent[later] = first
+            bucket.append(key)
+
+    def cluster_of(self, key):
+        return self._find(key)
+
+    def clusters(self):
+        """{key: 클러스터 ID}"""
+        return {key: self._find(key) for key in self._parent}
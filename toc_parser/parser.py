@@ -0,0 +1,155 @@
+# toc_parser/parser.py
+import logging
+
+from .rules import (
+    NOISE_PATTERNS,
+    PATTERNS_RULEBOOK,
+    FALLBACK_PATTERN,
+    HTML_TAG_PATTERN,
+    LEADING_SYMBOL_PATTERN,
+    PAGE_NUMBER_PATTERN,
+    PAGE_ONLY_PATTERN,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def preprocess_line(line, profile=None):
+    """
+    보고서 섹션 1에 따라 단일 라인을 전처리합니다.
+    profile(RulebookProfile)이 주어지면 노이즈 패턴별 시간/매칭 수를 기록합니다.
+    """
+    # 1. HTML 태그 제거
+    line = HTML_TAG_PATTERN.sub('', line)
+
+    # 1.5. (★ 추가) 선행 특수 문자( _, ■, •, ㆍ 등) 제거 (로그에서 발견된 문제)
+    line = LEADING_SYMBOL_PATTERN.sub('', line).strip()
+
+    # 2. 페이지 번호 제거 (예: ... 123 또는 27)
+    # (★ 수정: ... 점이 없거나 공백이 하나만 있는 경우도 제거)
+    line = PAGE_NUMBER_PATTERN.sub('', line).strip()
+
+    # 3. 라인 자체가 페이지 번호인 경우 (가끔 발생)
+    if PAGE_ONLY_PATTERN.fullmatch(line):
+        return None
+
+    # 4. 공백 정규화
+    line = ' '.join(line.split())
+
+    # 5. 빈 라인 제거
+    if not line:
+        return None
+
+    # 6. 노이즈 필터링 (★ 업데이트된 패턴 리스트 사용)
+    for pattern in (NOISE_PATTERNS if profile is None else profile.noise_patterns):
+        if pattern.search(line):
+            logger.debug("Filtered noise line: %s", line)
+            return None
+
+    return line
+
+
+class TocNode:
+    """
+    파싱된 목차 노드 하나. (__slots__로 dict 대비 메모리/속성 접근 비용을 줄입니다)
+    스택과 결과 리스트가 같은 객체를 참조하므로, 부제/연속 라인은 스택 top의 title만 고치면 됩니다.
+    """
+    __slots__ = ("isbn", "level", "number", "title", "source_line")
+
+    def __init__(self, isbn, level, number, title, source_line):
+        self.isbn = isbn
+        self.level = level
+        self.number = number
+        self.title = title
+        self.source_line = source_line
+
+    def as_tuple(self):
+        return (self.isbn, self.level, self.number, self.title, self.source_line)
+
+    def __repr__(self):
+        return f"TocNode(isbn={self.isbn!r}, level={self.level}, number={self.number!r}, title={self.title!r})"
+
+
+def parse_book_toc(raw_toc, isbn, profile=None, lines_out=None):
+    """
+    보고서 섹션 2.3의 '상태 기반 파서' 구현.
+    책 한 권의 전체 raw_toc를 받아 계층 구조를 파싱합니다.
+    (★ AttributeError: 'NoneType' 수정 포함)
+
+    반환값: (TocNode 리스트, 실패 라인 dict 리스트). 라인 수에 대해 선형 시간입니다.
+    profile(RulebookProfile)이 주어지면 규칙/노이즈/Fallback 패턴별 시간과 매칭 수를 기록합니다.
+    lines_out(list)이 주어지면 전처리를 통과한 라인을 순서대로 추가합니다. (중복 판별용 MinHash 입력, minhash.py)
+    """
+    lines = raw_toc.splitlines()
+    rulebook = PATTERNS_RULEBOOK if profile is None else profile.rulebook
+    fallback_pattern = FALLBACK_PATTERN if profile is None else profile.fallback
+    if profile is not None:
+        profile.books += 1
+        profile.lines += len(lines)
+
+    root_node = TocNode(isbn, 0, "0", "BOOK_ROOT", 0)
+    stack = [root_node]
+
+    parsed_nodes = []
+    failed_lines = []
+
+    for i, raw_line in enumerate(lines):
+        line_num = i + 1
+        line = preprocess_line(raw_line, profile)
+
+        if not line:  # 전처리 결과 빈 라인이거나 노이즈
+            continue
+        if lines_out is not None:
+            lines_out.append(line)
+
+        matched = False
+        # 1. (보고서 섹션 2.2) 규칙집 순회 (★ 업데이트된 규칙집 사용)
+        for (level, pattern) in rulebook:
+            match = pattern.match(line)
+            if match:
+                data = match.groupdict()
+
+                # --- (★ 수정된 부분: NoneType 오류 방지) ---
+                new_node = TocNode(
+                    isbn,
+                    level,
+                    (data.get("number") or "").strip(),
+                    (data.get("title") or "").strip(),
+                    line_num,
+                )
+                # --- (수정 끝) ---
+
+                while stack[-1].level >= level:
+                    stack.pop()
+
+                stack.append(new_node)
+                parsed_nodes.append(new_node)
+                matched = True
+                break
+
+        if not matched:
+            # 3. (보고서 ) Fallback: 부제/연속 라인 처리
+            match = fallback_pattern.match(line)
+            if match:
+                current_node = stack[-1]
+                if current_node.level > 0:
+                    subtitle = match.group('title').strip()
+                    if not current_node.title:
+                        current_node.title = subtitle
+                    else:
+                        current_node.title += f" : {subtitle}"
+                    matched = True
+
+        if not matched:
+            if profile is not None:
+                profile.unmatched += 1
+            logger.warning("Unmatched line for ISBN %s (Line %d): %s", isbn, line_num, line)
+            failed_lines.append({
+                "isbn": isbn,
+                "line_num": line_num,
+                "line_content": line
+            })
+
+    return parsed_nodes, failed_lines
+
+
@@ -0,0 +1,157 @@
+# toc_parser/profiling.py
+"""
+규칙집 프로파일링 (opt-in).
+
+RulebookProfile을 parse_book_toc(..., profile=profile)에 넘기면 NOISE_PATTERNS / PATTERNS_RULEBOOK /
+FALLBACK_PATTERN 대신 같은 정규식을 감싼 ProfiledPattern을 사용하여 패턴별 호출 수, 매칭 수, 누적/최대 시간을 기록합니다.
+profile을 넘기지 않으면 파서는 원래 정규식을 그대로 사용하므로 평소 비용은 없습니다.
+
+report()는 누적 시간 순 패턴 표, 레벨별 합계와 함께 다음을 표시합니다.
+- dead       : 한 번도 매칭되지 않은 패턴 (앞선 패턴에 가려졌거나 더 이상 나오지 않는 형식)
+- slow       : 가장 오래 걸린 라인을 다시 실행해도 slow_call_ms 이상 걸리는 패턴 (백트래킹 의심, 해당 라인을 함께 표시)
+               GC/스케줄링으로 한 번 튄 값은 재실행에서 걸러집니다.
+- expensive  : 호출당 평균 시간이 전체 패턴 중앙값의 expensive_factor배 이상인 패턴
+"""
+import statistics
+import time
+
+from .rules import FALLBACK_PATTERN, NOISE_PATTERNS, PATTERNS_RULEBOOK
+
+
+class ProfiledPattern:
+    """컴파일된 정규식을 감싸 match/search 호출마다 시간과 결과를 기록합니다."""
+    __slots__ = ("name", "level", "pattern", "calls", "hits", "total_ns", "max_ns", "max_line", "method")
+
+    def __init__(self, name, level, pattern):
+        self.name = name
+        self.level = level
+        self.pattern = pattern
+        self.calls = 0
+        self.hits = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.max_line = None
+        self.method = None
+
+    def _timed(self, method, line):
+        start = time.perf_counter_ns()
+        result = method(line)
+        elapsed = time.perf_counter_ns() - start
+        self.calls += 1
+        self.total_ns += elapsed
+        if result is not None:
+            self.hits += 1
+        if elapsed > self.max_ns:
+            self.max_ns = elapsed
+            self.max_line = line
+            self.method = method
+        return result
+
+    def match(self, line):
+        return self._timed(self.pattern.match, line)
+
+    def search(self, line):
+        return self._timed(self.pattern.search, line)
+
+    @property
+    def avg_ns(self):
+        return self.total_ns / self.calls if self.calls else 0.0
+
+    def retime_worst(self, repeat=3):
+        """가장 오래 걸린 라인을 repeat번 다시 실행한 최소 시간(ns). (통계에는 반영하지 않습니다)"""
+        if self.method is None:
+            return 0
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter_ns()
+            self.method(self.max_line)
+            elapsed = time.perf_counter_ns() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+
+class RulebookProfile:
+    """
+    여러 책에 걸친 규칙집 누적 통계. 파싱 한 번(run_parsing_pipeline 한 번) 동안 같은 인스턴스를 재사용합니다.
+    """
+
+    def __init__(self, slow_call_ms=1.0, expensive_factor=10.0):
+        self.slow_call_ns = int(slow_call_ms * 1e6)
+        self.expensive_factor = expensive_factor
+        self.noise_patterns = [
+            ProfiledPattern(f"noise[{i}]", None, pattern) for i, pattern in enumerate(NOISE_PATTERNS)
+        ]
+        self.rulebook = [
+            (level, ProfiledPattern(f"rule[{i}]", level, pattern))
+            for i, (level, pattern) in enumerate(PATTERNS_RULEBOOK)
+        ]
+        self.fallback = ProfiledPattern("fallback", None, FALLBACK_PATTERN)
+        self.lines = 0
+        self.books = 0
+        self.unmatched = 0
+
+    @property
+    def patterns(self):
+        return [*self.noise_patterns, *(p for _, p in self.rulebook), self.fallback]
+
+    def level_totals(self):
+        """레벨별 (매칭 수, 누적 시간 ns). 레벨은 규칙집 패턴의 레벨입니다."""
+        totals = {}
+        for level, p in self.rulebook:
+            hits, total_ns = totals.get(level, (0, 0))
+            totals[level] = (hits + p.hits, total_ns + p.total_ns)
+        return dict(sorted(totals.items()))
+
+    def dead_patterns(self):
+        if not self.lines:
+            return []
+        return [p for p in self.patterns if p.calls and not p.hits]
+
+    def slow_patterns(self):
+        """[(패턴, 재실행 시간 ns)]"""
+        slow = []
+        for p in self.patterns:
+            if p.max_ns >= self.slow_call_ns:
+                retimed_ns = p.retime_worst()
+                if retimed_ns >= self.slow_call_ns:
+                    slow.append((p, retimed_ns))
+        return slow
+
+    def expensive_patterns(self):
+        averages = [p.avg_ns for p in self.patterns if p.calls]
+        if not averages:
+            return []
+        threshold = statistics.median(averages) * self.expensive_factor
+        return [p for p in self.patterns if p.calls and p.avg_ns >= threshold]
+
+    def report(self, top=15):
+        """사람이 읽는 텍스트 보고서."""
+        patterns = sorted(self.patterns, key=lambda p: p.total_ns, reverse=True)
+        total_ns = sum(p.total_ns for p in patterns) or 1
+        out = [
+            f"Rulebook profile: {self.books} books, {self.lines} lines, {self.unmatched} unmatched, "
+            f"{total_ns / 1e6:.1f} ms in regex matching",
+            f"{'pattern':<11} {'level':>5} {'calls':>9} {'hits':>8} {'total ms':>9} {'share':>6} "
+            f"{'avg us':>7} {'max us':>8}  regex",
+        ]
+        for p in patterns[:top]:
+            out.append(
+                f"{p.name:<11} {p.level if p.level is not None else '-':>5} {p.calls:>9} {p.hits:>8} "
+                f"{p.total_ns / 1e6:>9.2f} {p.total_ns / total_ns:>6.1%} {p.avg_ns / 1e3:>7.2f} "
+                f"{p.max_ns / 1e3:>8.1f}  {p.pattern.pattern[:60]}"
+            )
+
+        out.append("Per level: " + ", ".join(
+            f"L{level} {hits} hits / {level_ns / 1e6:.1f} ms" for level, (hits, level_ns) in self.level_totals().items()
+        ))
+
+        dead = self.dead_patterns()
+        if dead:
+            out.append(f"Dead patterns (never matched): {', '.join(p.name for p in dead)}")
+        for p, retimed_ns in self.slow_patterns():
+            out.append(f"Slow pattern {p.name}: {retimed_ns / 1e6:.2f} ms on {p.max_line!r} (possible backtracking)")
+        expensive = self.expensive_patterns()
+        if expensive:
+            out.append(f"Expensive patterns (avg >= {self.expensive_factor:g}x median): "
+                       + ", ".join(f"{p.name} ({p.avg_ns / 1e3:.1f} us)" for p in expensive))
+        return "\n".join(out)
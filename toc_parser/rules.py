@@ -0,0 +1,130 @@
+# toc_parser/rules.py
+"""
+목차 파서 규칙 모음 (노이즈 필터 + 계층 규칙집 + Fallback).
+ingestion_service(Celery)와 dataengineering_service(ETL)가 같은 규칙을 사용합니다.
+"""
+import hashlib
+import re
+
+# --- 1. 보고서 섹션 1: 전처리 및 노이즈 필터링 ---
+NOISE_PATTERNS = [
+    # (★ 수정: 기존의 포괄적인 첫 번째 규칙을 더 세분화하고, 새로운 패턴을 대거 추가)
+    re.compile(
+        r'^\s*(옮긴이 머리말|베타리더|감수의 글|감사의 글|지은이의 말|옮긴이의 말|저자 소개|역자 서문|책머리에|이 책에 대하여|찾아보기|목차|Contents|서문|들어가며|추천사|머리말|서언|발간사|프롤로그|Prologue|맺는 말|에필로그|부록|감사의 말|참고 문헌|연보|해설|주석|편집자의 말|추천의 글|지은이의 글|저자 서문|역자의 말|작품 해설|작가 연보|지은이 소개|옮긴이 소개|지은이 머리말)',
+        re.IGNORECASE),
+    re.compile(r'^(Exercise|연습문제|이것만은 알고 갑시다)', re.IGNORECASE),
+    re.compile(r'^[\s·ㆍ]*(연습문제|요약|핵심정리|확인 문제)[\s·ㆍ]*$', re.IGNORECASE),  # ㆍ 연습문제
+    # --- (★ 추가된 노이즈 패턴 - 2025-10-22) ---
+    re.compile(r'^\s*([0-9]+판|한국어판|개정판)\s*(서문|머리말|을 내며)', re.IGNORECASE),  # 3판 서문, 한국어판 서문, 개정판을 내며
+    re.compile(
+        r'^\s*(To (Everyone|Educators|Students)|Acknowledgments|Final Words|References|Introduction|PREFACE|Summary|Index|Glossary)',
+        re.IGNORECASE),  # English noise
+    re.compile(
+        r'^\s*(이 책을 (보는|읽는) (방법|법)|이 책의 (사용|활용)법|이 책의 (사용|목적|구성|특징)|시작하기 전에|주의|저작권 안내|상세 변경 이력|학습 (방법|가이드|로드맵|지원 안내)|강의 (계획|보조 자료)|일러두기|등장인물|용어 (설명|해설|대역표)|(지은이|옮긴이|감수자|기술 감수자|저자|역자|작가|베타리더|리뷰어|편집자).*(소개|의 글|주|서문|후기|머리말|대담|인터뷰|추천사)|표지에 대하여|해제|발문|서론|서설|개요|도입|시작하며|들어가기 전에|글을 (열며|시작하며|내면서)|책을 (내면서|펴내며|시작하며|머리에)|여는 글|책 머리에|숲과 나무 이야기)',
+        re.IGNORECASE),  # 각종 한국어 머리말/꼬리말
+    re.compile(r'^\s*\[.*\]\s*$'),  # [7가지 키워드...], [시험지] 등 대괄호로만 묶인 라인
+    re.compile(r'^\s*\[(문제|칼럼|실습|Do it!|LAB|응용 예제|프로젝트)'),  # [문제]_01, [칼럼] ...
+    re.compile(r'^(OMR 답안지|// 나눗셈 연산자|논\.설\.해\.변\.책|서\.발)'),  # Added 서.발
+    re.compile(r'^={2,}.*={2,}$'),  # ==== 1권 ====
+    re.compile(r'^(부록)\s+[A-Z]\.?'),  # 부록 A.
+    re.compile(r'^\s*<표.*>.*$'),  # <표1-1>
+    re.compile(r'^\s*<그림.*>.*$'),  # <그림1-1>
+    re.compile(r'^#\s*예제\d+'),  # # 예제82
+    re.compile(r'^DAY\s*\d+'),  # DAY 01
+    re.compile(r'^\d+화\s+'),  # 1화
+    re.compile(r'^\s*\|.*\|\s*$'),  # | 참고문헌 |
+    re.compile(r'^\s*\[붙임 \d+\]'),  # [붙임 1]
+    re.compile(r'^\s*(￭|●|◎|::|\+\+|◇)\s*(연습|프로그래밍|퀴즈)'),  # ￭연습문제 등
+    re.compile(r'^\s*Step\d+'),  # Step1
+    re.compile(r'^\s*WEEK'),  # WEEK 00
+    re.compile(r'^\s*&lt;.*&gt;'),  # &lt;1부&gt;
+    re.compile(r'^\s*#\d+'),  # #11 JShell
+    # --- (★ 추가된 노이즈 패턴 - 2025-10-22) ---
+    re.compile(r'^\s*Value Chain.*BSC.*$', re.IGNORECASE),  # 요약 라인
+    re.compile(r'^\s*[A-Z][가-힣]+ / [A-Z][가-힣]+.*$', re.IGNORECASE),  # A개요 / B경영전략...
+    re.compile(r'^\s*\(전면개정판\)\s*핵심 정보통신기술 총서.*$', re.IGNORECASE),
+    re.compile(r'^\s*이 책에서 소개하는 차트.*$', re.IGNORECASE),
+    re.compile(r'^\s*이순신론 / 이민수'),  # 사용자 요청
+    re.compile(r'^\s*최신 AI 랭킹 사이트.*$', re.IGNORECASE),
+    re.compile(r'^\s*전문 용어 잠깐 알아보기', re.IGNORECASE),
+    re.compile(r'^\s*생성형 AI 도구 100선 요약표', re.IGNORECASE),
+    re.compile(r'^\s*리포트 : AI 도구 100선.*$', re.IGNORECASE),
+    re.compile(r'^\s*(이 책은 데이터베이스를 처음 공부하는|모바일 웹에 빠져 보세요|통계학에 임하는 여러분의 두뇌).*$'),  # 책 소개
+    re.compile(r'^\s*(Part|PART|LC|RC)\s*$', re.IGNORECASE),  # "Part"
+    re.compile(r'^\s*(LC|RC).*(Part|기초|학습)', re.IGNORECASE),  # "RC 기초학습Part"
+]
+
+# --- 2. 보고서 섹션 2.2: 계층적 패턴 규칙집 ---
+PATTERNS_RULEBOOK = [
+    # (Level, Regex) - (보고서 '표 1' 기반)
+    # (★ 수정: 2025-10-22 - 새로운 Level 1 패턴 추가 및 기존 패턴 수정)
+    # Level 1: Part / 부 / Ⅰ / 권 / 마당
+    (1, re.compile(r"^\s*권\s*(?P<number>\d+)\s*(?P<title>.*)")),  # 권1
+    (1, re.compile(r"^\s*제\s*(?P<number>\d+)\s*부:?\s*(?P<title>.*)")),  # 제1부
+    (1, re.compile(r"^\s*(?P<number>\d+)\s*부\.?\s*(?P<title>.*)")),  # 1부.
+    (1, re.compile(r"^\s*\[\s*(?:PART|Part)\s*(?P<number>\d+)\s*\]\s*(?P<title>.*)", re.IGNORECASE)),  # [PART 1]
+    (1, re.compile(r"^\s*(?:Part|PART|부)\s*(?P<number>[IVX\d]+)\.?\s+(?P<title>.*)", re.IGNORECASE)),
+    # Part 1, Part1, 부 I
+    (1, re.compile(r"^\s*첫째마당\s*\|?\s*(?P<title>.*)")),  # 첫째마당 | ...
+    (1, re.compile(r"^\s*(?P<number>[ⅠⅡⅢⅣⅤⅥⅦⅧⅨⅩⅪⅫIVX]+)\s*\.?\s+(?P<title>.*)")),  # Ⅰ. ... (★ IVX 추가)
+    (1, re.compile(r"^\s*[A-Z]\s+(?P<title>\S.*)")),  # A 기업정보시스템 (★ \S.*로 수정)
+    (1, re.compile(r"^\s*(?:Section|STAGE|Lesson|레슨)\s+(?P<number>\d+)\s*:?\s*(?P<title>.*)", re.IGNORECASE)),
+    # Section 1, Lesson 01, 레슨 1 (★ title 캡처 추가)
+
+    # Level 2: Chapter / 장 / 1.
+    # (★ 수정: 2025-10-22 - '장' 뒤 공백(\s*) 및 '.' 뒤 공백(\s*) 처리)
+    (2, re.compile(r"^\s*(?:Chapter|CHAPTER|Chpater)\s*(?P<number>\d+)\.?\s*(?P<title>.*)", re.IGNORECASE)),
+    # Chapter 1, Chpater 1
+    (2, re.compile(r"^\s*▣\s*(?P<number>\d+)\s*장:?\s*(?P<title>.*)")),  # ▣ 01장:
+    (2, re.compile(r"^\s*\(\s*(?P<number>\d+)\s*장\s*\):?\s*(?P<title>.*)")),  # (1장)
+    (2, re.compile(r"^\s*(?P<number>\d+)\s*장\.?:?\s*(?P<title>.*)")),  # 6장, 01장., 1장. (★ \s+ -> \s*)
+    (2, re.compile(r"^\s*제\s*(?P<number>\d+)\s*장\.?:?\s*(?P<title>.*)")),  # 제1장, 제1장. (★ \s+ -> \s*)
+    (2, re.compile(r"^\s*(?P<number>\d+)\.\s*(?P<title>[^.\d].*)")),  # 1. 운영체제의 개요 (★ \s+ -> \s*)
+    (2, re.compile(r"^\s*①|②|③|④|⑤|⑥|⑦|⑧|⑨|⑩|⑪|⑫\s+(?P<title>.*)")),  # ① 기초통계이론
+    (2, re.compile(r"^\s*(?P<number>\d+)\s*장\.?\s*(?P<title>)$")),  # "1장." (제목이 다음 줄에 오는 경우)
+
+    # Level 3: Section / 절 / [001]
+    (3, re.compile(r"^\s*(?P<number>\d+)\s*절\.?\s*(?P<title>.*)")),  # 1절 (★ \s+ -> \s*)
+    (3, re.compile(r"^\s*\[(?P<number>\d+)\]\s+(?P<title>.*)")),  # [001]
+    (3, re.compile(r"^\s*제\s*(?P<number>\d+)\s*회:?\s+(?P<title>.*)")),  # 제1회
+    (3, re.compile(r"^\s*(?P<number>\d+)\s+(?P<title>[a-zA-Z_가-힣].*)")),  # 3) ... (Level 4보다 낮은 우선순위)
+
+    # Level 4: 1.2.1 / 1.2 / 1-1 / 1.1.1.
+    (4, re.compile(r"^\s*(?P<number>\d+\.\d+\.\d+\.\d+)\.?\s+(?P<title>.*)")),  # 1.1.1.1
+    (4, re.compile(r"^\s*(?P<number>\d+\.\d+\.\d+)\.?\s+(?P<title>.*)")),  # 1.1.1
+    (4, re.compile(r"^\s*(?P<number>\d+\.\d+)\.?\s+(?P<title>.*)")),  # 1.1
+    (4, re.compile(r"^\s*(?P<number>[\d\w]+-[\d\w]+)\s*:?\s+(?P<title>.*)")),  # 04-4, 1-1, 1-연초재배
+
+    # Level 5: 1) / (1) / (a)
+    (5, re.compile(r"^\s*\d+\)\s+(?P<title>.*)")),  # 1)
+    (6, re.compile(r"^\s*\(\d+\)\s+(?P<title>.*)")),  # (1)
+    (7, re.compile(r"^\s*\([a-zA-Z]\)\s+(?P<title>.*)")),  # (a)
+]
+
+# --- 3. 보고서 섹션 2.3: Fallback 패턴 ---
+FALLBACK_PATTERN = re.compile(r"^\s*(?P<title>\S.*)")
+
+# --- 전처리용 정규식 (라인마다 재컴파일/캐시 조회하지 않도록 미리 컴파일) ---
+HTML_TAG_PATTERN = re.compile(r'<[^>]+>')
+LEADING_SYMBOL_PATTERN = re.compile(r'^[\s_\-■•ㆍ]+')
+PAGE_NUMBER_PATTERN = re.compile(r'([\s.]{2,}|[ \t]+)(([0-9xvi]+)|(\d{1,3}(?:,\d{3})*))(\s*</?b>)?$', re.IGNORECASE)
+PAGE_ONLY_PATTERN = re.compile(r'([0-9xvi]+)', re.IGNORECASE)
+
+
+def compute_rules_version():
+    """
+    NOISE_PATTERNS + PATTERNS_RULEBOOK + FALLBACK_PATTERN(+ 전처리 정규식)의 패턴 문자열/플래그/레벨로 만든 해시.
+    규칙을 추가하거나 수정하면 값이 바뀌므로, 이 값을 키로 쓰는 캐시/저장 결과가 자동으로 무효화됩니다.
+    """
+    h = hashlib.sha256()
+    for pattern in NOISE_PATTERNS:
+        h.update(f"noise\x1f{pattern.pattern}\x1f{pattern.flags}\x1e".encode("utf-8"))
+    for level, pattern in PATTERNS_RULEBOOK:
+        h.update(f"rule\x1f{level}\x1f{pattern.pattern}\x1f{pattern.flags}\x1e".encode("utf-8"))
+    for pattern in (FALLBACK_PATTERN, HTML_TAG_PATTERN, LEADING_SYMBOL_PATTERN, PAGE_NUMBER_PATTERN,
+                    PAGE_ONLY_PATTERN):
+        h.update(f"aux\x1f{pattern.pattern}\x1f{pattern.flags}\x1e".encode("utf-8"))
+    return h.hexdigest()[:16]
+
+
+RULES_VERSION = compute_rules_version()
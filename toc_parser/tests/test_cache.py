@@ -0,0 +1,84 @@
+# toc_parser/tests/test_cache.py
+import sqlite3
+
+import pytest
+
+from toc_parser import PARSER_VERSION, ParseCache, parse_book_toc
+
+# 첫 라인은 앞선 노드가 없어 실패 라인으로 남습니다. (실패 라인도 캐시되는지 확인)
+RAW_TOC = "(부록)\n1장 시작하며 ... 1\n1.1 배경\n규칙에 걸리지 않는 부제\n2장 마치며 ... 20"
+
+
+def _as_tuples(nodes):
+    return [node.as_tuple() for node in nodes]
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "parse_cache.sqlite3")
+
+
+def test_miss_then_hit_returns_same_result_as_parser(cache_path):
+    cache = ParseCache(cache_path, PARSER_VERSION)
+    expected_nodes, expected_failures = parse_book_toc(RAW_TOC, "9780000000001")
+
+    nodes, failures = cache.parse(RAW_TOC, "9780000000001")
+    assert (cache.hits, cache.misses) == (0, 1)
+
+    cached_nodes, cached_failures = cache.parse(RAW_TOC, "9780000000001")
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert _as_tuples(nodes) == _as_tuples(cached_nodes) == _as_tuples(expected_nodes)
+    assert failures == cached_failures == expected_failures
+    assert expected_failures
+    cache.close()
+
+
+def test_same_toc_for_another_isbn_is_a_hit_with_that_isbn(cache_path):
+    cache = ParseCache(cache_path, PARSER_VERSION)
+    cache.parse(RAW_TOC, "9780000000001")
+
+    nodes, failures = cache.parse(RAW_TOC, "9780000000002")
+
+    assert cache.hits == 1
+    assert {node.isbn for node in nodes} == {"9780000000002"}
+    assert {item["isbn"] for item in failures} == {"9780000000002"}
+    cache.close()
+
+
+def test_entries_persist_across_instances_after_commit(cache_path):
+    cache = ParseCache(cache_path, PARSER_VERSION)
+    cache.parse(RAW_TOC, "9780000000001")
+    cache.close()
+
+    reopened = ParseCache(cache_path, PARSER_VERSION)
+    assert reopened.get(RAW_TOC, "9780000000001") is not None
+    assert reopened.get(RAW_TOC + "\n3장 추가", "9780000000001") is None
+    assert (reopened.hits, reopened.misses) == (1, 1)
+    reopened.close()
+
+
+def test_parser_version_change_invalidates_entries(cache_path):
+    old = ParseCache(cache_path, "old-version")
+    old.parse(RAW_TOC, "9780000000001")
+    old.close()
+
+    current = ParseCache(cache_path, PARSER_VERSION)
+    assert current.get(RAW_TOC, "9780000000001") is None
+    assert current.misses == 1
+    current.close()
+
+
+def test_prune_removes_only_older_version_rows(cache_path):
+    old = ParseCache(cache_path, "old-version")
+    old.parse(RAW_TOC, "9780000000001")
+    old.parse("1장 다른 목차", "9780000000002")
+    old.close()
+    current = ParseCache(cache_path, PARSER_VERSION)
+    current.parse(RAW_TOC, "9780000000001")
+
+    assert current.prune() == 2
+
+    current.close()
+    with sqlite3.connect(cache_path) as conn:
+        versions = [row[0] for row in conn.execute("SELECT parser_version FROM parse_cache")]
+    assert versions == [PARSER_VERSION]
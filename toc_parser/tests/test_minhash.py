@@ -0,0 +1,70 @@
+# toc_parser/tests/test_minhash.py
+from toc_parser import DuplicateClusters, estimate_jaccard, parse_book_toc, toc_signature
+from toc_parser.minhash import DEFAULT_THRESHOLD, NUM_BANDS, NUM_PERM
+
+CHAPTERS = [
+    "데이터 모델링", "정규화와 반정규화", "인덱스 설계", "트랜잭션과 격리 수준", "쿼리 최적화",
+    "파티셔닝", "복제와 고가용성", "백업과 복구", "보안과 권한", "모니터링",
+]
+UNRELATED = ["고양이 돌보기", "사료 고르기", "놀이와 훈련", "건강 검진", "털 관리", "여행 준비"]
+
+
+def _lines(raw_toc):
+    """수집 시점과 같은 입력: parse_book_toc가 전처리를 통과시킨 라인."""
+    lines = []
+    parse_book_toc(raw_toc, "9780000000000", lines_out=lines)
+    return lines
+
+
+def _toc(chapters, number=lambda i: f"{i}장", page=lambda i: i * 10):
+    return "\n".join(f"{number(i)} {title} ... {page(i)}" for i, title in enumerate(chapters, 1))
+
+
+def test_revised_edition_with_renumbered_chapters_is_duplicate():
+    original, original_bands = toc_signature(_lines(_toc(CHAPTERS)))
+    # 개정판: 장 번호가 하나씩 밀리고 쪽수가 바뀌었으며 마지막에 장이 하나 추가됨
+    revised, revised_bands = toc_signature(_lines(_toc(
+        CHAPTERS + ["클라우드 이전"], number=lambda i: f"{i + 1}장", page=lambda i: i * 12 + 3,
+    )))
+
+    assert estimate_jaccard(original, revised) >= DEFAULT_THRESHOLD
+    assert set(original_bands) & set(revised_bands)
+
+
+def test_unrelated_toc_scores_below_threshold():
+    signature, bands = toc_signature(_lines(_toc(CHAPTERS)))
+    other, other_bands = toc_signature(_lines(_toc(UNRELATED)))
+
+    assert estimate_jaccard(signature, other) < DEFAULT_THRESHOLD
+    assert not set(bands) & set(other_bands)
+
+
+def test_identical_toc_has_identical_signature():
+    signature, bands = toc_signature(_lines(_toc(CHAPTERS)))
+
+    assert toc_signature(_lines(_toc(CHAPTERS))) == (signature, bands)
+    assert estimate_jaccard(signature, signature) == 1.0
+    assert len(signature) == NUM_PERM
+    assert len(bands) == NUM_BANDS
+    # 밴드 번호 접두사 때문에 서로 다른 밴드의 키는 겹치지 않습니다.
+    assert len(set(bands)) == NUM_BANDS
+    assert all(len(band) <= 16 for band in bands)  # Book.toc_lsh_bands: CharField(max_length=16)
+
+
+def test_empty_input_has_no_signature():
+    assert toc_signature([]) == (None, [])
+    # 숫자/구두점만 있는 라인은 정규화 후 비어 있으므로 비교할 라인이 없습니다.
+    assert toc_signature(["1.", "- 12 -", "..."]) == (None, [])
+
+
+def test_duplicate_clusters_groups_revised_edition_under_first_book():
+    clusters = DuplicateClusters()
+    for key, raw_toc in (
+        ("a", _toc(CHAPTERS)),
+        ("b", _toc(UNRELATED)),
+        ("c", _toc(CHAPTERS, number=lambda i: f"{i + 1}장")),
+        ("d", ""),
+    ):
+        clusters.add(key, *toc_signature(_lines(raw_toc)))
+
+    assert clusters.clusters() == {"a": "a", "b": "b", "c": "a", "d": "d"}
@@ -0,0 +1,169 @@
+# toc_parser/tests/test_parser.py
+import os
+import sys
+
+import pytest
+
+from toc_parser import FALLBACK_PATTERN, PATTERNS_RULEBOOK, parse_book_toc, preprocess_line
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(REPO_ROOT, "dataengineering_service"))
+
+from benchmarks.synthetic_toc import generate_synthetic_toc  # noqa: E402
+
+ISBN = "9791100000000"
+
+# (raw_toc, 기대 노드 (level, number, title, source_line), 기대 실패 라인 (line_num, line_content))
+FIXTURES = {
+    "hierarchy_with_noise_and_pages": (
+        "머리말\n"
+        "제1부 데이터베이스 기초\n"
+        "Chapter 1. 관계형 모델 ..... 15\n"
+        "1.1 릴레이션과 튜플 17\n"
+        "1.2 키와 제약 조건 23\n"
+        "1.2.1 기본 키 24\n"
+        "Chapter 2. SQL 입문 41\n"
+        "2.1 SELECT 문 43\n"
+        "찾아보기",
+        [
+            (1, "1", "데이터베이스 기초", 2),
+            (2, "1", "관계형 모델", 3),
+            (4, "1.1", "릴레이션과 튜플", 4),
+            (4, "1.2", "키와 제약 조건", 5),
+            (4, "1.2.1", "기본 키", 6),
+            (2, "2", "SQL 입문", 7),
+            (4, "2.1", "SELECT 문", 8),
+        ],
+        [],
+    ),
+    "title_on_next_line_and_subtitles": (
+        "<b>1장.</b>\n"
+        "데이터와 친해지기\n"
+        "1.1 표 읽는 법 12\n"
+        "숫자로 말하기\n"
+        "2장 시각화\n"
+        "(1) 막대 그래프\n"
+        "(2) 선 그래프",
+        [
+            (2, "1", "데이터와 친해지기", 1),
+            (4, "1.1", "표 읽는 법 : 숫자로 말하기", 3),
+            (2, "2", "시각화", 5),
+            (6, "", "막대 그래프", 6),
+            (6, "", "선 그래프", 7),
+        ],
+        [],
+    ),
+    "unmatched_before_first_node": (
+        "(부록)\n"
+        "★★★\n"
+        "01장. 시작하기\n"
+        "1) 설치\n"
+        "이 책을 읽는 방법\n"
+        "2) 실행",
+        [
+            (2, "01", "시작하기", 3),
+            (5, "", "설치", 4),
+            (5, "", "실행", 6),
+        ],
+        [(1, "(부록)"), (2, "★★★")],
+    ),
+}
+
+
+def _legacy_parse_book_toc(raw_toc, isbn):
+    """
+    TocNode 도입 전의 dict 기반 파서(children 트리 + parsed_nodes 역순 탐색)를 그대로 옮긴 기준 구현.
+    규칙집/전처리는 현재 것을 쓰므로 파서 로직만 비교됩니다.
+    """
+    root_node = {"level": 0, "title": "BOOK_ROOT", "children": [], "source_line": 0}
+    stack = [root_node]
+    parsed_nodes = []
+    failed_lines = []
+
+    for i, raw_line in enumerate(raw_toc.splitlines()):
+        line_num = i + 1
+        line = preprocess_line(raw_line)
+        if not line:
+            continue
+
+        matched = False
+        for (level, pattern) in PATTERNS_RULEBOOK:
+            match = pattern.match(line)
+            if match:
+                data = match.groupdict()
+                new_node = {
+                    "isbn": isbn,
+                    "number": (data.get("number") or "").strip(),
+                    "title": (data.get("title") or "").strip(),
+                    "level": level,
+                    "children": [],
+                    "source_line": line_num,
+                }
+                while stack[-1]["level"] >= level:
+                    stack.pop()
+                stack[-1]["children"].append(new_node)
+                stack.append(new_node)
+                parsed_nodes.append(new_node)
+                matched = True
+                break
+
+        if not matched:
+            match = FALLBACK_PATTERN.match(line)
+            if match:
+                current_node = stack[-1]
+                if current_node["level"] > 0:
+                    subtitle = match.group('title').strip()
+                    if not current_node["title"]:
+                        current_node["title"] = subtitle
+                    else:
+                        current_node["title"] += f" : {subtitle}"
+                    for node in reversed(parsed_nodes):
+                        if node["source_line"] == current_node["source_line"]:
+                            node["title"] = current_node["title"]
+                            break
+                    matched = True
+
+        if not matched:
+            failed_lines.append({"isbn": isbn, "line_num": line_num, "line_content": line})
+
+    nodes = [(n["isbn"], n["level"], n["number"], n["title"], n["source_line"]) for n in parsed_nodes]
+    return nodes, failed_lines
+
+
+@pytest.mark.parametrize("name", sorted(FIXTURES))
+def test_fixture_tocs_parse_to_expected_nodes_and_failures(name):
+    raw_toc, expected_nodes, expected_failures = FIXTURES[name]
+
+    nodes, failures = parse_book_toc(raw_toc, ISBN)
+
+    assert [node.as_tuple() for node in nodes] == [(ISBN, *node) for node in expected_nodes]
+    assert failures == [{"isbn": ISBN, "line_num": n, "line_content": c} for n, c in expected_failures]
+
+
+@pytest.mark.parametrize("name", sorted(FIXTURES))
+def test_fixture_tocs_match_legacy_parser(name):
+    raw_toc = FIXTURES[name][0]
+
+    nodes, failures = parse_book_toc(raw_toc, ISBN)
+
+    assert ([node.as_tuple() for node in nodes], failures) == _legacy_parse_book_toc(raw_toc, ISBN)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_synthetic_tocs_match_legacy_parser(seed):
+    # 모든 규칙 + 노이즈 + fallback + 페이지 번호 줄이 섞인 합성 목차 (benchmarks/synthetic_toc.py)
+    raw_toc = generate_synthetic_toc(300, seed=seed)
+
+    nodes, failures = parse_book_toc(raw_toc, ISBN)
+
+    assert ([node.as_tuple() for node in nodes], failures) == _legacy_parse_book_toc(raw_toc, ISBN)
+
+
+def test_lines_out_collects_only_preprocessed_lines():
+    raw_toc = FIXTURES["hierarchy_with_noise_and_pages"][0]
+    lines = []
+
+    parse_book_toc(raw_toc, ISBN, lines_out=lines)
+
+    assert "머리말" not in lines and "찾아보기" not in lines
+    assert lines == [preprocess_line(line) for line in raw_toc.splitlines() if preprocess_line(line)]